@@ -1,12 +1,19 @@
+import time
+_started = time.perf_counter()  # Start of application startup, for the startup report
 import tkinter as tk
 from tkinter import filedialog, messagebox, Toplevel
-from PIL import Image, ImageTk
 import os
 from console import Console
 from file_manager import FileManager
 from transient_simulation import TransientSimulation
-import psutil
+from solver_profile import SolverProfiler, format_report, save_report
+from simulation_jobs import JobManager, SimulationPanel
 from whiteboard import Whiteboard
+from element import load_icon
+from recent_projects import RecentProjects
+from run_log import RunLog
+from performance_monitor import PerformanceSampler, PerformancePanel
+from autosave import Autosave, read_journal, overlay_journal, journaled_connections
 import json  # Add this import statement
 import tkinter.filedialog as filedialog
 # other imports...
@@ -29,7 +36,27 @@ class AiravataSoftware:
             return
         self.whiteboard = Whiteboard(root)
         self.current_file_name = None
+        self.project_tables = {}  # Data tables of the open project (valve tables, curves), by name
+        # Recently opened projects; the most recent one is prewarmed in the background
+        self.recent_projects = RecentProjects()
+        self.recent_projects.refresh_in_background(self.file_manager)
         self.highlighted_element = None
+        # Simulations run in worker processes; their messages arrive on the Tk thread
+        self.jobs = JobManager(root)
+        self.jobs.on_progress = self.on_simulation_progress
+        self.jobs.on_snapshot = self.on_simulation_snapshot
+        self.jobs.on_probes = self.on_simulation_probes
+        self.jobs.on_finished = self.on_simulation_finished
+        # Resource usage is sampled in the background for the whole session, workers included;
+        # solver steps are counted from the progress the workers report
+        self.performance = PerformanceSampler()
+        self.performance.add_counter("solver_steps", lambda: self.jobs.steps_done)
+        self.performance.start()
+        self.performance_panel = None
+        self.simulation_panels = {}  # Job id -> SimulationPanel
+        self.simulation_results = None  # (H, Q) of the last completed run
+        self.pending_exports = {}  # Job id -> output path to export to once the job is done
+        self.batch_scheduler = None  # Scheduler running batch-queue jobs, started when a job is scheduled
 
         # Create UI components
         self.create_file_label()
@@ -82,7 +109,10 @@ class AiravataSoftware:
     def create_console(self):
         self.console_frame = tk.Frame(self.root, bg="#f5f5f5", bd=2, relief="sunken")
         self.console_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
-        self.console = Console(self.console_frame)
+        # Everything logged to the console is also kept on disk as JSON lines
+        self.run_log = RunLog()
+        self.run_log.start()
+        self.console = Console(self.console_frame, run_log=self.run_log)
         self.console.frame.pack(fill=tk.X)
 
     def create_whiteboard(self):
@@ -91,6 +121,12 @@ class AiravataSoftware:
         self.whiteboard = Whiteboard(self.whiteboard_frame)
         self.whiteboard.pack(fill=tk.BOTH, expand=True)
 
+        # Journal changes of the open project in the background
+        self.autosave = Autosave(self.whiteboard, self.file_manager, lambda: self.current_file_name)
+        self.autosave.on_error = lambda message: self.console.log(message, level="error")
+        self.autosave.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Initially disable the whiteboard
         self.whiteboard_disabled = False
 
@@ -103,9 +139,7 @@ class AiravataSoftware:
         self.whiteboard_disabled = True
 
     def load_and_resize_icon(self, icon_path, size=(32, 32)):
-        img = Image.open(icon_path)
-        img = img.resize(size, Image.LANCZOS)
-        return ImageTk.PhotoImage(img)
+        return load_icon(icon_path, size)  # Shared icon cache; each file is decoded once
 
     def add_toolbar_button(self, toolbar, icon, tooltip_text, command):
         button = tk.Button(toolbar, image=icon, command=command, relief=tk.FLAT, bg="#e0e0e0", borderwidth=0)
@@ -133,15 +167,17 @@ class AiravataSoftware:
         else:
             file_name = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
             if file_name:
-                # Create a new, empty file
-                with open(file_name, 'w') as new_file:
-                    new_file.write("{}")  # Optionally initialize with default JSON content (empty JSON object)
-                self.file_manager = FileManager(os.path.dirname(file_name))
+                # Create a new, empty project
+                self.file_manager.save_elements(file_name, [], [])
+                self.file_manager.project_folder = os.path.dirname(file_name)
                 self.file_saved = False
                 self.file_open = True
                 self.current_file_name = file_name  # Set the current file name
                 self.whiteboard.is_file_open = True  # Enable the whiteboard
                 self.whiteboard.clear()  # Clear the whiteboard
+                self.whiteboard.mark_clean()
+                self.autosave.held = False
+                self.project_tables = {}
                 self.update_file_label()  # Update the file label
                 self.console.log("New file created successfully.",level="success")
 
@@ -149,34 +185,84 @@ class AiravataSoftware:
         """Open a file and load its content onto the canvas."""
         file_path = filedialog.askopenfilename(
             title="Open File",
-            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
+            filetypes=[("Airavata Projects", "*.avp"), ("JSON Files", "*.json"), ("All Files", "*.*")]
         )
 
         if not file_path:
             messagebox.showinfo("No File Selected", "No file was selected.")
             return
 
+        self.open_project(file_path)
+
+    def load_project(self, file_path, progress=None):
+        """Stream a project file onto the cleared board; returns (project, recovered journal records)."""
+        # Elements are read from the file (binary project or JSON) while they are loaded,
+        # so the first of them are drawn before the rest of a large file has been parsed
+        elements, project = self.file_manager.stream_project(file_path, progress=progress)
+
+        # Changes journaled after the last compaction, e.g. before a crash
+        recovered = read_journal(file_path)
+        if recovered:
+            elements = overlay_journal(elements, recovered)
+
+        self.whiteboard.load_elements(elements)
+        self.whiteboard.load_connections(journaled_connections(recovered, project['connections']))
+        self.whiteboard.mark_clean()
+        return project, recovered
+
+    def restore_project(self, file_path):
+        """Put the open project back on the board after another file failed to load over it."""
+        self.whiteboard.clear()
+        self.whiteboard.mark_clean()  # The elements of the failed file were never saved
+        if file_path:
+            try:
+                self.autosave.flush(timeout=30)  # Its last changes were journaled just before the open
+                self.load_project(file_path)
+            except (OSError, ValueError) as e:
+                self.whiteboard.clear()
+                self.whiteboard.mark_clean()
+                self.autosave.hold()  # Do not journal the empty board over the project
+                self.console.log(f"Could not reload {os.path.basename(file_path)}: {e}", level="error")
+        self.update_file_label()
+
+    def open_project(self, file_path):
+        """Load a project file onto the canvas."""
         try:
-            # Load elements from the selected file
-            with open(file_path, 'r') as file:
-                elements_data = json.load(file)
-            
-            if not isinstance(elements_data, dict) or 'elements' not in elements_data:
-                raise ValueError("Invalid file structure. Expected a dictionary with an 'elements' key.")
-            
-            # Clear existing elements before loading new ones
+            def show_progress(bytes_read, total):
+                self.file_label.config(text=f"Loading {os.path.basename(file_path)}: {bytes_read * 100 // max(total, 1)}%")
+                self.root.update_idletasks()
+
+            # Journal what is left of the previous project, then clear it
+            previous_file = self.current_file_name
+            self.autosave.save_pending(compact=False)
+            self.autosave.held = False
             self.whiteboard.clear()
 
-            # Load elements into the canvas
-            self.whiteboard.load_elements(elements_data['elements'])
+            try:
+                project, recovered = self.load_project(file_path, progress=show_progress)
+            except Exception:
+                # A file that fails to parse part way leaves the previous project open
+                self.restore_project(previous_file)
+                raise
 
             # Update file state
             self.current_file_name = file_path
             self.file_open = True  # Set the file open flag
             self.whiteboard.is_file_open = True  # Enable the whiteboard
             self.file_manager.file_path = file_path  # Update the file manager
+            self.file_manager.project_folder = os.path.dirname(file_path)
+            self.project_tables = project.get("tables", {})
             self.update_file_label()  # Update the file label
             self.console.log(f"Successfully loaded file: {os.path.basename(file_path)}",level="success")
+            schedules = self.load_schedules()  # Parses new or changed schedules now, so a run starts from the cache
+            if schedules:
+                self.console.log(f"Loaded {len(schedules)} operation schedules.", level="info")
+            try:
+                self.recent_projects.record(file_path, self.whiteboard)
+            except OSError as e:
+                self.console.log(f"Could not update recent projects: {e}", level="warning")
+            if recovered:
+                self.console.log(f"Recovered {len(recovered)} autosaved changes.", level="warning")
 
             messagebox.showinfo("File Loaded", f"Successfully loaded file: {os.path.basename(file_path)}")
 
@@ -188,40 +274,51 @@ class AiravataSoftware:
 
     def save_file(self):
         if self.current_file_name:
-            self.file_manager.save_elements(
-                self.current_file_name,
-                [element.to_data() for element in self.whiteboard.elements]
-            )
-            self.console.log(
-                f"File saved successfully: {os.path.basename(self.current_file_name)}",
-                level="success",
-            )
+            # The project file is rewritten in the background; the outcome is reported when it is on disk
+            file_name = os.path.basename(self.current_file_name)
+            self.autosave.save(compact=True, on_done=lambda error: self.on_file_saved(file_name, error))
         else:
             file_path = filedialog.asksaveasfilename(
                 title="Save File",
                 defaultextension=".json",
-                filetypes=[("JSON Files", "*.json")],
+                filetypes=[("JSON Files", "*.json"), ("Airavata Projects", "*.avp")],
             )
 
             if file_path:
+                try:
+                    saved = self.file_manager.save_elements(
+                        file_path,
+                        [element.to_data() for element in self.whiteboard.elements.values()],
+                        self.whiteboard.connections.to_data(),
+                    )
+                except OSError as e:
+                    self.on_file_saved(os.path.basename(file_path), str(e))
+                    return
+                if not saved:
+                    self.on_file_saved(os.path.basename(file_path), "The project data could not be serialized.")
+                    return
                 self.file_manager.file_path = file_path
                 self.current_file_name = file_path
-                self.file_manager.save_elements(
-                    file_path, [element.to_data() for element in self.whiteboard.elements]
-                )
-                self.console.log(
-                    f"File saved successfully: {os.path.basename(file_path)}",
-                    level="success",
-                )
+                self.whiteboard.mark_clean()
+                self.autosave.held = False
+                self.on_file_saved(os.path.basename(file_path), None)
             else:
                 self.console.log("No file selected for saving.", level="error")
 
+    def on_file_saved(self, file_name, error):
+        if error:
+            self.console.log(f"Failed to save {file_name}: {error}", level="error")
+            messagebox.showerror("Save Error", f"Failed to save {file_name}. Error: {error}")
+        else:
+            self.console.log(f"File saved successfully: {file_name}", level="success")
+
 
 
 
     def terminate_file(self):
         """Terminate the current file."""
         if self.file_open:
+            self.autosave.save_pending()  # Keep the changes made since the last save
             self.file_manager.close_file()  # Clear file-related data
             self.simulation = None
             self.file_saved = False
@@ -229,6 +326,9 @@ class AiravataSoftware:
             self.whiteboard.is_file_open = False  # Disable the whiteboard
             self.whiteboard.clear()  # Clear the whiteboard
             self.current_file_name = None  # Reset the current file name
+            self.project_tables = {}
+            self.whiteboard.mark_clean()
+            self.autosave.held = False
             self.update_file_label()  # Update the file label
             self.console.log("File terminated successfully.",level="success")
         else:
@@ -236,8 +336,23 @@ class AiravataSoftware:
 
 
 
+    def on_close(self):
+        """Stop the background jobs and flush the autosave journal and the run log before the window closes."""
+        if self.batch_scheduler:
+            # Interrupted batch jobs go back to the queue instead of dying with the process
+            self.batch_scheduler.stop(cancel_running=True)
+            self.batch_scheduler = None
+        self.jobs.shutdown()
+        self.autosave.stop()
+        self.performance.stop()
+        self.run_log.stop()
+        self.root.destroy()
+
     def clear_screen(self):
-        self.whiteboard.clear()
+        # One undoable edit; the project file keeps its elements until the user saves
+        self.whiteboard.delete_all()
+        self.autosave.hold()
+        self.console.log("Board cleared. Undo restores it; the file is unchanged until you save.", level="warning")
         # Clear the console if you want to
         #self.console.clear()
 
@@ -269,15 +384,112 @@ class AiravataSoftware:
 
 
 
-    def export_to_excel(self):
-        if self.simulation:
-            data = self.simulation.method_of_characteristics()
-            output_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx")])
+    def create_simulation(self, data=None):
+        """Set up the solver; stages are timed when AIRAVATA_PROFILE_SOLVER=1 is set."""
+        profiler = SolverProfiler() if os.environ.get("AIRAVATA_PROFILE_SOLVER") == "1" else None
+        self.simulation = TransientSimulation(data, profiler=profiler)
+        # Only the paths of the cached schedules are kept; a worker maps the arrays itself
+        self.simulation.data["schedules"] = {name: array.filename for name, array in self.load_schedules().items()}
+        return self.simulation
+
+    def load_schedules(self):
+        """{file name: array} of the open project's .txt operation schedules, from the cache when unchanged."""
+        if not self.file_open:
+            return {}
+        try:
+            return self.file_manager.load_schedules()
+        except (OSError, ValueError) as e:  # ValueError: a cached array that cannot be read
+            self.console.log(f"Could not load operation schedules: {e}", level="warning")
+            return {}
+
+    def report_solver_profile(self, report):
+        """Log the stage timings of a profiled run, and save them next to the project."""
+        for line in format_report(report):
+            self.console.log(line, level="debug")
+        if self.current_file_name:
+            report_path = os.path.splitext(self.current_file_name)[0] + ".profile.json"
+            try:
+                save_report(report, report_path)
+            except OSError as e:
+                self.console.log(f"Could not save the solver profile: {e}", level="warning")
+
+    def run_simulation(self, steps=1000, probes=None):
+        """Start a solver run in the background; the canvas stays usable while it runs.
+
+        probes are the node indices plotted against time; by default the first, middle and last.
+        """
+        simulation = self.simulation or self.create_simulation()
+        nodes = len(simulation.data["H_initial"])
+        if probes is None:
+            probes = sorted({0, nodes // 2, nodes - 1})
+        job = self.jobs.submit(simulation.data, steps, profile=simulation.profiler is not None, probes=probes)
+        labels = [f"Node {node}" for node in probes]
+        self.simulation_panels[job.job_id] = SimulationPanel(self.root, self.jobs, job, labels)
+        self.console.log(f"Simulation {job.job_id} started ({steps} steps).", level="info")
+        return job
+
+    def on_simulation_progress(self, job):
+        panel = self.simulation_panels.get(job.job_id)
+        if panel:
+            panel.update_progress()
+
+    def on_simulation_snapshot(self, job, step, H, Q):
+        panel = self.simulation_panels.get(job.job_id)
+        if panel:
+            panel.show_snapshot(H)
+
+    def on_simulation_probes(self, job, steps, H, Q):
+        panel = self.simulation_panels.get(job.job_id)
+        if panel:
+            panel.show_probes(steps, H, Q)
+
+    def on_simulation_finished(self, job):
+        panel = self.simulation_panels.pop(job.job_id, None)
+        if panel:
+            panel.finish()
+        output_path = self.pending_exports.pop(job.job_id, None)
+        if job.state == "done":
+            self.simulation_results = job.result
+            self.console.log(f"Simulation {job.job_id} finished after {job.steps} steps.", level="success")
+            if job.report:
+                self.report_solver_profile(job.report)
             if output_path:
-                self.file_manager.export_to_excel(data, output_path)
-                self.console.log("Exported project to Excel successfully.",level="success")
+                self.export_results(job.result, output_path)
+            return
+        if job.state == "cancelled":
+            self.console.log(f"Simulation {job.job_id} cancelled at step {job.step}.", level="warning")
+        else:
+            self.console.log(f"Simulation {job.job_id} failed: {job.error.strip().splitlines()[-1]}", level="error")
+        if output_path:
+            self.console.log(f"Export to {os.path.basename(output_path)} skipped: the run did not finish.", level="warning")
+
+    def export_to_excel(self):
+        """Export the results of the last finished run; without one, offer to run the solver first."""
+        if self.simulation_results is None and not messagebox.askyesno(
+                "Export Results", "No simulation has finished yet. Run one now and export its results when it is done?"):
+            return
+        output_path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel Files", "*.xlsx"), ("CSV Files", "*.csv"), ("Parquet Files", "*.parquet")],
+        )
+        if not output_path:
+            return
+        if self.simulation_results is not None:
+            self.export_results(self.simulation_results, output_path)
         else:
-            messagebox.showwarning("Warning", "No project data to export.")
+            # The run happens in a worker; on_simulation_finished exports once it is done
+            job = self.run_simulation()
+            self.pending_exports[job.job_id] = output_path
+
+    def export_results(self, results, output_path):
+        try:
+            parts = self.file_manager.export_to_excel(results, output_path)
+        except (ImportError, OSError, ValueError) as e:
+            messagebox.showerror("Export Error", f"Failed to export results. Error: {e}")
+            return
+        if len(parts) > 1:
+            self.console.log(f"Results exceeded the row limit and were split into: {', '.join(map(str, parts))}", level="info")
+        self.console.log(f"Exported results to {os.path.basename(output_path)} successfully.", level="success")
 
     def toggle_theme(self):
         if self.current_theme == 'light':
@@ -334,37 +546,18 @@ class AiravataSoftware:
         self.console.log(f"Element {element.label} highlighted.",level="info")
 
     def monitor_performance(self):
-        cpu_usage = psutil.cpu_percent(interval=1)
-        memory_info = psutil.virtual_memory()
-        disk_info = psutil.disk_usage('/')
-        net_info = psutil.net_io_counters()
-        battery = psutil.sensors_battery()
-        battery_status = "Charging" if battery and battery.power_plugged else "Not Charging"
-        battery_percentage = battery.percent if battery else "N/A"
-        
-        try:
-            import GPUtil
-            gpus = GPUtil.getGPUs()
-            gpu_usage = ", ".join([f"GPU {gpu.id}: {gpu.memoryUtil * 100:.2f}% used" for gpu in gpus])
-        except ImportError:
-            gpu_usage = "GPU monitoring not available"
-        
-        processes = [(p.info['pid'], p.info['name'], p.info['cpu_percent']) for p in psutil.process_iter(attrs=['pid', 'name', 'cpu_percent'])]
-        processes = sorted(processes, key=lambda x: x[2], reverse=True)[:5]
-        process_info = "\n".join([f"PID: {pid}, Name: {name}, CPU Usage: {cpu}%" for pid, name, cpu in processes])
-
-        messagebox.showinfo("Performance Monitoring", 
-                            f"CPU Usage: {cpu_usage}%\n"
-                            f"Memory Usage: {memory_info.percent}%\n"
-                            f"Disk Usage: {disk_info.percent}%\n"
-                            f"Network - Sent: {net_info.bytes_sent} bytes, Received: {net_info.bytes_recv} bytes\n"
-                            f"Battery Status: {battery_status} ({battery_percentage}%)\n"
-                            f"GPU Usage: {gpu_usage}\n"
-                            f"Top 5 Processes by CPU Usage:\n{process_info}")
-
-        self.console.log(f"CPU Usage: {cpu_usage}%, Memory Usage: {memory_info.percent}%",level="info")
-
-def show_splash_screen(root, on_splash_close):
+        """Open the live performance panel, or bring it to the front if it is open."""
+        if self.performance_panel and self.performance_panel.window:
+            self.performance_panel.lift()
+        else:
+            self.performance_panel = PerformancePanel(self.root, self.performance)
+        latest = self.performance.latest()
+        if latest:
+            self.console.log(f"CPU Usage: {latest['cpu_process']:.0f}%, Memory: {latest['rss_mb']:.0f} MB",level="info")
+
+def show_splash_screen(root):
+    """Show the splash image while the application is built; returns the splash window."""
+    from PIL import Image, ImageTk
     splash = Toplevel(root)
     splash.title("Airavata Loading")
     splash.geometry("800x600")
@@ -373,30 +566,44 @@ def show_splash_screen(root, on_splash_close):
     y = (root.winfo_screenheight() // 2) - (600 // 2)
     splash.geometry(f"800x600+{x}+{y}")
     splash_image_path = "Icons/splash_image.png"
-    splash_image = Image.open(splash_image_path)
-    splash_image = splash_image.resize((800, 600), Image.LANCZOS)
-    splash_photo = ImageTk.PhotoImage(splash_image)
-    splash_label = tk.Label(splash, image=splash_photo)
-    splash_label.image = splash_photo
+    try:
+        splash_image = Image.open(splash_image_path)
+        splash_image = splash_image.resize((800, 600), Image.LANCZOS)
+        splash_photo = ImageTk.PhotoImage(splash_image)
+        splash_label = tk.Label(splash, image=splash_photo)
+        splash_label.image = splash_photo
+    except OSError:
+        splash_label = tk.Label(splash, text="Airavata 2.0\nLoading...", font=("Segoe UI", 24), bg="#333", fg="white")
     splash_label.pack(fill=tk.BOTH, expand=True)
-    
+
     root.withdraw()  # Hide the main window during the splash screen
-    splash.after(3000, lambda: on_splash_close(splash))
+    splash.update()  # Paint it now; the main loop is not running yet
+    return splash
 
 
-def on_splash_close(splash):
+def close_splash(root, splash, app, marks):
+    """Called once the first idle moment after building the app, i.e. when it is ready."""
     splash.destroy()
     root.deiconify()  # Show the main window
-    root.state("zoomed")  # Maximize the window after the splash screen
-    app = AiravataSoftware(root) # Initialize the application
-
+    try:
+        root.state("zoomed")  # Maximize the window after the splash screen
+    except tk.TclError:
+        root.attributes("-zoomed", True)  # X11 has no "zoomed" state
+    marks.append(("first idle", time.perf_counter()))
+    stages = ", ".join(f"{stage} {(end - start) * 1000:.0f} ms"
+                       for (_, start), (stage, end) in zip(marks, marks[1:]))
+    app.console.log(f"Startup took {(marks[-1][1] - marks[0][1]) * 1000:.0f} ms ({stages})", level="debug")
 
 
 if __name__ == "__main__":
+    marks = [("start", _started), ("imports", time.perf_counter())]
     root = tk.Tk()
     root.geometry(f"{root.winfo_screenwidth()}x{root.winfo_screenheight()}+0+0")  # Set to full screen size
     root.state("normal")  # Ensure windowed mode, not fullscreen
-    show_splash_screen(root, on_splash_close)
-    app = AiravataSoftware(root)
+    splash = show_splash_screen(root)
+    marks.append(("splash", time.perf_counter()))
+    app = AiravataSoftware(root)  # Built once, while the splash is showing
+    marks.append(("application", time.perf_counter()))
+    root.after_idle(close_splash, root, splash, app, marks)
     root.mainloop()
 
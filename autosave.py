@@ -0,0 +1,228 @@
+"""Background autosave: changed elements are appended to a journal next to the project file,
+and the journal is periodically folded back into the project with an atomic rename.
+
+Journal records are JSON lines holding full state, so replaying one twice is harmless:
+{"put": element_data}, {"delete": name} or {"connections": [...]}.
+"""
+import json
+import os
+import queue
+import threading
+import numpy as np
+
+
+def journal_path(file_path):
+    return file_path + ".journal"
+
+
+def append_journal(file_path, records):
+    """Append records to the project's journal and force them to disk."""
+    with open(journal_path(file_path), "a", encoding="utf-8") as journal:
+        for record in records:
+            journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+
+
+def read_journal(file_path):
+    """Return the journal records of a project; a torn last line from a crash is dropped."""
+    records = []
+    try:
+        with open(journal_path(file_path), "r", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def overlay_journal(elements, records):
+    """Yield element data with the journal applied, without materialising the element list."""
+    latest = {}  # Name -> final journaled data, or None if the element was deleted
+    for record in records:
+        if "put" in record:
+            latest[record["put"]["name"]] = record["put"]
+        elif "delete" in record:
+            latest[record["delete"]] = None
+    for data in elements:
+        if data["name"] in latest:
+            data = latest.pop(data["name"])
+            if data is None:
+                continue
+        yield data
+    # Elements created after the last compaction
+    for data in latest.values():
+        if data is not None:
+            yield data
+
+
+def journaled_connections(records, connections):
+    """Return the last journaled connections, or the given ones if the journal has none."""
+    for record in reversed(records):
+        if "connections" in record:
+            return record["connections"]
+    return connections
+
+
+def apply_journal(project, records):
+    """Apply journal records to project data as returned by FileManager.read_project."""
+    project["elements"] = list(overlay_journal(project["elements"], records))
+    project["connections"] = journaled_connections(records, project["connections"])
+    return project
+
+
+class Autosave:
+    """Journals the Whiteboard's changes every interval_ms and compacts them off the Tk thread.
+
+    Only the Tk thread touches elements: it collects the changed elements' data, which
+    is O(changes), and hands plain dictionaries to the worker thread that does the I/O.
+    """
+
+    def __init__(self, whiteboard, file_manager, get_file_path, interval_ms=5000, compact_every=500):
+        self.whiteboard = whiteboard
+        self.file_manager = file_manager
+        self.get_file_path = get_file_path  # Returns the open project's path, or None
+        self.interval_ms = interval_ms
+        self.compact_every = compact_every  # Journal records before they are folded into the project
+        self.on_error = None  # Callback(message), called on the Tk thread
+        self.tasks = queue.Queue()
+        self.errors = queue.Queue()  # Failures reported by the worker, shown on the next tick
+        self.completed = queue.Queue()  # (on_done, error) of finished saves, delivered on the Tk thread
+        self.waiting = 0  # Saves whose on_done has not been delivered yet
+        self.journal_size = 0
+        self.held = False  # Set by hold(): changes are kept in memory until the next save()
+        self.after_id = None
+        self.deliver_id = None
+        self.worker = threading.Thread(target=self._run, name="autosave", daemon=True)
+
+    def start(self):
+        self.worker.start()
+        self.after_id = self.whiteboard.after(self.interval_ms, self._tick)
+
+    def hold(self):
+        """Stop journaling until the next explicit save(), e.g. after a sweeping edit
+        the user has not confirmed by saving. Closing the project meanwhile drops the changes."""
+        self.held = True
+
+    def save_pending(self, compact=True):
+        """Write out pending changes unless journaling is held."""
+        if not self.held:
+            self.save(compact=compact)
+
+    def stop(self):
+        """Write out pending changes and wait for the worker to finish."""
+        if self.after_id:
+            self.whiteboard.after_cancel(self.after_id)
+            self.after_id = None
+        if self.deliver_id:
+            self.whiteboard.after_cancel(self.deliver_id)
+            self.deliver_id = None
+        self.save_pending()
+        self.tasks.put(None)
+        self.worker.join()
+
+    def _tick(self):
+        while not self.errors.empty():
+            message = self.errors.get()
+            if self.on_error:
+                self.on_error(message)
+        if not self.held:
+            self.save()
+        self.after_id = self.whiteboard.after(self.interval_ms, self._tick)
+
+    def save(self, compact=False, on_done=None):
+        """Queue the changes made since the last save; never blocks on disk I/O.
+
+        on_done(error) is called on the Tk thread once the save has been written, with
+        None on success or the error message; its failures are not reported to on_error.
+        An explicit save also ends a hold().
+        """
+        self.held = False
+        done = None
+        if on_done:
+            self.waiting += 1
+            done = lambda error: self.completed.put((on_done, error))
+            if self.deliver_id is None:
+                self.deliver_id = self.whiteboard.after(50, self._deliver)
+        if not self._queue_save(compact, done) and done:
+            done(None)  # No project is open: there is nothing to write
+
+    def flush(self, timeout=None):
+        """Write and compact the pending changes, blocking until the project file is up to date.
+
+        Raises OSError if the save fails or does not finish within timeout seconds. Like
+        save(), it ends a hold().
+        """
+        self.held = False
+        finished = threading.Event()
+        result = []
+
+        def done(error):
+            result.append(error)
+            finished.set()
+
+        if not self._queue_save(True, done):
+            return
+        if not finished.wait(timeout):
+            raise OSError("Timed out waiting for the autosave to finish.")
+        if result[0]:
+            raise OSError(result[0])
+
+    def _queue_save(self, compact, done):
+        """Hand the changes to the worker; returns False if no project is open."""
+        file_path = self.get_file_path()
+        if not file_path:
+            return False
+        records = self.whiteboard.take_changes()
+        if records or compact or done:
+            self.tasks.put((file_path, records, compact, done))
+        return True
+
+    def _deliver(self):
+        # Runs on the Tk thread while saves with an on_done callback are outstanding
+        while not self.completed.empty():
+            on_done, error = self.completed.get()
+            self.waiting -= 1
+            on_done(error)
+        self.deliver_id = self.whiteboard.after(50, self._deliver) if self.waiting else None
+
+    def _run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            file_path, records, compact, done = task
+            error = None
+            try:
+                if records:
+                    append_journal(file_path, records)
+                    self.journal_size += len(records)
+                if compact or self.journal_size >= self.compact_every:
+                    self.compact(file_path)
+            except (OSError, ValueError, TypeError) as e:
+                error = str(e)
+            # A save that is waited for reports its own outcome; others are shown on the next tick
+            if done:
+                done(error)
+            elif error:
+                self.errors.put(f"Autosave failed: {error}")
+
+    def compact(self, file_path):
+        """Fold the journal into the project file; the file is replaced atomically."""
+        records = read_journal(file_path)
+        if not records:
+            return
+        try:
+            project = self.file_manager.read_project(file_path)
+        except FileNotFoundError:
+            project = {"elements": [], "connections": [], "tables": {}}
+        # Copy memory-mapped tables before the file under them is replaced
+        tables = {name: np.array(table) for name, table in project.get("tables", {}).items()}
+        apply_journal(project, records)
+        if not self.file_manager.save_elements(file_path, project["elements"], project["connections"], tables):
+            raise ValueError(f"Could not write {os.path.basename(file_path)}.")
+        os.remove(journal_path(file_path))
+        self.journal_size = 0
@@ -0,0 +1,122 @@
+"""Incremental project backups: each backup is a full tree of the project folder, but files
+unchanged since the previous backup are hard links to it instead of copies.
+
+Every backup folder holds a MANIFEST_NAME file recording size, mtime and SHA-256 of each
+file. A file whose size and mtime match the previous manifest is linked without being
+read; other files are hashed, and only those whose content differs are copied.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+MANIFEST_NAME = ".backup_manifest.json"
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_backups(backup_root):
+    """Backup folders under backup_root, oldest first."""
+    if not os.path.isdir(backup_root):
+        return []
+    names = sorted(name for name in os.listdir(backup_root)
+                   if os.path.exists(os.path.join(backup_root, name, MANIFEST_NAME)))
+    return [os.path.join(backup_root, name) for name in names]
+
+
+def read_manifest(backup_dir):
+    with open(os.path.join(backup_dir, MANIFEST_NAME), "r") as file:
+        return json.load(file)
+
+
+def _link_or_copy(source, target):
+    try:
+        os.link(source, target)
+        return False
+    except OSError:  # No hard links on this file system, or across devices
+        shutil.copy2(source, target)
+        return True
+
+
+def _project_files(source, exclude):
+    for folder, subfolders, files in os.walk(source):
+        subfolders[:] = [name for name in subfolders if os.path.abspath(os.path.join(folder, name)) != exclude]
+        for name in files:
+            path = os.path.join(folder, name)
+            yield os.path.relpath(path, source), path
+
+
+def backup_tree(source, backup_root, workers=8):
+    """Back up the source folder into a new timestamped folder; returns (path, copied, linked)."""
+    source = os.path.abspath(source)
+    backups = list_backups(backup_root)
+    previous_dir = backups[-1] if backups else None
+    previous = read_manifest(previous_dir) if previous_dir else {}
+
+    backup_dir = os.path.join(backup_root, time.strftime("%Y%m%d-%H%M%S"))
+    suffix = 1
+    while os.path.exists(backup_dir):
+        suffix += 1
+        backup_dir = os.path.join(backup_root, time.strftime("%Y%m%d-%H%M%S") + f"-{suffix}")
+    os.makedirs(backup_dir)
+
+    def back_up(item):
+        relative, path = item
+        stat = os.stat(path)
+        old = previous.get(relative)
+        target = os.path.join(backup_dir, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+            digest = old["sha256"]  # Unchanged by size and mtime: no need to read it
+        else:
+            digest = file_hash(path)
+        if old and old["sha256"] == digest:
+            copied = _link_or_copy(os.path.join(previous_dir, relative), target)
+        else:
+            shutil.copy2(path, target)
+            copied = True
+        return relative, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}, copied
+
+    manifest = {}
+    copied = linked = 0
+    # Backups kept inside the project folder are not backed up themselves
+    exclude = os.path.abspath(backup_root)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for relative, entry, was_copied in pool.map(back_up, _project_files(source, exclude)):
+            manifest[relative] = entry
+            copied += was_copied
+            linked += not was_copied
+
+    # Written last: a backup without a manifest is incomplete and is ignored
+    with open(os.path.join(backup_dir, MANIFEST_NAME), "w") as file:
+        json.dump(manifest, file)
+    return backup_dir, copied, linked
+
+
+def restore(backup_dir, target, paths=None, workers=8):
+    """Copy files from a backup into target: the listed relative paths, or the whole tree."""
+    manifest = read_manifest(backup_dir)
+    if paths is None:
+        paths = list(manifest)
+    missing = [path for path in paths if path not in manifest]
+    if missing:
+        raise KeyError(f"Not in this backup: {', '.join(missing)}")
+
+    def restore_file(relative):
+        destination = os.path.join(target, relative)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        # Copy rather than link, so editing the restored file cannot alter the backup
+        shutil.copy2(os.path.join(backup_dir, relative), destination)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(restore_file, paths))
+    return len(paths)
@@ -0,0 +1,396 @@
+"""Persistent batch queue of simulation jobs, run by a scheduler on a bounded worker pool.
+
+Jobs live in an SQLite database, so a queue survives restarts and can be filled from the
+GUI or from the command line while a scheduler is running. The scheduler starts the
+highest-priority queued job (oldest first among equals) whenever a worker is free. It
+kills a worker that exceeds its job's memory limit and retries jobs that fail up to their
+max_attempts. Several schedulers may share a queue: each running job records the
+scheduler that claimed it and a heartbeat that scheduler renews, and only jobs whose
+heartbeat has gone stale, i.e. whose scheduler did not shut down, are re-queued.
+Result arrays are registered in a content-addressed store next to the database.
+
+    python -m batch_queue submit project.json --steps 5000 --priority 5
+    python -m batch_queue sweep project.json --parameter Valve_1.closure_time --values 2 4 8
+    python -m batch_queue list
+    python -m batch_queue run --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from versioning import ObjectStore
+
+
+QUEUE_PATH = os.path.join(os.path.expanduser("~"), ".airavata", "batch", "jobs.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    memory_limit_mb INTEGER,
+    not_before REAL NOT NULL DEFAULT 0,
+    submitted REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    error TEXT,
+    owner TEXT,
+    heartbeat REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (state, priority DESC, id);
+CREATE TABLE IF NOT EXISTS results (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (job_id, name)
+);
+"""
+
+
+class JobQueue:
+    """The job database. Every call opens its own connection, so any process may use it."""
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.results_store = ObjectStore(os.path.join(os.path.dirname(path), "results"))
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")  # Readers do not wait for the scheduler's writes
+            db.executescript(_SCHEMA)
+            # Queues created before jobs had owners
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _execute(self, sql, parameters=()):
+        db = self._connect()
+        try:
+            with db:
+                return db.execute(sql, parameters).fetchall()
+        finally:
+            db.close()
+
+    def submit(self, name, payload, priority=0, max_attempts=3, memory_limit_mb=None, not_before=0):
+        """Queue a job; payload is {"project": path, "steps": n, "overrides": {...}}.
+
+        With "snapshot": true, the project is a copy made by snapshot() and is deleted once
+        the job is done, failed or cancelled.
+        """
+        db = self._connect()
+        try:
+            with db:
+                cursor = db.execute(
+                    "INSERT INTO jobs (name, payload, priority, max_attempts, memory_limit_mb, not_before, submitted)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (name, json.dumps(payload), priority, max_attempts, memory_limit_mb, not_before, time.time()))
+                return cursor.lastrowid
+        finally:
+            db.close()
+
+    def submit_sweep(self, project, parameter, values, steps, **options):
+        """One job per value of an element parameter ("Element_1.parameter"); returns their ids."""
+        return [self.submit(f"{os.path.basename(project)} {parameter}={value}",
+                            {"project": project, "steps": steps, "overrides": {parameter: value}}, **options)
+                for value in values]
+
+    def snapshot(self, project_path):
+        """Copy a project into the queue folder, so that a job runs it as it was when queued."""
+        folder = os.path.join(os.path.dirname(self.path), "projects")
+        os.makedirs(folder, exist_ok=True)
+        name, extension = os.path.splitext(os.path.basename(project_path))
+        copy_path = os.path.join(folder, f"{name}-{uuid.uuid4().hex[:8]}{extension}")
+        shutil.copyfile(project_path, copy_path)
+        return copy_path
+
+    def discard_snapshot(self, job_id):
+        """Delete the project copy of a job that will not run again."""
+        job = self.job(job_id)
+        payload = json.loads(job["payload"])
+        if payload.get("snapshot") and job["state"] in ("done", "failed", "cancelled"):
+            try:
+                os.remove(payload["project"])
+            except OSError:
+                pass
+
+    def claim(self, owner):
+        """Mark the next job to run as running by owner and return it, or None if none is due."""
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")  # No other scheduler can claim the same job
+            row = db.execute(
+                "SELECT * FROM jobs WHERE state = 'queued' AND not_before <= ? ORDER BY priority DESC, id LIMIT 1",
+                (time.time(),)).fetchone()
+            if row is not None:
+                now = time.time()
+                db.execute("UPDATE jobs SET state = 'running', attempts = attempts + 1, started = ?, owner = ?,"
+                           " heartbeat = ? WHERE id = ?", (now, owner, now, row["id"]))
+            db.commit()
+            return dict(row, owner=owner) if row is not None else None
+        finally:
+            db.close()
+
+    def finish(self, job_id, results, owner):
+        """Register the result arrays of a job in the result store and mark it done.
+
+        Nothing is marked if the job has meanwhile been recovered and claimed by another owner.
+        """
+        digests = {name: self.results_store.put_array(array) for name, array in results.items()}
+        db = self._connect()
+        try:
+            with db:
+                cursor = db.execute("UPDATE jobs SET state = 'done', finished = ?, error = NULL"
+                                    " WHERE id = ? AND state = 'running' AND owner = ?", (time.time(), job_id, owner))
+                if cursor.rowcount:
+                    db.executemany("INSERT OR REPLACE INTO results (job_id, name, digest) VALUES (?, ?, ?)",
+                                   [(job_id, name, digest) for name, digest in digests.items()])
+        finally:
+            db.close()
+
+    def fail(self, job_id, error, owner, retry=True):
+        """Re-queue a failed job while it has attempts left, otherwise mark it failed."""
+        self._execute(
+            "UPDATE jobs SET error = ?, finished = ?,"
+            " state = CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'failed' END"
+            " WHERE id = ? AND state = 'running' AND owner = ?",
+            (error, time.time(), retry, job_id, owner))
+
+    def cancel(self, job_id):
+        self._execute("UPDATE jobs SET state = 'cancelled', finished = ? WHERE id = ? AND state IN ('queued', 'running')",
+                      (time.time(), job_id))
+        self.discard_snapshot(job_id)
+
+    def heartbeat(self, owner):
+        """Show that owner is still running its jobs."""
+        self._execute("UPDATE jobs SET heartbeat = ? WHERE owner = ? AND state = 'running'", (time.time(), owner))
+
+    def release(self, owner):
+        """Re-queue the jobs owner is running, without counting the interrupted attempt."""
+        self._execute("UPDATE jobs SET state = 'queued', attempts = MAX(attempts - 1, 0)"
+                      " WHERE owner = ? AND state = 'running'", (owner,))
+
+    def recover(self, stale_after=30.0):
+        """Re-queue running jobs whose scheduler has not sent a heartbeat for stale_after seconds."""
+        self._execute("UPDATE jobs SET state = 'queued'"
+                      " WHERE state = 'running' AND (heartbeat IS NULL OR heartbeat < ?)", (time.time() - stale_after,))
+
+    def jobs(self, state=None):
+        if state:
+            rows = self._execute("SELECT * FROM jobs WHERE state = ? ORDER BY priority DESC, id", (state,))
+        else:
+            rows = self._execute("SELECT * FROM jobs ORDER BY id")
+        return [dict(row) for row in rows]
+
+    def job(self, job_id):
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return dict(rows[0]) if rows else None
+
+    def pending(self):
+        return self._execute("SELECT COUNT(*) FROM jobs WHERE state = 'queued'")[0][0]
+
+    def results(self, job_id):
+        """{name: array} registered for a job."""
+        rows = self._execute("SELECT name, digest FROM results WHERE job_id = ?", (job_id,))
+        return {row["name"]: self.results_store.get_array(row["digest"]) for row in rows}
+
+
+def _apply_overrides(project, overrides):
+    elements = {data["name"]: data for data in project["elements"]}
+    for target, value in overrides.items():
+        name, _, parameter = target.partition(".")
+        if name not in elements:
+            raise KeyError(f"No element {name} in the project")
+        elements[name][parameter] = value
+
+
+def _run_queued_job(queue_path, job):
+    """Worker process: run one job and record its result or error in the queue."""
+    job_queue = JobQueue(queue_path)
+    try:
+        from file_manager import FileManager
+        from transient_simulation import TransientSimulation
+        payload = json.loads(job["payload"])
+        project = FileManager().read_project(payload["project"])
+        _apply_overrides(project, payload.get("overrides", {}))
+        simulation = TransientSimulation(project)
+        H, Q = simulation.method_of_characteristics(payload.get("steps", 1))
+        job_queue.finish(job["id"], {"H": H, "Q": Q}, job["owner"])
+    except Exception:
+        job_queue.fail(job["id"], traceback.format_exc(), job["owner"])
+
+
+class Scheduler:
+    """Runs queued jobs on at most `workers` processes until stopped.
+
+    on_message(message, level) receives progress messages, from the scheduler's thread.
+    """
+
+    def __init__(self, job_queue, workers=None, poll_interval=1.0, heartbeat_interval=5.0, stale_after=30.0,
+                 on_message=None):
+        self.queue = job_queue
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)  # Leave a core for the GUI
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after  # Heartbeat age after which another scheduler's jobs are re-queued
+        self.on_message = on_message
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.context = multiprocessing.get_context("spawn")
+        self.running = {}  # Job id -> (job, process)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _message(self, message, level="info"):
+        if self.on_message:
+            self.on_message(message, level)
+
+    def start(self):
+        """Run in a background thread, e.g. inside the GUI."""
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name="batch-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self, cancel_running=False):
+        """Stop claiming jobs. Running jobs finish unless cancel_running is set."""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        if cancel_running:
+            for job, process in self.running.values():
+                process.terminate()
+                process.join()
+            if self.running:
+                self._message(f"{len(self.running)} batch job(s) interrupted; they run again when a scheduler starts.",
+                              "warning")
+            self.queue.release(self.owner)  # They run again next time
+            self.running.clear()
+
+    def run(self, until_idle=False):
+        last_heartbeat = 0.0
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            if now - last_heartbeat >= self.heartbeat_interval:
+                last_heartbeat = now
+                self.queue.heartbeat(self.owner)
+                self.queue.recover(self.stale_after)
+            self._reap()
+            self._enforce_limits()
+            while len(self.running) < self.workers:
+                job = self.queue.claim(self.owner)
+                if job is None:
+                    break
+                process = self.context.Process(target=_run_queued_job, args=(self.queue.path, job),
+                                               name=f"batch-job-{job['id']}", daemon=True)
+                process.start()
+                self.running[job["id"]] = (job, process)
+                self._message(f"Started job {job['id']}: {job['name']} (attempt {job['attempts'] + 1})")
+            if until_idle and not self.running and not self.queue.pending():
+                break
+            self.stopped.wait(self.poll_interval)
+
+    def _reap(self):
+        for job_id, (job, process) in list(self.running.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.running[job_id]
+            if process.exitcode != 0:
+                # Died before it could report, e.g. killed by the system
+                self.queue.fail(job_id, f"Worker exited with code {process.exitcode}", self.owner)
+            state = self.queue.job(job_id)["state"]
+            self.queue.discard_snapshot(job_id)
+            self._message(f"Job {job_id} {state}", "error" if state == "failed" else "info")
+
+    def _enforce_limits(self):
+        try:
+            import psutil
+        except ImportError:
+            psutil = None  # Memory limits need psutil; jobs then run without them
+        for job_id, (job, process) in list(self.running.items()):
+            if self.queue.job(job_id)["state"] == "cancelled":
+                process.terminate()
+                continue
+            limit = job["memory_limit_mb"]
+            if not limit or psutil is None:
+                continue
+            try:
+                rss = psutil.Process(process.pid).memory_info().rss
+            except psutil.Error:
+                continue  # Already exited
+            if rss > limit * (1 << 20):
+                process.terminate()
+                process.join()
+                del self.running[job_id]
+                # Not retried: it would need the same memory again
+                self.queue.fail(job_id, f"Memory limit of {limit} MB exceeded ({rss >> 20} MB)", self.owner, retry=False)
+                self.queue.discard_snapshot(job_id)
+                self._message(f"Job {job_id} stopped: memory limit exceeded", "error")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Airavata batch simulation queue.")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="queue database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def job_options(command):
+        command.add_argument("--steps", type=int, default=1000)
+        command.add_argument("--priority", type=int, default=0)
+        command.add_argument("--retries", type=int, default=2, help="runs after the first one fails")
+        command.add_argument("--memory-limit", type=int, help="MB; the job is stopped above it")
+
+    submit = commands.add_parser("submit", help="queue a project")
+    submit.add_argument("project")
+    job_options(submit)
+    sweep = commands.add_parser("sweep", help="queue one job per value of an element parameter")
+    sweep.add_argument("project")
+    sweep.add_argument("--parameter", required=True, help="Element_1.parameter")
+    sweep.add_argument("--values", type=float, nargs="+", required=True)
+    job_options(sweep)
+    commands.add_parser("list", help="show the jobs")
+    cancel = commands.add_parser("cancel", help="cancel a job")
+    cancel.add_argument("job_id", type=int)
+    run = commands.add_parser("run", help="run queued jobs")
+    run.add_argument("--workers", type=int)
+    run.add_argument("--until-idle", action="store_true", help="exit when the queue is empty")
+    args = parser.parse_args(argv)
+
+    job_queue = JobQueue(args.queue)
+    if args.command in ("submit", "sweep"):
+        options = {"priority": args.priority, "max_attempts": args.retries + 1, "memory_limit_mb": args.memory_limit}
+        project = os.path.abspath(args.project)
+        if args.command == "submit":
+            ids = [job_queue.submit(os.path.basename(project), {"project": project, "steps": args.steps}, **options)]
+        else:
+            ids = job_queue.submit_sweep(project, args.parameter, args.values, args.steps, **options)
+        print(f"Queued {len(ids)} job(s): {', '.join(map(str, ids))}")
+    elif args.command == "list":
+        for job in job_queue.jobs():
+            print(f"{job['id']:5}  {job['state']:9}  priority {job['priority']:3}  attempts {job['attempts']}  {job['name']}")
+    elif args.command == "cancel":
+        job_queue.cancel(args.job_id)
+    else:
+        try:
+            Scheduler(job_queue, args.workers, on_message=lambda message, level: print(message)).run(
+                until_idle=args.until_idle)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Benchmarks of the solver, project I/O, canvas loading and export on synthetic networks.
+
+Run with `python -m benchmarks.run`; results are appended to benchmarks/history.json and
+compared with the previous run.
+"""
@@ -0,0 +1,96 @@
+"""Synthetic projects in the {"elements": [...], "connections": [...]} file format.
+
+Elements carry only class, name and position, so every parameter takes its schema default
+when loaded. Networks are laid out left to right on a grid with SPACING between elements.
+"""
+from connection_graph import INLET, OUTLET
+
+
+SPACING = 120
+
+
+class NetworkBuilder:
+    def __init__(self):
+        self.elements = []
+        self.connections = []
+        self.counts = {}
+
+    def add(self, element_class, column, row):
+        number = self.counts.get(element_class, 0) + 1
+        self.counts[element_class] = number
+        name = f"{element_class}_{number}"
+        self.elements.append({"class": element_class, "name": name, "x": column * SPACING, "y": row * SPACING})
+        return name
+
+    def connect(self, source, target):
+        self.connections.append({"from": source, "from_port": OUTLET, "to": target, "to_port": INLET})
+
+    def chain(self, names):
+        for source, target in zip(names, names[1:]):
+            self.connect(source, target)
+
+    def project(self):
+        return {"elements": self.elements, "connections": self.connections}
+
+
+def single_pipe(builder=None, row=0, column=0):
+    builder = builder or NetworkBuilder()
+    builder.chain([builder.add("InletReservoir", column, row), builder.add("Pipe", column + 1, row),
+                   builder.add("OutletReservoir", column + 2, row)])
+    return builder
+
+
+def reservoir_pipe_valve(builder=None, row=0, column=0):
+    builder = builder or NetworkBuilder()
+    builder.chain([builder.add("InletReservoir", column, row), builder.add("Pipe", column + 1, row),
+                   builder.add("Valve", column + 2, row), builder.add("Pipe", column + 3, row),
+                   builder.add("OutletReservoir", column + 4, row)])
+    return builder
+
+
+def branched_manifold(branches=4, builder=None, row=0, column=0):
+    """A reservoir feeding a manifold whose branches each end in a valve and a reservoir."""
+    builder = builder or NetworkBuilder()
+    manifold = builder.add("Manifold", column + 2, row)
+    builder.chain([builder.add("InletReservoir", column, row), builder.add("Pipe", column + 1, row), manifold])
+    for branch in range(branches):
+        pipe = builder.add("Pipe", column + 3, row + branch)
+        builder.connect(manifold, pipe)
+        builder.chain([pipe, builder.add("Valve", column + 4, row + branch),
+                       builder.add("OutletReservoir", column + 5, row + branch)])
+    return builder
+
+
+def turbine_plant(units=3, builder=None, row=0, column=0):
+    """Headrace, surge tank and penstock manifold feeding several turbine units."""
+    builder = builder or NetworkBuilder()
+    manifold = builder.add("Manifold", column + 4, row)
+    builder.chain([builder.add("InletReservoir", column, row), builder.add("Pipe", column + 1, row),
+                   builder.add("SurgeTank", column + 2, row), builder.add("Pipe", column + 3, row), manifold])
+    for unit in range(units):
+        pipe = builder.add("Pipe", column + 5, row + unit)
+        builder.connect(manifold, pipe)
+        builder.chain([pipe, builder.add("Valve", column + 6, row + unit), builder.add("Turbine", column + 7, row + unit),
+                       builder.add("Pipe", column + 8, row + unit), builder.add("OutletReservoir", column + 9, row + unit)])
+    return builder
+
+
+def scaled_network(element_count):
+    """Turbine plants side by side until the network has at least element_count elements."""
+    builder = NetworkBuilder()
+    plant = 0
+    while len(builder.elements) < element_count:
+        # Ten plants per band of rows, so large networks stay roughly square
+        turbine_plant(3, builder, row=(plant // 10) * 4, column=(plant % 10) * 11)
+        plant += 1
+    return builder
+
+
+def cases(scales=(100, 1000, 10000, 100000)):
+    """(name, project) for the named networks and for each scale."""
+    yield "single_pipe", single_pipe().project()
+    yield "reservoir_pipe_valve", reservoir_pipe_valve().project()
+    yield "branched_manifold", branched_manifold(8).project()
+    yield "turbine_plant", turbine_plant(4).project()
+    for count in scales:
+        yield f"scaled_{count}", scaled_network(count).project()
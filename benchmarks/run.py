@@ -0,0 +1,229 @@
+"""Time the main code paths on every synthetic network and keep a history of the results.
+
+    python -m benchmarks.run [--scales 100 1000 10000 100000] [--no-gui] [--fail-on-regression]
+
+Each benchmark reports the best of --repeats runs in seconds. A run is appended to the
+history file and compared with the latest earlier run from the same machine and Python
+version; benchmarks slower by more than --threshold are reported as regressions.
+
+The solver has no steady-state solution yet, so "model_build" times what precedes it in
+this tree: creating every element with its parameters and connecting the graph.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from benchmarks.networks import cases
+from connection_graph import ConnectionGraph
+from element import element_registry
+from export_pipeline import chunked, export_results
+from file_manager import FileManager
+from transient_simulation import TransientSimulation
+
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.json")
+PIPE_SEGMENTS = 10  # Computational nodes per pipe in the solver benchmark
+SOLVER_STEPS = 10
+
+
+def best_of(repeats, run, setup=None):
+    """Best wall time of run() over repeats calls; setup() runs untimed before each."""
+    best = float("inf")
+    for _ in range(repeats):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def build_model(project):
+    elements = {}
+    for data in project["elements"]:
+        element = element_registry[data["class"]](None, data["name"])
+        element.load_from_data(data)
+        elements[data["name"]] = element
+    graph = ConnectionGraph()
+    for connection in project["connections"]:
+        graph.connect(elements[connection["from"]], connection["from_port"],
+                      elements[connection["to"]], connection["to_port"])
+    return elements, graph
+
+
+def make_simulation(project):
+    classes = [data["class"] for data in project["elements"]]
+    nodes = max(classes.count("Pipe") * PIPE_SEGMENTS, 2)
+    simulation = TransientSimulation()
+    simulation.data = {"H_initial": np.linspace(100.0, 0.0, nodes), "Q_initial": np.ones(nodes)}
+    # One vectorized update per boundary type present in the network
+    for kind in sorted(set(classes) - {"Pipe", "Manifold"}):
+        simulation.boundaries.append((kind, lambda H, Q: np.multiply(Q, 1.0, out=Q)))
+    simulation.junctions.append(lambda H, Q: np.add(H, 0.0, out=H))
+    return simulation
+
+
+def benchmark_case(project, folder, repeats, gui_root):
+    results = {}
+    file_manager = FileManager(folder)
+    elements = project["elements"]
+    connections = project["connections"]
+    # The largest networks are timed once; repeating them only makes the run longer
+    repeats = repeats if len(elements) <= 10000 else 1
+
+    results["model_build"] = best_of(repeats, lambda: build_model(project))
+
+    simulation = make_simulation(project)
+    results["transient_step"] = best_of(repeats, lambda: simulation.method_of_characteristics(SOLVER_STEPS)) / SOLVER_STEPS
+
+    for ext in (".json", ".avp"):
+        path = os.path.join(folder, "project" + ext)
+        with contextlib.redirect_stdout(io.StringIO()):  # save_elements reports every save
+            results["save" + ext.replace(".", "_")] = best_of(
+                repeats, lambda: file_manager.save_elements(path, elements, connections))
+        results["load" + ext.replace(".", "_")] = best_of(
+            repeats, lambda: list(file_manager.stream_project(path)[0]))
+
+    if gui_root is not None:
+        from whiteboard import Whiteboard
+        whiteboard = Whiteboard(gui_root, folder)
+        whiteboard.pack()
+
+        def load_canvas():
+            whiteboard.load_elements(elements)
+            whiteboard.load_connections(connections)
+            gui_root.update_idletasks()
+
+        results["canvas_load"] = best_of(repeats, load_canvas, setup=whiteboard.clear)
+        whiteboard.clear()
+        whiteboard.destroy()
+
+    rows = min(len(elements) * 100, 2000000)
+    columns = {"H": np.linspace(0.0, 1.0, rows), "Q": np.linspace(1.0, 0.0, rows)}
+    csv_path = os.path.join(folder, "results.csv")
+    results["export_csv"] = best_of(repeats, lambda: export_results(chunked(columns), csv_path))
+    return results
+
+
+def start_virtual_display():
+    """Start Xvfb if there is no display; returns the process, or None."""
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None
+    display = ":97"
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1280x1024x24"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(0.5)  # Give the server time to accept connections
+    return process
+
+
+def open_gui_root():
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Skipping canvas benchmarks: {e}")
+        return None
+    root.withdraw()
+    return root
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(HISTORY_PATH), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_history(path):
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return []
+
+
+def compare(previous, results, threshold):
+    """Print each benchmark against the previous run; returns the regressions found."""
+    regressions = []
+    for case, benchmarks in results.items():
+        for name, seconds in benchmarks.items():
+            old = previous.get(case, {}).get(name) if previous else None
+            if old:
+                ratio = seconds / old
+                flag = ""
+                # Differences under a millisecond are noise, not regressions
+                if ratio > 1 + threshold and seconds - old > 1e-3:
+                    flag = "  REGRESSION"
+                    regressions.append((case, name, ratio))
+                print(f"{case:24} {name:16} {seconds * 1000:12.3f} ms  x{ratio:5.2f}{flag}")
+            else:
+                print(f"{case:24} {name:16} {seconds * 1000:12.3f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Airavata on synthetic networks.")
+    parser.add_argument("--scales", type=int, nargs="*", default=[100, 1000, 10000, 100000],
+                        help="element counts of the scaled networks")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--no-gui", action="store_true", help="skip the canvas benchmarks")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    display = None if args.no_gui else start_virtual_display()
+    gui_root = None if args.no_gui else open_gui_root()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            for name, project in cases(args.scales):
+                if args.only and args.only not in name:
+                    continue
+                results[name] = benchmark_case(project, folder, args.repeats, gui_root)
+    finally:
+        if gui_root is not None:
+            gui_root.destroy()
+        if display is not None:
+            display.terminate()
+
+    run = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": git_commit(),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    history = read_history(args.history)
+    previous = next((old for old in reversed(history)
+                     if old["machine"] == run["machine"] and old["python"] == run["python"]), None)
+    regressions = compare(previous["results"] if previous else None, results, args.threshold)
+    history.append(run)
+    with open(args.history, "w") as file:
+        json.dump(history, file, indent=4)
+
+    if regressions:
+        print(f"{len(regressions)} regressions against the run of {previous['time']} ({previous['commit']}).")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
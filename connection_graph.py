@@ -0,0 +1,159 @@
+"""Connection topology between element ports, updated incrementally as the network is edited."""
+
+
+INLET = "inlet"
+OUTLET = "outlet"
+
+
+class ConnectionGraph:
+    """Edges are stored as parallel arrays indexed by edge id; freed ids are reused.
+
+    Each edge runs from a source (element, port) to a destination (element, port).
+    `adjacency` maps an element to the ids of its edges and `port_edges` maps an
+    (element, port) pair to the ids of the edges attached to that port, so every
+    edit only touches the elements and ports involved.
+    """
+
+    def __init__(self):
+        # Edge arrays, one slot per edge id
+        self.edge_src = []
+        self.edge_src_port = []
+        self.edge_dst = []
+        self.edge_dst_port = []
+        self.free_edges = []  # Ids of removed edges, reused by connect()
+
+        self.adjacency = {}  # element -> list of edge ids
+        self.port_edges = {}  # (element, port) -> list of edge ids
+        self.dirty = set()  # Elements whose connections changed since the last validation
+
+    def __len__(self):
+        return len(self.edge_src) - len(self.free_edges)
+
+    def add_element(self, element):
+        self.adjacency.setdefault(element, [])
+        self.dirty.add(element)
+
+    def connect(self, src, src_port, dst, dst_port):
+        """Connect two ports and return the new edge id."""
+        if src is dst:
+            raise ValueError("An element cannot be connected to itself.")
+        if self.find_edge(src, src_port, dst, dst_port) is not None:
+            raise ValueError(f"{src.name} is already connected to {dst.name}.")
+
+        if self.free_edges:
+            edge = self.free_edges.pop()
+            self.edge_src[edge] = src
+            self.edge_src_port[edge] = src_port
+            self.edge_dst[edge] = dst
+            self.edge_dst_port[edge] = dst_port
+        else:
+            edge = len(self.edge_src)
+            self.edge_src.append(src)
+            self.edge_src_port.append(src_port)
+            self.edge_dst.append(dst)
+            self.edge_dst_port.append(dst_port)
+
+        for element, port in ((src, src_port), (dst, dst_port)):
+            self.adjacency.setdefault(element, []).append(edge)
+            self.port_edges.setdefault((element, port), []).append(edge)
+            self.dirty.add(element)
+        return edge
+
+    def disconnect(self, edge):
+        """Remove a single edge."""
+        src, dst = self.edge_src[edge], self.edge_dst[edge]
+        for element, port in ((src, self.edge_src_port[edge]), (dst, self.edge_dst_port[edge])):
+            self.adjacency[element].remove(edge)
+            edges = self.port_edges[(element, port)]
+            edges.remove(edge)
+            if not edges:
+                del self.port_edges[(element, port)]
+            self.dirty.add(element)
+
+        self.edge_src[edge] = self.edge_dst[edge] = None
+        self.edge_src_port[edge] = self.edge_dst_port[edge] = None
+        self.free_edges.append(edge)
+
+    def remove_element(self, element):
+        """Drop an element and all of its edges; returns the removed edge ids."""
+        edges = list(self.adjacency.get(element, []))
+        for edge in edges:
+            self.disconnect(edge)
+        self.adjacency.pop(element, None)
+        self.dirty.discard(element)
+        return edges
+
+    def clear(self):
+        for edges in (self.edge_src, self.edge_src_port, self.edge_dst, self.edge_dst_port, self.free_edges):
+            edges.clear()
+        self.adjacency.clear()
+        self.port_edges.clear()
+        self.dirty.clear()
+
+    def find_edge(self, src, src_port, dst, dst_port):
+        for edge in self.port_edges.get((src, src_port), []):
+            if self.edge_dst[edge] is dst and self.edge_dst_port[edge] == dst_port:
+                return edge
+        return None
+
+    def edges_of(self, element):
+        return self.adjacency.get(element, [])
+
+    def endpoints(self, edge):
+        return self.edge_src[edge], self.edge_src_port[edge], self.edge_dst[edge], self.edge_dst_port[edge]
+
+    def edges(self):
+        """Iterate over the ids of all live edges."""
+        return (edge for edge, src in enumerate(self.edge_src) if src is not None)
+
+    def neighbors(self, element):
+        for edge in self.adjacency.get(element, []):
+            src, dst = self.edge_src[edge], self.edge_dst[edge]
+            yield dst if src is element else src
+
+    def validate(self, elements=None):
+        """Return the (element, port) pairs left unconnected.
+
+        Only elements changed since the previous call are checked unless an
+        explicit iterable of elements is given.
+        """
+        if elements is None:
+            elements, self.dirty = self.dirty, set()
+        open_ports = []
+        for element in elements:
+            for port in (INLET, OUTLET):
+                if (element, port) not in self.port_edges:
+                    open_ports.append((element, port))
+        return open_ports
+
+    def components(self):
+        """Group the elements into connected sub-networks."""
+        seen = set()
+        groups = []
+        for start in self.adjacency:
+            if start in seen:
+                continue
+            seen.add(start)
+            group, stack = [], [start]
+            while stack:
+                element = stack.pop()
+                group.append(element)
+                for neighbor in self.neighbors(element):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        stack.append(neighbor)
+            groups.append(group)
+        return groups
+
+    def edge_data(self, edge):
+        """Serialize one edge by element name."""
+        return {
+            "from": self.edge_src[edge].name,
+            "from_port": self.edge_src_port[edge],
+            "to": self.edge_dst[edge].name,
+            "to_port": self.edge_dst_port[edge],
+        }
+
+    def to_data(self):
+        """Serialize the live edges by element name."""
+        return [self.edge_data(edge) for edge in self.edges()]
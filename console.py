@@ -1,16 +1,28 @@
 import tkinter as tk
 from tkinter import scrolledtext, filedialog
-from datetime import datetime
 import json  # Add this import statement
+import queue
+import time
 import tkinter.filedialog as filedialog
+from log_index import LogIndex, words
+from run_log import format_record as json_record
 # other imports...
 
 class Console:
-    def __init__(self, parent):
+    def __init__(self, parent, capacity=100000, max_lines=5000, interval_ms=50, run_log=None):
         # Console frame
         self.frame = tk.Frame(parent, bg="#333")
         self.frame.pack(fill=tk.X, padx=10, pady=5)
-        self.logs = []  # Initialize logs as an empty list
+        # Ring buffer of (time, level, message) records, indexed by level and by word;
+        # the oldest are dropped when full
+        self.index = LogIndex(capacity)
+        self.query = ""  # Current search; only matching records are shown while it is set
+        self.max_lines = max_lines  # Lines kept in the text widget
+        self.interval_ms = interval_ms
+        # Messages logged from any thread wait here until the Tk loop drains them
+        self.pending = queue.SimpleQueue()
+        self._second = None  # (whole second, formatted) of the last timestamp formatted
+        self.run_log = run_log  # Every record is also written to this RunLog, if given
 
         # Console text area
         self.console = scrolledtext.ScrolledText(self.frame, wrap=tk.WORD, height=8, bg="#1e1e1e", fg="white", font=("Segoe UI", 10), state="disabled")
@@ -49,17 +61,72 @@ class Console:
         self.search_entry.pack(side=tk.LEFT, padx=5)
         self.search_entry.bind("<Return>", self.search)
 
+        self.frame.after(self.interval_ms, self._drain)
+
     def log(self, message, level="info"):
-        """Logs a message with a specified level."""
+        """Logs a message with a specified level. Safe to call from any thread."""
+        record = (time.time(), level, message)
+        self.pending.put(record)
+        if self.run_log:
+            self.run_log.write(record)
+
+    def _timestamp(self, seconds):
+        # Many records share a second, so the formatted text is reused
+        second = int(seconds)
+        if self._second is None or self._second[0] != second:
+            self._second = (second, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second)))
+        return self._second[1]
+
+    def format_record(self, record):
+        seconds, level, message = record
+        return f"[{self._timestamp(seconds)}] [{level.upper()}] {message}\n"
+
+    def _drain(self, max_batch=200000):
+        """Move queued messages into the ring buffer and show them with one insert."""
+        batch = []
+        try:
+            while len(batch) < max_batch:
+                batch.append(self.pending.get_nowait())
+        except queue.Empty:
+            pass
+        full = len(batch) == max_batch
+        if batch:
+            self.index.extend(batch)
+            level = self.log_level.get().lower()
+            if level != "all" or self.query:
+                batch = [record for record in batch if self.index.matches(record, level, self.query)]
+            self._show(batch[-self.max_lines:])
+        if not full:
+            self.index.index_words(limit=10000)  # Spare time: keep the search index up to date
+        # Come back at once if messages are arriving faster than one batch per tick
+        self.frame.after(1 if full else self.interval_ms, self._drain)
+
+    def _show(self, records):
+        """Append records to the text widget, then trim it to max_lines."""
+        if not records:
+            return
+        # Consecutive records of one level become a single (text, tag) pair
+        chunks = []
+        lines = []
+        for record in records:
+            if lines and record[1] != chunks[-1]:
+                chunks[-2] = "".join(lines)
+                lines = []
+            if not lines:
+                chunks += [None, record[1]]
+            lines.append(self.format_record(record))
+        chunks[-2] = "".join(lines)
+
         self.console.config(state="normal")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        formatted_message = f"[{timestamp}] [{level.upper()}] {message}\n"
-        self.console.insert(tk.END, formatted_message, level)
-        self.console.yview(tk.END)
+        start = self.console.index("end-1c")
+        self.console.insert(tk.END, *chunks)
+        if self.query:
+            self._highlight(start)
+        line_count = int(self.console.index("end-1c").split(".")[0])
+        if line_count > self.max_lines + 1:
+            self.console.delete("1.0", f"{line_count - self.max_lines}.0")
         self.console.config(state="disabled")
-        
-        # Store the log message in self.logs
-        self.logs.append((timestamp, level, message))
+        self.console.yview(tk.END)
 
 
     def clear(self):
@@ -70,40 +137,38 @@ class Console:
 
     def export_logs(self):
         """Exports console logs to a file."""
-        file_path = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("JSON lines", "*.jsonl"), ("All files", "*.*")])
         if file_path:
+            # From the ring buffer: the text widget only holds the last max_lines
+            format_record = json_record if file_path.lower().endswith(".jsonl") else self.format_record
             with open(file_path, "w") as file:
-                logs = self.console.get("1.0", tk.END).strip()
-                file.write(logs)
+                file.writelines(format_record(record) for record in self.index.records())
             self.log("Logs exported successfully.", level="success")
 
     def apply_filter(self, event=None):
-        """Applies a filter to show only selected log levels."""
+        """Shows the newest records of the selected level that match the current search."""
         level = self.log_level.get().lower()
         self.console.config(state="normal")
         self.console.delete(1.0, tk.END)
-
-        for line in self.logs:
-            timestamp, log_level, message = line
-            if level == "all" or log_level == level:
-                tag = log_level
-                formatted_message = f"[{timestamp}] [{log_level.upper()}] {message}\n"
-                self.console.insert(tk.END, formatted_message, tag)
-
         self.console.config(state="disabled")
-        self.console.yview(tk.END)
+
+        # Only the records that fit in the widget are looked up, through the indexes
+        self._show(self.index.query(level, self.query, limit=self.max_lines))
 
     def search(self, event=None):
-        """Searches the console logs for a query."""
-        query = self.search_entry.get().strip().lower()
-        if query:
-            self.console.tag_remove("highlight", "1.0", tk.END)
-            start_pos = "1.0"
+        """Shows only the records whose words start with the query's words, highlighted; an empty query shows all."""
+        self.query = self.search_entry.get().strip()
+        self.apply_filter()
+
+    def _highlight(self, start):
+        """Highlights the query's words where they start a word, from start to the end."""
+        self.console.tag_config("highlight", background="yellow", foreground="black")
+        for word in words(self.query):  # Only word characters, so no regexp escaping is needed
+            start_pos = start
             while True:
-                start_pos = self.console.search(query, start_pos, stopindex=tk.END, nocase=True)
+                start_pos = self.console.search(r"\m" + word, start_pos, stopindex=tk.END, nocase=True, regexp=True)
                 if not start_pos:
                     break
-                end_pos = f"{start_pos}+{len(query)}c"
+                end_pos = f"{start_pos}+{len(word)}c"
                 self.console.tag_add("highlight", start_pos, end_pos)
                 start_pos = end_pos
-            self.console.tag_config("highlight", background="yellow", foreground="black")
@@ -1,12 +1,69 @@
 import tkinter as tk
-from PIL import Image, ImageTk  # To load and resize images for icons
+from tkinter import messagebox, ttk
 import os
 import json  # Add this import statement
+import numpy as np
 import tkinter.filedialog as filedialog
+from viewport import Viewport
+from parameter_store import Parameter, ParameterStore, StoredParameter
 # other imports...
 
 
+# Element classes by name, filled in as subclasses are defined
+element_registry = {}
+
+# Decoded and resized icons shared by every element, keyed by (path, size)
+_icon_cache = {}
+_decoded_icons = {}  # Resized PIL images; unlike PhotoImages these can be made off the Tk thread
+
+
+def decode_icon(icon_path, size):
+    """Return icon_path decoded and resized to size; safe to call from a background thread."""
+    key = (icon_path, size)
+    img = _decoded_icons.get(key)
+    if img is None:
+        from PIL import Image  # Imported on first use, to keep it out of application startup
+        img = Image.open(icon_path)
+        img = img.resize(size, Image.LANCZOS)
+        _decoded_icons[key] = img
+    return img
+
+
+def load_icon(icon_path, size):
+    """Return a PhotoImage for icon_path at size, decoding each (path, size) only once."""
+    key = (icon_path, size)
+    icon = _icon_cache.get(key)
+    if icon is None:
+        from PIL import ImageTk
+        icon = ImageTk.PhotoImage(decode_icon(icon_path, size))
+        _icon_cache[key] = icon
+    return icon
+
+
+
 class Element:
+    glyph_color = "#888888"  # Fill colour of the zoomed-out glyph
+    parameters = ()  # Parameter schema; values are kept in the element type's ParameterStore
+    store = None
+    dialog_size = (400, 400)  # Properties dialog width, height
+    image_size = (200, 150)  # Size of the picture shown in the properties dialog
+
+    # Elements carry no per-instance __dict__; parameter values live in the store
+    __slots__ = (
+        "canvas", "name", "x", "y", "label", "icon_path", "icon", "image_path",
+        "inlet_port", "outlet_port", "label_id", "selected", "rect_item", "icon_item",
+        "highlight_rect", "glyph_item", "viewport", "on_move", "on_property_change", "row",
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        element_registry[cls.__name__] = cls  # Saved files refer to element types by class name
+        # Each type declaring parameters gets its own store and one attribute per parameter
+        if "parameters" in cls.__dict__:
+            cls.store = ParameterStore(cls.parameters)
+            for parameter in cls.parameters:
+                setattr(cls, parameter.name, StoredParameter(parameter.name))
+
     def __init__(self, canvas, name, icon_path):
         self.canvas = canvas
         self.name = name
@@ -22,14 +79,49 @@ class Element:
         self.rect_item = None  # Initialize rect_item for rectangle
         self.icon_item = None  # Icon item for the canvas
         self.highlight_rect = None  # Highlight rectangle
+        self.glyph_item = None  # Simplified rectangle drawn when zoomed out
+        self.viewport = Viewport()  # Viewport the element was last drawn with
+        self.on_move = None  # Callback(element, dx, dy) fired while the element is dragged
+        self.on_property_change = None  # Callback(element, attribute, old, new) fired on edits
+        self.image_path = None  # Picture shown in the properties dialog
+        self.row = self.store.allocate() if self.store else None  # Row in the parameter store
+
+    def release_parameters(self):
+        """Return the parameter row to the store once the element has left the model."""
+        if self.store and self.row is not None:
+            self.store.release(self.row)
+            self.row = None
+
+    def parameter_data(self):
+        """Return the parameter values for saving; unset values are written as null."""
+        return self.store.export_row(self.row) if self.store else {}
+
+    def load_parameters(self, data):
+        """Load parameter values, accepting the text values written by older versions."""
+        if self.store:
+            for error in self.store.import_row(self.row, data):
+                print(f"Ignoring invalid value in {self.name}: {error}")
+
+    def parse_property(self, attribute, value):
+        """Validate and convert a value for a stored parameter; other attributes pass through."""
+        if self.store and attribute in self.store.parameters:
+            return self.store.parameters[attribute].parse(value)
+        return value
+
+    def display_value(self, attribute):
+        """Return the text shown in a dialog entry; unset parameters are shown empty."""
+        if self.store and attribute in self.store.parameters:
+            return self.store.parameters[attribute].display(getattr(self, attribute))
+        return getattr(self, attribute, "")
 
     def to_data(self):
         """Returns the element's data as a dictionary for saving."""
         return {
-            "class": "Element:",
+            "class": type(self).__name__,
             "name": self.name,
             "x": self.x,
-            "y": self.y
+            "y": self.y,
+            **self.parameter_data(),
         }
 
     def load_from_data(self, data):
@@ -37,36 +129,62 @@ class Element:
         self.name = data["name"]
         self.x = data["x"]
         self.y = data["y"]
-        # Implement the logic to re-create the element on the canvas
-
-        # Bind canvas click event to remove highlight when clicking outside
-        self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.load_parameters(data)
 
-    def create(self):
+    def create(self, viewport=None):
         """Create the element on the canvas."""
-        # Load and resize the icon
-        img = Image.open(self.icon_path)
-        img = img.resize((60, 40), Image.LANCZOS)  # Resize the icon to fit the element
-        self.icon = ImageTk.PhotoImage(img)
+        self.viewport = viewport or Viewport()
+        zoom = self.viewport.zoom
+        cx, cy = self.viewport.to_canvas(self.x, self.y)
+
+        # Load and resize the icon through the shared cache
+        self.icon = load_icon(self.icon_path, (max(1, round(60 * zoom)), max(1, round(40 * zoom))))
         
         # Create the element icon on the canvas
-        self.icon_item = self.canvas.create_image(self.x + 30, self.y + 20, image=self.icon)
-        self.label_id = self.canvas.create_text(self.x + 30, self.y - 10, text=self.label, fill="black")
+        self.icon_item = self.canvas.create_image(cx + 30 * zoom, cy + 20 * zoom, image=self.icon)
+        self.label_id = self.canvas.create_text(cx + 30 * zoom, cy - 10 * zoom, text=self.label, fill="black")
         
         # Create ports (inlet and outlet)
-        self.inlet_port = self.canvas.create_rectangle(self.x - 10, self.y + 20, self.x, self.y + 30, fill="black")
-        self.outlet_port = self.canvas.create_rectangle(self.x + 50, self.y + 20, self.x + 60, self.y + 30, fill="white")
+        self.inlet_port = self.canvas.create_rectangle(cx - 10 * zoom, cy + 20 * zoom, cx, cy + 30 * zoom, fill="black")
+        self.outlet_port = self.canvas.create_rectangle(cx + 50 * zoom, cy + 20 * zoom, cx + 60 * zoom, cy + 30 * zoom, fill="white")
         
         # Create a rectangle to highlight the element on click, properly aligned around the icon
         self.rect_item = self.canvas.create_rectangle(
-            self.x, self.y, self.x + 60, self.y + 40, outline="blue", width=2, state="hidden"
+            cx, cy, cx + 60 * zoom, cy + 40 * zoom, outline="blue", width=2, state="hidden"
         )
 
         # Bind mouse events for interaction
-        self.canvas.tag_bind(self.icon_item, "<Button-1>", self.on_click)
-        self.canvas.tag_bind(self.icon_item, "<Double-1>", self.on_double_click)
-        self.canvas.tag_bind(self.icon_item, "<B1-Motion>", self.on_drag_motion)  # Bind drag motion
-        self.canvas.tag_bind(self.icon_item, "<ButtonRelease-1>", self.on_drag_release)  # Release drag
+        self.bind_item(self.icon_item)
+
+    def create_glyph(self, viewport):
+        """Create the simplified zoomed-out representation: one rectangle, no label or ports."""
+        self.viewport = viewport
+        cx, cy = viewport.to_canvas(self.x, self.y)
+        zoom = viewport.zoom
+        self.glyph_item = self.canvas.create_rectangle(
+            cx, cy, cx + 60 * zoom, cy + 40 * zoom, fill=self.glyph_color, outline=""
+        )
+        self.bind_item(self.glyph_item)
+
+    def bind_item(self, item):
+        """Bind selection, dragging and the properties dialog to a canvas item."""
+        self.canvas.tag_bind(item, "<Button-1>", self.on_click)
+        self.canvas.tag_bind(item, "<Double-1>", self.on_double_click)
+        self.canvas.tag_bind(item, "<B1-Motion>", self.on_drag_motion)  # Bind drag motion
+        self.canvas.tag_bind(item, "<ButtonRelease-1>", self.on_drag_release)  # Release drag
+
+    def canvas_items(self):
+        """Return the ids of every canvas item currently drawn for this element."""
+        items = (self.icon_item, self.label_id, self.inlet_port, self.outlet_port,
+                 self.rect_item, self.highlight_rect, self.glyph_item)
+        return [item for item in items if item]
+
+    def remove_from_canvas(self):
+        """Delete the element's canvas items; the element itself stays in the model."""
+        for item in self.canvas_items():
+            self.canvas.delete(item)
+        self.icon_item = self.label_id = self.inlet_port = self.outlet_port = None
+        self.rect_item = self.highlight_rect = self.glyph_item = None
 
     def apply_highlight(self):
         """Apply highlight to the element."""
@@ -96,88 +214,159 @@ class Element:
         
         # Create a highlight rectangle if not already created
         if not self.highlight_rect:
-            self.highlight_rect = self.canvas.create_rectangle(self.x - 20, self.y - 20, self.x + 80, self.y + 60, outline="blue", width=2)
+            cx, cy = self.viewport.to_canvas(self.x, self.y)
+            zoom = self.viewport.zoom
+            self.highlight_rect = self.canvas.create_rectangle(cx - 20 * zoom, cy - 20 * zoom, cx + 80 * zoom, cy + 60 * zoom, outline="blue", width=2)
 
         # Show rectangle on click and highlight it
         self.canvas.itemconfig(self.highlight_rect, state="normal")  # Show the highlight rectangle
 
     def on_drag_motion(self, event):
         """Handle dragging motion of the element."""
-        dx = event.x - self.x - 30  # Calculate the offset for movement
-        dy = event.y - self.y - 20
+        mx, my = self.viewport.to_model(event.x, event.y)
+        new_x = mx - 30
+        new_y = my - 20
+        dx = (new_x - self.x) * self.viewport.zoom  # Calculate the offset for movement
+        dy = (new_y - self.y) * self.viewport.zoom
         
-        # Move the icon
-        self.canvas.move(self.icon_item, dx, dy)
-        self.canvas.move(self.label_id, dx, dy)
-        self.canvas.move(self.inlet_port, dx, dy)
-        self.canvas.move(self.outlet_port, dx, dy)
-        self.canvas.move(self.rect_item, dx, dy)  # Move the rectangle along with the icon
+        # Move every drawn item (icon, label, ports, rectangles or glyph)
+        for item in self.canvas_items():
+            self.canvas.move(item, dx, dy)
         
         # Update the position of the element
-        self.x = event.x - 30
-        self.y = event.y - 20
-
-        # Move the highlight rectangle to the new position as well
-        if self.highlight_rect:
-            self.canvas.coords(self.highlight_rect, self.x - 20, self.y - 20, self.x + 80, self.y + 60)
+        model_dx, model_dy = new_x - self.x, new_y - self.y
+        self.x = new_x
+        self.y = new_y
+        if self.on_move:
+            self.on_move(self, model_dx, model_dy)
 
     def on_drag_release(self, event):
         """Handle drag release."""
         # Once drag is released, update the element's position
-        self.x = event.x - 30
-        self.y = event.y - 20
+        mx, my = self.viewport.to_model(event.x, event.y)
+        model_dx, model_dy = mx - 30 - self.x, my - 20 - self.y
+        self.x = mx - 30
+        self.y = my - 20
+        if self.on_move and (model_dx or model_dy):
+            self.on_move(self, model_dx, model_dy)
+
+    def set_property(self, attribute, value):
+        """Set a property and report the change (old, new) to the listener."""
+        value = self.parse_property(attribute, value)
+        old = getattr(self, attribute, None)
+        if old == value or (old != old and value != value):  # NaN marks an unset parameter
+            return
+        setattr(self, attribute, value)
+        if self.on_property_change:
+            self.on_property_change(self, attribute, old, value)
 
     def on_double_click(self, event):
         """Handle double-click events (open properties dialog)."""
         print(f"Double-clicked: {self.label}")
         self.open_properties_dialog()
 
+
     def open_properties_dialog(self):
-        """Open a dialog to edit properties of the element."""
+        """Open a centered dialog generated from the element's parameter schema."""
         dialog = tk.Toplevel(self.canvas)
         dialog.title(f"Properties of {self.label}")
+        dialog.transient(self.canvas.winfo_toplevel())  # Associate with the main window
+        dialog.grab_set()  # Prevent interaction with other windows until this one is closed
+        dialog.focus_set()  # Automatically focus on the dialog
 
-        # Header
-        tk.Label(dialog, text=f"Edit properties of {self.label}").pack()
+        # Set size and center the dialog
+        width, height = self.dialog_size
+        x = (dialog.winfo_screenwidth() // 2) - (width // 2)
+        y = (dialog.winfo_screenheight() // 2) - (height // 2)
+        dialog.geometry(f"{width}x{height}+{x}+{y}")
+        dialog.resizable(False, False)  # Disable resizing
+
+        # Add padding and a header
+        header_frame = tk.Frame(dialog, bg="#f0f0f0", pady=10)
+        header_frame.pack(fill=tk.X)
+        tk.Label(header_frame, text=f"Properties of {self.label}", font=("Helvetica", 14, "bold"), bg="#f0f0f0").pack()
 
-        # Dictionary to store user input fields
+        # Display image
+        image_frame = tk.Frame(dialog, pady=10, bg="#ffffff")
+        image_frame.pack()
+        self.add_dialog_image(image_frame)
+
+        # Parameters split into groups get one tab per group
+        groups = list(dict.fromkeys(parameter.group for parameter in self.parameters))
+        if len(groups) > 1:
+            notebook = ttk.Notebook(dialog)
+            notebook.pack(fill=tk.BOTH, expand=True)
+            user_inputs = {}
+            for group in groups:
+                tab = tk.Frame(notebook, bg="#ffffff")
+                notebook.add(tab, text=group or "General")
+                group_parameters = [parameter for parameter in self.parameters if parameter.group == group]
+                user_inputs.update(self.create_parameter_fields(tab, group_parameters))
+        else:
+            user_inputs = self.create_parameter_fields(dialog)
+
+        self.add_dialog_extras(dialog)
+
+        # Buttons at the bottom
+        button_font = ("Helvetica", 10)
+        button_frame = tk.Frame(dialog, pady=10, bg="#f0f0f0")
+        button_frame.pack(fill=tk.X)
+        tk.Button(button_frame, text="Save", font=button_font, command=lambda: self.save_properties(user_inputs, dialog)).pack(side=tk.LEFT, padx=20)
+        tk.Button(button_frame, text="Cancel", font=button_font, command=dialog.destroy).pack(side=tk.RIGHT, padx=20)
+
+    def add_dialog_image(self, parent):
+        """Show the element's picture in the dialog; a missing picture is skipped."""
+        if not self.image_path:
+            return
+        try:
+            img_tk = load_icon(self.image_path, self.image_size)  # Decoded once per element type
+        except OSError as e:
+            print(f"Could not load image for {self.label}: {e}")
+            return
+        img_label = tk.Label(parent, image=img_tk, bg="#ffffff")
+        img_label.image = img_tk
+        img_label.pack(pady=(0, 10))
+
+    def create_parameter_fields(self, parent, parameters=None):
+        """Add one labelled input per parameter of the schema; returns {attribute: widget}."""
+        label_font = ("Helvetica", 12)
+        inputs_frame = tk.Frame(parent, pady=10, padx=20, bg="#ffffff")
+        inputs_frame.pack(fill=tk.BOTH, expand=True)
         user_inputs = {}
 
-        # Define element-specific properties dynamically
-        element_properties = {
-            "InletReservoir": ["flow_rate", "temperature"],
-            "Pipe": ["inlet_port", "outlet_port"],
-            "Valve": ["pressure", "diameter"],
-            "Turbine": ["flow_rate", "efficiency"],
-            "SurgeTank": ["capacity"],
-            # Add properties for other elements as needed
-        }
+        for parameter in self.parameters if parameters is None else parameters:
+            field_frame = tk.Frame(inputs_frame, pady=5, bg="#ffffff")
+            field_frame.pack(fill=tk.X)
+            tk.Label(field_frame, text=parameter.label, font=label_font, bg="#ffffff").pack(side=tk.LEFT, anchor="w")
+            if parameter.choices:
+                entry = ttk.Combobox(field_frame, values=parameter.choices, state="readonly", width=18)
+                entry.set(self.display_value(parameter.name))
+            else:
+                entry = tk.Entry(field_frame, font=label_font, width=20)
+                entry.insert(0, self.display_value(parameter.name))
+            entry.pack(side=tk.RIGHT, anchor="e")
+            user_inputs[parameter.name] = entry
+        return user_inputs
 
-        # Get the properties for the current element class
-        class_name = self.__class__.__name__
-        if class_name in element_properties:
-            for prop in element_properties[class_name]:
-                current_value = getattr(self, prop, "")  # Get current value or default to ""
-                user_inputs[prop] = self.add_property_field(dialog, prop.replace("_", " ").capitalize(), current_value)
-
-        # Save button functionality
-        def save_properties():
-            for prop, entry in user_inputs.items():
-                new_value = entry.get()  # Get the value from the entry field
-                setattr(self, prop, new_value)  # Update the element's attribute dynamically
-            dialog.destroy()  # Close the dialog
-
-        # Add Save and Cancel buttons
-        tk.Button(dialog, text="Save", command=save_properties).pack()
-        tk.Button(dialog, text="Cancel", command=dialog.destroy).pack()
-
-    def add_property_field(self, parent, label_text, value):
-        """Add a label and entry field for a property."""
-        tk.Label(parent, text=label_text).pack()
-        entry = tk.Entry(parent)
-        entry.insert(0, value)  # Prepopulate with the current value
-        entry.pack()
-        return entry
+    def add_dialog_extras(self, dialog):
+        """Hook for element types that need more than their parameter fields in the dialog."""
+
+    def parse_inputs(self, user_inputs, dialog):
+        """Validate every entry before anything is saved; returns None after reporting an error."""
+        try:
+            return {attribute: self.parse_property(attribute, entry.get()) for attribute, entry in user_inputs.items()}
+        except ValueError as e:
+            messagebox.showerror("Invalid Value", str(e), parent=dialog)
+            return None
+
+    def save_properties(self, user_inputs, dialog):
+        """Save the properties and close the dialog."""
+        values = self.parse_inputs(user_inputs, dialog)
+        if values is None:
+            return
+        for attribute, value in values.items():
+            self.set_property(attribute, value)
+        dialog.destroy()
 
     def remove_highlight(self):
         """Remove the highlight from the selected item."""
@@ -202,215 +391,56 @@ class Element:
 selected_element = None
 
 class InletReservoir(Element):
+    glyph_color = "#1f77b4"
+    parameters = (
+        Parameter("level_h", "m asl", label="Level H [m asl]"),
+        Parameter("pipe_z", "m asl", label="Pipe Z [m asl]"),
+    )
+    __slots__ = ()
+
     def __init__(self, canvas, name):
         super().__init__(canvas, name, "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/inlet_reservoir_icon.png")
-        self.level_h = ""  # Default value for Level H
-        self.pipe_z = ""  # Default value for Pipe Z
         self.image_path = "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/inlet_reservoir_image.png"  # Path to display image in the dialog
 
-    def to_data(self):
-        return {
-            "class": "InletReservoir",
-            "name": self.name,
-            "x": self.x,
-            "y": self.y,
-            "level_h": self.level_h,
-            "pipe_z": self.pipe_z,
-        }
-
-    def load_from_data(self, data):
-        self.name = data["name"]
-        self.x = data["x"]
-        self.y = data["y"]
-        self.level_h = data.get("level_h", "")
-        self.pipe_z = data.get("pipe_z", "")
-
-    def open_properties_dialog(self):
-        """Open a beautiful, centered dialog to edit properties dynamically."""
-        dialog = tk.Toplevel(self.canvas)
-        dialog.title(f"Properties of {self.label}")
-        dialog.transient(self.canvas.winfo_toplevel())  # Associate with the main window
-        dialog.grab_set()  # Prevent interaction with other windows until this one is closed
-        dialog.focus_set()  # Automatically focus on the dialog
-
-        # Set size and center the dialog
-        width, height = 400, 400
-        x = (dialog.winfo_screenwidth() // 2) - (width // 2)
-        y = (dialog.winfo_screenheight() // 2) - (height // 2)
-        dialog.geometry(f"{width}x{height}+{x}+{y}")
-        dialog.resizable(False, False)  # Disable resizing
-
-        # Style settings
-        header_font = ("Helvetica", 14, "bold")
-        label_font = ("Helvetica", 12)
-        button_font = ("Helvetica", 10)
-
-        # Add padding and a header
-        header_frame = tk.Frame(dialog, bg="#f0f0f0", pady=10)
-        header_frame.pack(fill=tk.X)
-        header_label = tk.Label(header_frame, text=f"Properties of {self.label}", font=header_font, bg="#f0f0f0")
-        header_label.pack()
-
-        # Display image
-        image_frame = tk.Frame(dialog, pady=10, bg="#ffffff")
-        image_frame.pack()
-        img = Image.open(self.image_path)
-        img = img.resize((200, 150), Image.LANCZOS)
-        img_tk = ImageTk.PhotoImage(img)
-        img_label = tk.Label(image_frame, image=img_tk, bg="#ffffff")
-        img_label.image = img_tk
-        img_label.pack()
-
-        # Properties to include in the dialog
-        properties = {
-            "Level H [m asl]": "level_h",
-            "Pipe Z [m asl]": "pipe_z",
-        }
-
-        # Container for inputs
-        inputs_frame = tk.Frame(dialog, pady=10, padx=20, bg="#ffffff")
-        inputs_frame.pack(fill=tk.BOTH, expand=True)
-        user_inputs = {}
-
-        # Generate input fields dynamically
-        for label, attribute in properties.items():
-            field_frame = tk.Frame(inputs_frame, pady=5, bg="#ffffff")
-            field_frame.pack(fill=tk.X)
-            tk.Label(field_frame, text=label, font=label_font, bg="#ffffff").pack(side=tk.LEFT, anchor="w")
-            entry = tk.Entry(field_frame, font=label_font, width=20)
-            entry.insert(0, getattr(self, attribute, ""))
-            entry.pack(side=tk.RIGHT, anchor="e")
-            user_inputs[attribute] = entry
-
-        # Buttons at the bottom
-        button_frame = tk.Frame(dialog, pady=10, bg="#f0f0f0")
-        button_frame.pack(fill=tk.X)
-        tk.Button(button_frame, text="Save", font=button_font, command=lambda: self.save_properties(user_inputs, dialog)).pack(side=tk.LEFT, padx=20)
-        tk.Button(button_frame, text="Cancel", font=button_font, command=dialog.destroy).pack(side=tk.RIGHT, padx=20)
-
-    def save_properties(self, user_inputs, dialog):
-        """Save the properties and close the dialog."""
-        for attribute, entry in user_inputs.items():
-            setattr(self, attribute, entry.get())
-        dialog.destroy()
 
 
 
 
 class Pipe(Element):
+    glyph_color = "#7f7f7f"
+    parameters = (
+        Parameter("diameter", "m", bounds=(0, None), label="Diameter D [m]"),
+        Parameter("length", "m", bounds=(0, None), label="Length L [m]"),
+        Parameter("celerity", "m/s", bounds=(0, None), label="Celerity a [m/s]"),
+        Parameter("manning_n", bounds=(0, None), label="Manning n [...]"),
+        Parameter("inlet_h1", "m", label="Inlet H1 [m]"),
+        Parameter("inlet_q1", "m3/s", label="Inlet Q1 [m³/s]"),
+        Parameter("nodes_n", dtype=np.int32, default=0, bounds=(0, None), label="Nodes N [-]"),
+        Parameter("dt_max", "s", default=0.0, bounds=(0, None), label="dt max <= [s]"),  # Constant value
+    )
+    dialog_size = (550, 650)
+    image_size = (300, 250)
+    __slots__ = ("source_pipe",)
+
     def __init__(self, canvas, name):
         super().__init__(canvas, name, "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/pipe_icon.png")
-        self.diameter = ""  # Diameter D [m]
-        self.length = ""    # Length L [m]
-        self.celerity = ""  # Celerity a [m/s]
-        self.manning_n = "" # Manning n [...]
-        self.inlet_h1 = ""  # Inlet H1 [m]
-        self.inlet_q1 = ""  # Inlet Q1 [m³/s]
-        self.nodes_n = ""   # Nodes N [-]
-        self.dt_max = "0.0" # dt max [s], constant value
         self.image_path = "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/Pipe_image.png"  # Path to display image in the dialog
         # Placeholder for the additional functionality
         self.source_pipe = None  # Reference to another Pipe for copying values
 
     def to_data(self):
         """Serialize the Pipe properties into a dictionary."""
-        return {
-            "class": "Pipe",
-            "name": self.name,
-            "x": self.x,
-            "y": self.y,
-            "diameter": self.diameter,
-            "length": self.length,
-            "celerity": self.celerity,
-            "manning_n": self.manning_n,
-            "inlet_h1": self.inlet_h1,
-            "inlet_q1": self.inlet_q1,
-            "nodes_n": self.nodes_n,
-            "dt_max": self.dt_max,
-            "source_pipe": self.source_pipe.name if self.source_pipe else None
-        }
-
-    def load_from_data(self, data):
-        """Load Pipe properties from a dictionary."""
-        self.name = data["name"]
-        self.x = data["x"]
-        self.y = data["y"]
-        self.diameter = data.get("diameter", "")
-        self.length = data.get("length", "")
-        self.celerity = data.get("celerity", "")
-        self.manning_n = data.get("manning_n", "")
-        self.inlet_h1 = data.get("inlet_h1", "")
-        self.inlet_q1 = data.get("inlet_q1", "")
-        self.nodes_n = data.get("nodes_n", "")
-        self.dt_max = data.get("dt_max", "0.0")
-        # Placeholder for source_pipe loading logic, if needed later
-
-    def open_properties_dialog(self):
-        """Open a dialog for editing Pipe properties."""
-        dialog = tk.Toplevel(self.canvas)
-        dialog.title(f"Properties of {self.label}")
-        dialog.transient(self.canvas.winfo_toplevel())  # Associate with main window
-        dialog.grab_set()  # Prevent interaction with other windows
-        dialog.focus_set()
-
-        # Center dialog on the screen
-        width, height = 550, 650
-        x = (dialog.winfo_screenwidth() // 2) - (width // 2)
-        y = (dialog.winfo_screenheight() // 2) - (height // 2)
-        dialog.geometry(f"{width}x{height}+{x}+{y}")
-        dialog.resizable(False, False)
-
-        # Style settings
-        header_font = ("Helvetica", 14, "bold")
-        label_font = ("Helvetica", 12)
-
-        # Display image
-        img = Image.open("C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/pipe_image.png")
-        img = img.resize((300, 250), Image.LANCZOS)
-        img_tk = ImageTk.PhotoImage(img)
-        img_label = tk.Label(dialog, image=img_tk)
-        img_label.image = img_tk
-        img_label.pack()
-
-        # Properties to edit
-        properties = {
-            "Diameter D [m]": "diameter",
-            "Length L [m]": "length",
-            "Celerity a [m/s]": "celerity",
-            "Manning n [...]": "manning_n",
-            "Inlet H1 [m]": "inlet_h1",
-            "Inlet Q1 [m³/s]": "inlet_q1",
-            "Nodes N [-]": "nodes_n",
-            "dt max <= [s]": "dt_max",
-        }
+        data = super().to_data()
+        data["source_pipe"] = self.source_pipe.name if self.source_pipe else None
+        return data
 
-        # Input fields for properties
-        user_inputs = {}
-        for label, attr in properties.items():
-            field_frame = tk.Frame(dialog)
-            field_frame.pack(fill=tk.X, pady=5)
-            tk.Label(field_frame, text=label, font=label_font).pack(side=tk.LEFT)
-            entry = tk.Entry(field_frame, font=label_font, width=20)
-            entry.insert(0, getattr(self, attr, ""))
-            entry.pack(side=tk.RIGHT)
-            user_inputs[attr] = entry
+    # source_pipe is resolved by the Whiteboard once every element of the file exists
 
+    def add_dialog_extras(self, dialog):
         # Placeholder for selecting source pipe
-        tk.Label(dialog, text="Copy values from another Pipe:", font=label_font).pack(pady=5)
+        tk.Label(dialog, text="Copy values from another Pipe:", font=("Helvetica", 12)).pack(pady=5)
         tk.Button(dialog, text="Select Pipe", command=lambda: self.select_source_pipe()).pack(pady=5)
 
-        # Save and Cancel buttons
-        button_frame = tk.Frame(dialog)
-        button_frame.pack(pady=10)
-        tk.Button(button_frame, text="Save", command=lambda: self.save_properties(user_inputs, dialog)).pack(side=tk.LEFT, padx=10)
-        tk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT, padx=10)
-
-    def save_properties(self, user_inputs, dialog):
-        """Save the properties and close the dialog."""
-        for attr, entry in user_inputs.items():
-            setattr(self, attr, entry.get())
-        dialog.destroy()
-
     def select_source_pipe(self):
         """Placeholder for selecting a source pipe."""
         pass
@@ -418,132 +448,45 @@ class Pipe(Element):
 
 
 class OutletReservoir(Element):
+    glyph_color = "#17becf"
+    parameters = (
+        Parameter("level_h", "m asl", label="Level H [m asl]"),
+        Parameter("level_z", "m asl", label="Level Z [m asl]"),
+    )
+    __slots__ = ()
+
     def __init__(self, canvas, name):
         super().__init__(canvas, name, "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/outlet_reservoir_icon.png")
-        self.level_h = ""  # Default value for Level H
-        self.level_z = ""  # Default value for Level Z
         self.image_path = "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/inlet_outletReservior_image.png"  # Path to display image in the dialog
 
-    def to_data(self):
-        return {
-            "class": "OutletReservoir",
-            "name": self.name,
-            "x": self.x,
-            "y": self.y,
-            "level_h": self.level_h,
-            "level_z": self.level_z,
-        }
-
-    def load_from_data(self, data):
-        self.name = data["name"]
-        self.x = data["x"]
-        self.y = data["y"]
-        self.level_h = data.get("level_h", "")
-        self.level_z = data.get("level_z", "")
-
-    def open_properties_dialog(self):
-        """Open a beautiful, centered dialog to edit properties dynamically."""
-        dialog = tk.Toplevel(self.canvas)
-        dialog.title(f"Properties of {self.label}")
-        dialog.transient(self.canvas.winfo_toplevel())  # Associate with the main window
-        dialog.grab_set()  # Prevent interaction with other windows until this one is closed
-        dialog.focus_set()  # Automatically focus on the dialog
-
-        # Set size and center the dialog
-        width, height = 400, 400
-        x = (dialog.winfo_screenwidth() // 2) - (width // 2)
-        y = (dialog.winfo_screenheight() // 2) - (height // 2)
-        dialog.geometry(f"{width}x{height}+{x}+{y}")
-        dialog.resizable(False, False)  # Disable resizing
-
-        # Style settings
-        header_font = ("Helvetica", 14, "bold")
-        label_font = ("Helvetica", 12)
-        button_font = ("Helvetica", 10)
-
-        # Add padding and a header
-        header_frame = tk.Frame(dialog, bg="#f0f0f0", pady=10)
-        header_frame.pack(fill=tk.X)
-        header_label = tk.Label(header_frame, text=f"Properties of {self.label}", font=header_font, bg="#f0f0f0")
-        header_label.pack()
-
-        # Display image
-        image_frame = tk.Frame(dialog, pady=10, bg="#ffffff")
-        image_frame.pack()
-        img = Image.open(self.image_path)
-        img = img.resize((200, 150), Image.LANCZOS)
-        img_tk = ImageTk.PhotoImage(img)
-        img_label = tk.Label(image_frame, image=img_tk, bg="#ffffff")
-        img_label.image = img_tk
-        img_label.pack()
-
-        # Properties to include in the dialog
-        properties = {
-            "Level H [m asl]": "level_h",
-            "Level Z [m asl]": "level_z",
-        }
-
-        # Container for inputs
-        inputs_frame = tk.Frame(dialog, pady=10, padx=20, bg="#ffffff")
-        inputs_frame.pack(fill=tk.BOTH, expand=True)
-        user_inputs = {}
-
-        # Generate input fields dynamically
-        for label, attribute in properties.items():
-            field_frame = tk.Frame(inputs_frame, pady=5, bg="#ffffff")
-            field_frame.pack(fill=tk.X)
-            tk.Label(field_frame, text=label, font=label_font, bg="#ffffff").pack(side=tk.LEFT, anchor="w")
-            entry = tk.Entry(field_frame, font=label_font, width=20)
-            entry.insert(0, getattr(self, attribute, ""))
-            entry.pack(side=tk.RIGHT, anchor="e")
-            user_inputs[attribute] = entry
-
-        # Buttons at the bottom
-        button_frame = tk.Frame(dialog, pady=10, bg="#f0f0f0")
-        button_frame.pack(fill=tk.X)
-        tk.Button(button_frame, text="Save", font=button_font, command=lambda: self.save_properties(user_inputs, dialog)).pack(side=tk.LEFT, padx=20)
-        tk.Button(button_frame, text="Cancel", font=button_font, command=dialog.destroy).pack(side=tk.RIGHT, padx=20)
-
-    def save_properties(self, user_inputs, dialog):
-        """Save the properties and close the dialog."""
-        for attribute, entry in user_inputs.items():
-            setattr(self, attribute, entry.get())
-        dialog.destroy()
 
 
 
 
 class Valve(Element):
+    glyph_color = "#d62728"
+    parameters = (
+        Parameter("diameter", "m", default=0.0, bounds=(0, None), label="Diameter D [m]"),
+        Parameter("loss_coefficient", default=0.0, bounds=(0, None), label="Loss Coefficient Kv"),
+        Parameter("loss_factor", default=0.0, bounds=(0, None), label="Loss Factor n"),
+        Parameter("elevation_z", "m asl", default=0.0, label="Elevation Z [m asl]"),
+    )
+    dialog_size = (700, 600)
+    image_size = (250, 200)
+    __slots__ = ("custom_values",)
+
     def __init__(self, canvas, name):
         super().__init__(canvas, name, "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/valve_icon.png")
-        self.diameter = "0.0"  # Default value for Diameter (D)
-        self.loss_coefficient = "0.0"  # Default value for Loss Coefficient (Kv)
-        self.loss_factor = "0.0"  # Default value for Loss Factor (n)
-        self.elevation_z = "0.0"  # Default value for Elevation Z
         self.custom_values = []  # Holds the 2-column sheet values
         self.image_path = "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/valve_image.png"  # Path to the provided image
 
     def to_data(self):
-        return {
-            "class": "Valve",
-            "name": self.name,
-            "x": self.x,
-            "y": self.y,
-            "diameter": self.diameter,
-            "loss_coefficient": self.loss_coefficient,
-            "loss_factor": self.loss_factor,
-            "elevation_z": self.elevation_z,
-            "custom_values": self.custom_values,  # Save sheet data
-        }
+        data = super().to_data()
+        data["custom_values"] = self.custom_values  # Save sheet data
+        return data
 
     def load_from_data(self, data):
-        self.name = data["name"]
-        self.x = data["x"]
-        self.y = data["y"]
-        self.diameter = data.get("diameter", "0.0")
-        self.loss_coefficient = data.get("loss_coefficient", "0.0")
-        self.loss_factor = data.get("loss_factor", "0.0")
-        self.elevation_z = data.get("elevation_z", "0.0")
+        super().load_from_data(data)
         self.custom_values = data.get("custom_values", [])
 
     def open_properties_dialog(self):
@@ -555,7 +498,7 @@ class Valve(Element):
         dialog.focus_set()
 
         # Set size and center the dialog
-        width, height = 700, 600
+        width, height = self.dialog_size
         x = (dialog.winfo_screenwidth() // 2) - (width // 2)
         y = (dialog.winfo_screenheight() // 2) - (height // 2)
         dialog.geometry(f"{width}x{height}+{x}+{y}")
@@ -578,36 +521,9 @@ class Valve(Element):
         header_label = tk.Label(left_frame, text=f"Properties of {self.label}", font=header_font, bg="#f0f0f0", anchor="w")
         header_label.pack(fill=tk.X, pady=(0, 10))
 
-        # Display the image
-        img = Image.open(self.image_path)
-        img = img.resize((250, 200), Image.LANCZOS)
-        img_tk = ImageTk.PhotoImage(img)
-        img_label = tk.Label(left_frame, image=img_tk, bg="#ffffff")
-        img_label.image = img_tk
-        img_label.pack(pady=(0, 10))
-
-        # Properties to include in the dialog
-        properties = {
-            "Diameter D [m]": "diameter",
-            "Loss Coefficient Kv": "loss_coefficient",
-            "Loss Factor n": "loss_factor",
-            "Elevation Z [m asl]": "elevation_z",
-        }
-
-        # Container for input fields
-        inputs_frame = tk.Frame(left_frame, pady=10, padx=10, bg="#ffffff")
-        inputs_frame.pack(fill=tk.BOTH, expand=True)
-        user_inputs = {}
-
-        # Generate input fields dynamically
-        for label, attribute in properties.items():
-            field_frame = tk.Frame(inputs_frame, pady=5, bg="#ffffff")
-            field_frame.pack(fill=tk.X)
-            tk.Label(field_frame, text=label, font=label_font, bg="#ffffff").pack(side=tk.LEFT, anchor="w")
-            entry = tk.Entry(field_frame, font=label_font, width=20)
-            entry.insert(0, getattr(self, attribute, ""))
-            entry.pack(side=tk.RIGHT, anchor="e")
-            user_inputs[attribute] = entry
+        # Display the image and the input fields generated from the schema
+        self.add_dialog_image(left_frame)
+        user_inputs = self.create_parameter_fields(left_frame)
 
         # Right side: Two-column sheet
         right_frame = tk.Frame(main_frame, bg="#f0f0f0", padx=10, pady=10)
@@ -649,17 +565,21 @@ class Valve(Element):
 
     def save_properties(self, user_inputs, sheet_entries, dialog):
         """Save the properties and the sheet values, then close the dialog."""
-        # Save the main properties
-        for attribute, entry in user_inputs.items():
-            setattr(self, attribute, entry.get())
+        # Validate and save the main properties
+        values = self.parse_inputs(user_inputs, dialog)
+        if values is None:
+            return
+        for attribute, value in values.items():
+            self.set_property(attribute, value)
 
         # Save the sheet values
-        self.custom_values = []
+        custom_values = []
         for t_entry, y_entry in sheet_entries:
             t_value = t_entry.get()
             y_value = y_entry.get()
             if t_value or y_value:  # Save only non-empty rows
-                self.custom_values.append((t_value, y_value))
+                custom_values.append((t_value, y_value))
+        self.set_property("custom_values", custom_values)
 
         dialog.destroy()
 
@@ -667,354 +587,78 @@ class Valve(Element):
 
 
 class Manifold(Element):
+    glyph_color = "#9467bd"
+    parameters = (
+        Parameter("elev_z", "m asl", label="Elev. Z [m asl]"),
+    )
+    dialog_size = (400, 350)
+    __slots__ = ()
+
     def __init__(self, canvas, name):
         super().__init__(canvas, name, "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/manifold_icon.png")
-        self.elev_z = ""  # Default value for Elev. Z
         self.image_path = "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/Manifold_image.png"  # Path to display image in the dialog
 
-    def to_data(self):
-        return {
-            "class": "Manifold",
-            "name": self.name,
-            "x": self.x,
-            "y": self.y,
-            "elev_z": self.elev_z,
-        }
-
-    def load_from_data(self, data):
-        self.name = data["name"]
-        self.x = data["x"]
-        self.y = data["y"]
-        self.elev_z = data.get("elev_z", "")
-
-    def open_properties_dialog(self):
-        """Open a dialog to edit properties dynamically."""
-        dialog = tk.Toplevel(self.canvas)
-        dialog.title(f"Properties of {self.label}")
-        dialog.transient(self.canvas.winfo_toplevel())  # Associate with the main window
-        dialog.grab_set()  # Prevent interaction with other windows until this one is closed
-        dialog.focus_set()  # Automatically focus on the dialog
-
-        # Set size and center the dialog
-        width, height = 400, 350
-        x = (dialog.winfo_screenwidth() // 2) - (width // 2)
-        y = (dialog.winfo_screenheight() // 2) - (height // 2)
-        dialog.geometry(f"{width}x{height}+{x}+{y}")
-        dialog.resizable(False, False)  # Disable resizing
-
-        # Style settings
-        header_font = ("Helvetica", 14, "bold")
-        label_font = ("Helvetica", 12)
-        button_font = ("Helvetica", 10)
-
-        # Add padding and a header
-        header_frame = tk.Frame(dialog, bg="#f0f0f0", pady=10)
-        header_frame.pack(fill=tk.X)
-        header_label = tk.Label(header_frame, text=f"Properties of {self.label}", font=header_font, bg="#f0f0f0")
-        header_label.pack()
-
-        # Display image
-        image_frame = tk.Frame(dialog, pady=10, bg="#ffffff")
-        image_frame.pack()
-        img = Image.open(self.image_path)
-        img = img.resize((200, 150), Image.LANCZOS)
-        img_tk = ImageTk.PhotoImage(img)
-        img_label = tk.Label(image_frame, image=img_tk, bg="#ffffff")
-        img_label.image = img_tk
-        img_label.pack()
-
-        # Properties to include in the dialog
-        properties = {
-            "Elev. Z [m asl]": "elev_z",
-        }
-
-        # Container for inputs
-        inputs_frame = tk.Frame(dialog, pady=10, padx=20, bg="#ffffff")
-        inputs_frame.pack(fill=tk.BOTH, expand=True)
-        user_inputs = {}
-
-        # Generate input fields dynamically
-        for label, attribute in properties.items():
-            field_frame = tk.Frame(inputs_frame, pady=5, bg="#ffffff")
-            field_frame.pack(fill=tk.X)
-            tk.Label(field_frame, text=label, font=label_font, bg="#ffffff").pack(side=tk.LEFT, anchor="w")
-            entry = tk.Entry(field_frame, font=label_font, width=20)
-            entry.insert(0, getattr(self, attribute, ""))
-            entry.pack(side=tk.RIGHT, anchor="e")
-            user_inputs[attribute] = entry
-
-        # Buttons at the bottom
-        button_frame = tk.Frame(dialog, pady=10, bg="#f0f0f0")
-        button_frame.pack(fill=tk.X)
-        tk.Button(button_frame, text="Save", font=button_font, command=lambda: self.save_properties(user_inputs, dialog)).pack(side=tk.LEFT, padx=20)
-        tk.Button(button_frame, text="Cancel", font=button_font, command=dialog.destroy).pack(side=tk.RIGHT, padx=20)
-
-    def save_properties(self, user_inputs, dialog):
-        """Save the properties and close the dialog."""
-        for attribute, entry in user_inputs.items():
-            setattr(self, attribute, entry.get())
-        dialog.destroy()
 
 
 
 
 class SurgeTank(Element):
+    glyph_color = "#2ca02c"
+    parameters = (
+        Parameter("throttle_ao", "m2", bounds=(0, None), label="Throttle Ao [m2]"),
+        Parameter("stank_a", "m2", bounds=(0, None), label="S-tank A [m2]"),
+        Parameter("throttle_kin", bounds=(0, None), label="Throttle Kin"),
+        Parameter("throttle_kout", bounds=(0, None), label="Throttle Kout"),
+        Parameter("throttle_el_zo", "m3/s", label="Throttle el. Zo [m3/s]"),
+    )
+    dialog_size = (400, 600)
+    image_size = (250, 250)
+    __slots__ = ()
+
     def __init__(self, canvas, name):
         super().__init__(canvas, name, "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/surge_tank_icon.png")
-        self.throttle_ao = ""  # Throttle Ao [m2]
-        self.stank_a = ""      # S-tank A [m2]
-        self.throttle_kin = ""  # Throttle Kin
-        self.throttle_kout = ""  # Throttle Kout
-        self.throttle_el_zo = ""  # Throttle el. Zo [m3/s]
         self.image_path = "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/surge_tank_image.png"  # Image to display in dialog
 
-    def to_data(self):
-        return {
-            "class": "SurgeTank",
-            "name": self.name,
-            "x": self.x,
-            "y": self.y,
-            "throttle_ao": self.throttle_ao,
-            "stank_a": self.stank_a,
-            "throttle_kin": self.throttle_kin,
-            "throttle_kout": self.throttle_kout,
-            "throttle_el_zo": self.throttle_el_zo,
-        }
-
-    def load_from_data(self, data):
-        self.name = data["name"]
-        self.x = data["x"]
-        self.y = data["y"]
-        self.throttle_ao = data.get("throttle_ao", "")
-        self.stank_a = data.get("stank_a", "")
-        self.throttle_kin = data.get("throttle_kin", "")
-        self.throttle_kout = data.get("throttle_kout", "")
-        self.throttle_el_zo = data.get("throttle_el_zo", "")
-
-    def open_properties_dialog(self):
-        """Open a centered dialog to edit SurgeTank properties."""
-        dialog = tk.Toplevel(self.canvas)
-        dialog.title(f"Properties of {self.label}")
-        dialog.transient(self.canvas.winfo_toplevel())
-        dialog.grab_set()
-        dialog.focus_set()
-
-        # Set size and center the dialog
-        width, height = 400, 600
-        x = (dialog.winfo_screenwidth() // 2) - (width // 2)
-        y = (dialog.winfo_screenheight() // 2) - (height // 2)
-        dialog.geometry(f"{width}x{height}+{x}+{y}")
-        dialog.resizable(False, False)
-
-        # Style settings
-        header_font = ("Helvetica", 14, "bold")
-        label_font = ("Helvetica", 12)
-        button_font = ("Helvetica", 10)
-
-        # Header
-        header_frame = tk.Frame(dialog, bg="#f0f0f0", pady=10)
-        header_frame.pack(fill=tk.X)
-        header_label = tk.Label(header_frame, text=f"Properties of {self.label}", font=header_font, bg="#f0f0f0")
-        header_label.pack()
-
-        # Display image
-        image_frame = tk.Frame(dialog, pady=10, bg="#ffffff")
-        image_frame.pack()
-        img = Image.open(self.image_path)
-        img = img.resize((250, 250), Image.LANCZOS)
-        img_tk = ImageTk.PhotoImage(img)
-        img_label = tk.Label(image_frame, image=img_tk, bg="#ffffff")
-        img_label.image = img_tk
-        img_label.pack()
-
-        # Properties to include
-        properties = {
-            "Throttle Ao [m2]": "throttle_ao",
-            "S-tank A [m2]": "stank_a",
-            "Throttle Kin": "throttle_kin",
-            "Throttle Kout": "throttle_kout",
-            "Throttle el. Zo [m3/s]": "throttle_el_zo",
-        }
-
-        # Inputs frame
-        inputs_frame = tk.Frame(dialog, pady=10, padx=20, bg="#ffffff")
-        inputs_frame.pack(fill=tk.BOTH, expand=True)
-        user_inputs = {}
-
-        # Generate input fields dynamically
-        for label, attribute in properties.items():
-            field_frame = tk.Frame(inputs_frame, pady=5, bg="#ffffff")
-            field_frame.pack(fill=tk.X)
-            tk.Label(field_frame, text=label, font=label_font, bg="#ffffff").pack(side=tk.LEFT, anchor="w")
-            entry = tk.Entry(field_frame, font=label_font, width=20)
-            entry.insert(0, getattr(self, attribute, ""))
-            entry.pack(side=tk.RIGHT, anchor="e")
-            user_inputs[attribute] = entry
-
-        # Buttons frame
-        button_frame = tk.Frame(dialog, pady=10, bg="#f0f0f0")
-        button_frame.pack(fill=tk.X)
-        tk.Button(button_frame, text="Save", font=button_font, command=lambda: self.save_properties(user_inputs, dialog)).pack(side=tk.LEFT, padx=20)
-        tk.Button(button_frame, text="Cancel", font=button_font, command=dialog.destroy).pack(side=tk.RIGHT, padx=20)
-
-    def save_properties(self, user_inputs, dialog):
-        """Save properties and close dialog."""
-        for attribute, entry in user_inputs.items():
-            setattr(self, attribute, entry.get())
-        dialog.destroy()
-
-
-
 
 
 
 
-class Turbine:
-    def __init__(self, canvas, name=None):
-        self.canvas = canvas
-        self.name = name or "Turbine"
-        self.parent = parent  # Store the parent reference
-        self.image_path_main = "/path/to/your/main/image.png"  # Replace with actual image path
-        self.image_path_governor = "/path/to/your/governor/image.png"  # Replace with actual image path
-        self.properties = {
-            "Main": {
-                "Ho [m]": 0.0,
-                "Qo [m³/s]": 0.0,
-                "Do [m]": 0.0,
-                "No [rpm]": 0.0,
-                "Jn [kgm²]": 0.0,
-                "Efficiency np [pu]": 0.9,
-                "Z elev [m asl]": 0.0,
-                "Select": "Francis 23"
-            },
-            "Governor": {
-                "ΔP [% of Rated]": -100.0,
-                "T load Rej [s]": 0.0,
-                "Δt ramp [s]": 0.1,
-                "Tg [s]": 0.0,
-                "Td [s]": 0.0,
-                "Tr [s]": 0.0,
-                "bp [-]": 0.0
-            }
-        }
-
-        # Call to open the properties dialog
-        self.open_properties_dialog()
 
 
-    def open_properties_dialog(self):
-        """Create and display the turbine properties dialog."""
-        dialog = tk.Toplevel(self.parent)
-        dialog.title("Turbine Properties")
-        dialog.geometry("800x600")
-        dialog.resizable(False, False)
 
-        # Create tabs
-        tab_control = ttk.Notebook(dialog)
-        main_tab = ttk.Frame(tab_control)
-        governor_tab = ttk.Frame(tab_control)
+class Turbine(Element):
+    glyph_color = "#ff7f0e"
+    parameters = (
+        Parameter("head_ho", "m", default=0.0, bounds=(0, None), label="Ho [m]", group="Main"),
+        Parameter("flow_qo", "m3/s", default=0.0, bounds=(0, None), label="Qo [m³/s]", group="Main"),
+        Parameter("diameter_do", "m", default=0.0, bounds=(0, None), label="Do [m]", group="Main"),
+        Parameter("speed_no", "rpm", default=0.0, bounds=(0, None), label="No [rpm]", group="Main"),
+        Parameter("inertia_jn", "kgm2", default=0.0, bounds=(0, None), label="Jn [kgm²]", group="Main"),
+        Parameter("efficiency", "pu", default=0.9, bounds=(0, 1), label="Efficiency np [pu]", group="Main"),
+        Parameter("elevation_z", "m asl", default=0.0, label="Z elev [m asl]", group="Main"),
+        Parameter("turbine_type", default=0, choices=("Francis 23", "Kaplan", "Pelton"), label="Select", group="Main"),
+        Parameter("load_change", "%", default=-100.0, label="ΔP [% of Rated]", group="Governor"),
+        Parameter("load_rejection_t", "s", default=0.0, bounds=(0, None), label="T load Rej [s]", group="Governor"),
+        Parameter("ramp_dt", "s", default=0.1, bounds=(0, None), label="Δt ramp [s]", group="Governor"),
+        Parameter("tg", "s", default=0.0, bounds=(0, None), label="Tg [s]", group="Governor"),
+        Parameter("td", "s", default=0.0, bounds=(0, None), label="Td [s]", group="Governor"),
+        Parameter("tr", "s", default=0.0, bounds=(0, None), label="Tr [s]", group="Governor"),
+        Parameter("bp", default=0.0, bounds=(0, None), label="bp [-]", group="Governor"),
+    )
+    dialog_size = (800, 600)
+    image_size = (350, 150)
+    __slots__ = ()
 
-        tab_control.add(main_tab, text="Main")
-        tab_control.add(governor_tab, text="Governor")
-        tab_control.pack(expand=True, fill=tk.BOTH)
-
-        # Main Tab
-        self.setup_main_tab(main_tab)
-
-        # Governor Tab
-        self.setup_governor_tab(governor_tab)
-
-        # Save and Cancel Buttons
-        button_frame = tk.Frame(dialog)
-        button_frame.pack(fill=tk.X, pady=10)
-
-        save_button = tk.Button(button_frame, text="Save", bg="green", fg="white", command=self.save_properties)
-        save_button.pack(side="left", padx=10)
-
-        cancel_button = tk.Button(button_frame, text="Cancel", bg="red", fg="white", command=dialog.destroy)
-        cancel_button.pack(side="right", padx=10)
-
-    def setup_main_tab(self, tab):
-        """Setup the 'Main' tab."""
-        # Top section with images
-        image_frame = tk.Frame(tab)
-        image_frame.pack(fill=tk.X, pady=10)
-
-        img = Image.open(self.image_path_main)
-        img = img.resize((350, 150), Image.LANCZOS)
-        img_tk = ImageTk.PhotoImage(img)
-        img_label = tk.Label(image_frame, image=img_tk)
-        img_label.image = img_tk
-        img_label.pack(side=tk.LEFT, padx=10)
-
-        # Data section
-        data_frame = tk.Frame(tab)
-        data_frame.pack(fill=tk.X, pady=10)
-
-        for field, value in self.properties["Main"].items():
-            field_frame = tk.Frame(data_frame)
-            field_frame.pack(fill=tk.X, pady=5)
-
-            label = tk.Label(field_frame, text=field, width=20, anchor="w")
-            label.pack(side=tk.LEFT, padx=5)
-
-            if field == "Select":
-                combo = ttk.Combobox(field_frame, values=["Francis 23", "Kaplan", "Pelton"], width=15)
-                combo.set(value)
-                combo.pack(side=tk.RIGHT, padx=5)
-                self.properties["Main"][field] = combo
-            else:
-                entry = tk.Entry(field_frame, width=20)
-                entry.insert(0, value)
-                entry.pack(side=tk.RIGHT, padx=5)
-                self.properties["Main"][field] = entry
-
-    def setup_governor_tab(self, tab):
-        """Setup the 'Governor' tab."""
-        # Top section with diagrams
-        top_frame = tk.Frame(tab)
-        top_frame.pack(fill=tk.X, pady=10)
-
-        img = Image.open(self.image_path_governor)
-        img = img.resize((350, 150), Image.LANCZOS)
-        img_tk = ImageTk.PhotoImage(img)
-        img_label = tk.Label(top_frame, image=img_tk)
-        img_label.image = img_tk
-        img_label.pack(side=tk.LEFT, padx=10)
-
-        # Data section
-        data_frame = tk.Frame(tab)
-        data_frame.pack(fill=tk.X, pady=10)
-
-        for field, value in self.properties["Governor"].items():
-            field_frame = tk.Frame(data_frame)
-            field_frame.pack(fill=tk.X, pady=5)
-
-            label = tk.Label(field_frame, text=field, width=20, anchor="w")
-            label.pack(side=tk.LEFT, padx=5)
-
-            entry = tk.Entry(field_frame, width=20)
-            entry.insert(0, value)
-            entry.pack(side=tk.RIGHT, padx=5)
-            self.properties["Governor"][field] = entry
-
-    def save_properties(self):
-        """Save properties from the dialog."""
-        for tab, fields in self.properties.items():
-            for field, widget in fields.items():
-                if isinstance(widget, tk.Entry):
-                    fields[field] = widget.get()
-                elif isinstance(widget, ttk.Combobox):
-                    fields[field] = widget.get()
-
-        print("Properties Saved:", self.properties)
+    def __init__(self, canvas, name):
+        super().__init__(canvas, name, "C:/Users/Aniket/Desktop/SIH Software/Airavata_Project/Icons/turbine_icon.png")
 
 
 # Test the UI
 if __name__ == "__main__":
     root = tk.Tk()
     root.title("Hydraulic Simulator")
-    turbine = Turbine(root)
+    canvas = tk.Canvas(root)
+    canvas.pack()
+    turbine = Turbine(canvas, "Turbine_1")
+    turbine.open_properties_dialog()
     root.mainloop()
-
-
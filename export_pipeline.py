@@ -0,0 +1,163 @@
+"""Chunked export of simulation results to .xlsx, .csv or .parquet.
+
+Results arrive as an iterable of chunks, each a mapping of column name to a 1-D array
+(a dict or a DataFrame). Each chunk is written and dropped before the next one is read,
+so memory use depends on the chunk size, not on the length of the run. Output that
+exceeds the row limit of a sheet or file is continued in a new sheet or file.
+"""
+import csv
+import os
+import numpy as np
+
+
+EXCEL_MAX_ROWS = 1048576  # Including the header row
+
+
+class _Sink:
+    """Writes 2-D blocks of rows, starting a new part whenever the current one is full."""
+
+    def __init__(self, output_path, columns, max_rows):
+        self.output_path = output_path
+        self.columns = columns
+        self.max_rows = max_rows  # Data rows per part, or None for no limit
+        self.part = 0
+        self.rows_in_part = 0
+        self.parts = []  # Names of the parts written, for reporting
+
+    def write(self, block):
+        while len(block):
+            if self.part == 0 or (self.max_rows and self.rows_in_part == self.max_rows):
+                self.part += 1
+                self.rows_in_part = 0
+                self.parts.append(self.open_part(self.part))
+            count = len(block) if not self.max_rows else min(len(block), self.max_rows - self.rows_in_part)
+            self.write_rows(block[:count])
+            self.rows_in_part += count
+            block = block[count:]
+
+    def part_path(self, part):
+        """output.csv, output_2.csv, output_3.csv, ..."""
+        if part == 1:
+            return self.output_path
+        root, ext = os.path.splitext(self.output_path)
+        return f"{root}_{part}{ext}"
+
+    def open_part(self, part):
+        raise NotImplementedError
+
+    def write_rows(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class _CsvSink(_Sink):
+    def __init__(self, output_path, columns, max_rows):
+        super().__init__(output_path, columns, max_rows)
+        self.file = None
+
+    def open_part(self, part):
+        self.close()
+        path = self.part_path(part)
+        self.file = open(path, "w", newline="")
+        csv.writer(self.file).writerow(self.columns)
+        return path
+
+    def write_rows(self, rows):
+        np.savetxt(self.file, rows, delimiter=",", fmt="%.10g")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class _ExcelSink(_Sink):
+    """Write-only workbook: rows are streamed to disk instead of kept as cell objects."""
+
+    def __init__(self, output_path, columns, max_rows):
+        from openpyxl import Workbook  # Optional dependency, only needed for Excel export
+        super().__init__(output_path, columns, min(max_rows or EXCEL_MAX_ROWS - 1, EXCEL_MAX_ROWS - 1))
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+
+    def open_part(self, part):
+        title = "Results" if part == 1 else f"Results {part}"
+        self.sheet = self.workbook.create_sheet(title)
+        self.sheet.append(self.columns)
+        return title
+
+    def write_rows(self, rows):
+        for row in rows.tolist():
+            self.sheet.append(row)
+
+    def close(self):
+        if self.sheet is None:
+            self.open_part(1)  # A workbook needs at least one sheet
+        self.workbook.save(self.output_path)
+
+
+class _ParquetSink(_Sink):
+    def __init__(self, output_path, columns, max_rows):
+        import pyarrow  # Optional dependency, only needed for Parquet export
+        import pyarrow.parquet
+        super().__init__(output_path, columns, max_rows)
+        self.pyarrow = pyarrow
+        self.writer = None
+
+    def open_part(self, part):
+        self.close()
+        path = self.part_path(part)
+        schema = self.pyarrow.schema([(name, self.pyarrow.float64()) for name in self.columns])
+        self.writer = self.pyarrow.parquet.ParquetWriter(path, schema)
+        return path
+
+    def write_rows(self, rows):
+        arrays = [self.pyarrow.array(rows[:, i]) for i in range(len(self.columns))]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(arrays, names=self.columns))
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+
+_SINKS = {".csv": _CsvSink, ".xlsx": _ExcelSink, ".parquet": _ParquetSink}
+
+
+def export_results(chunks, output_path, columns=None, decimate=1, max_rows=None):
+    """Stream result chunks to output_path; the format follows the file extension.
+
+    columns selects and orders the exported columns (default: all columns of the first
+    chunk). decimate keeps every n-th time step across the whole run. max_rows limits the
+    data rows per file (CSV, Parquet) or sheet (Excel, which is capped at its own limit).
+    Returns the names of the files or sheets written.
+    """
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext not in _SINKS:
+        raise ValueError(f"Unsupported export format '{ext}'. Use one of {', '.join(_SINKS)}.")
+
+    sink = None
+    offset = 0  # Index of the first row of the current chunk within the run
+    try:
+        for chunk in chunks:
+            if sink is None:
+                columns = list(columns or chunk.keys())
+                sink = _SINKS[ext](output_path, columns, max_rows)
+            block = np.column_stack([np.asarray(chunk[name], dtype=np.float64) for name in columns])
+            sink.write(block[(-offset) % decimate::decimate])
+            offset += len(block)
+        if sink is None:
+            sink = _SINKS[ext](output_path, list(columns or []), max_rows)
+    finally:
+        if sink is not None:
+            sink.close()
+    return sink.parts
+
+
+def chunked(columns, chunk_rows=65536):
+    """Split a mapping of equally long arrays into chunks of chunk_rows rows."""
+    length = len(next(iter(columns.values()), ()))
+    for start in range(0, length, chunk_rows):
+        yield {name: values[start:start + chunk_rows] for name, values in columns.items()}
@@ -1,26 +1,46 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import os
-import shutil
 import time
 import csv
-import json
-import matplotlib.pyplot as plt
-import psutil  # For performance monitoring
-import json  # Add this import statement
 import tkinter.filedialog as filedialog
+from versioning import ProjectVersions, STORE_FOLDER
+from backup import backup_tree, restore
+from batch_queue import JobQueue, Scheduler
+from live_plot import LivePlot
 # other imports...
 
 
+def start_time(value):
+    """Epoch seconds from None (now), a number, or "HH:MM" (the next time the clock shows it)."""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        hours, minutes = (int(part) for part in str(value).split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid start time '{value}'. Use HH:MM.")
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid start time '{value}'. Use HH:MM between 00:00 and 23:59.")
+    now = time.localtime()
+    start = time.mktime(now[:3] + (hours, minutes, 0) + now[6:8] + (-1,))
+    return start if start > time.time() else start + 24 * 3600
+
+
 class Features:
     def __init__(self, app):
         self.app = app
+        self.versions = None  # ProjectVersions of the open project
+        self.batch_queue = None  # Persistent JobQueue, opened on first use
 
     # 1. Undo/Redo Functionality
-    def undo_redo(self):
-        # Simple implementation of undo/redo functionality could involve a stack of changes
-        # This is a placeholder for the actual logic.
-        pass
+    def undo_redo(self, redo=False):
+        # The Whiteboard keeps a bounded log of edit deltas (moves, property edits, create/delete)
+        whiteboard = self.app.whiteboard
+        description = whiteboard.redo() if redo else whiteboard.undo()
+        if description is None:
+            messagebox.showinfo("Undo/Redo", "Nothing to redo." if redo else "Nothing to undo.")
 
     # 2. Project History
     def open_recent_project(self):
@@ -29,13 +49,14 @@ class Features:
         if not recent_projects:
             messagebox.showinfo("No Recent Projects", "No recent projects found.")
             return
-        project = messagebox.askquestion("Recent Projects", f"Open the following recent project?\n{recent_projects[0]}")
+        entry = self.app.recent_projects.entries[0]
+        project = messagebox.askquestion("Recent Projects", f"Open the following recent project?\n{self.app.recent_projects.summary(entry)}")
         if project == "yes":
             self.app.open_project(recent_projects[0])
 
     def load_recent_projects(self):
-        # This can load a list from a file or in-memory storage
-        return ["project1.dat", "project2.dat"]
+        # Most recent first, from the persistent index kept by the application
+        return self.app.recent_projects.paths()
 
     # 3. Export Options
     def export_project(self, format_type):
@@ -79,27 +100,38 @@ class Features:
 
     # 4. Advanced File Management
     def version_project(self):
-        version_number = self.get_new_version()
-        self.save_project_version(version_number)
+        # Data tables and operation schedules are versioned with the model
+        tables = dict(self.app.project_tables)
+        tables.update({f"schedules/{name}": table for name, table in self.app.load_schedules().items()})
+        version_number = self.project_versions().snapshot(self.app.whiteboard, tables=tables)
         messagebox.showinfo("Versioning", f"Project versioned as {version_number}.")
 
-    def get_new_version(self):
-        # Simple versioning by incrementing a version number
-        return "v1.1"
-
-    def save_project_version(self, version_number):
-        version_file = "project_versions.json"
-        versions = self.load_versions()
-        versions.append(version_number)
-        with open(version_file, "w") as file:
-            json.dump(versions, file)
+    def project_versions(self):
+        # Versions share one object store per folder, so unchanged elements are stored once
+        file_path = self.app.current_file_name or os.path.join(self.app.file_manager.project_folder, "untitled")
+        folder, name = os.path.split(file_path)
+        if self.versions is None or self.versions.versions_path != os.path.join(folder, STORE_FOLDER, f"{name}.versions.json"):
+            self.versions = ProjectVersions(folder, name)
+        return self.versions
 
     def load_versions(self):
-        version_file = "project_versions.json"
-        if os.path.exists(version_file):
-            with open(version_file, "r") as file:
-                return json.load(file)
-        return []
+        return [entry["version"] for entry in self.project_versions().versions]
+
+    def compare_versions(self, old_version, new_version):
+        try:
+            diff = self.project_versions().diff(old_version, new_version)
+        except KeyError as e:
+            messagebox.showerror("Versioning", str(e))
+            return
+        messagebox.showinfo(
+            "Versioning",
+            f"Changes from {old_version} to {new_version}:\n"
+            f"Added: {', '.join(diff['added']) or '-'}\n"
+            f"Removed: {', '.join(diff['removed']) or '-'}\n"
+            f"Changed: {', '.join(diff['changed']) or '-'}\n"
+            f"Connections changed: {'yes' if diff['connections_changed'] else 'no'}\n"
+            f"Tables changed: {', '.join(diff['tables_changed']) or '-'}",
+        )
 
     # 5. Search and Filter Functionality
     def search_project(self, search_term):
@@ -118,17 +150,22 @@ class Features:
 
     # 7. Data Visualization
     def plot_data(self):
-        data = [1, 2, 3, 4, 5]
-        plt.plot(data)
-        plt.title("Sample Data Visualization")
-        plt.xlabel("X-axis")
-        plt.ylabel("Y-axis")
-        plt.show()
+        # Head profile of the last completed run, embedded in a window that does not block
+        results = self.app.simulation_results
+        if results is None:
+            messagebox.showinfo("Data Visualization", "Run a simulation first.")
+            return
+        window = tk.Toplevel(self.app.root)
+        window.title("Simulation Results")
+        plot = LivePlot(window)
+        plot.pack(fill=tk.BOTH, expand=True)
+        plot.show_profile(results[0])
+        window.protocol("WM_DELETE_WINDOW", lambda: (plot.close(), window.destroy()))
 
     # 8. Simulation/Analysis Results
     def run_simulation(self):
-        result = self.simulate_hydraulic_model()
-        messagebox.showinfo("Simulation Result", f"Simulation completed with result: {result}")
+        # Runs in a worker process; progress and the result are shown in the simulation panel
+        self.app.run_simulation()
 
     def simulate_hydraulic_model(self):
         # Placeholder for actual hydraulic simulation logic
@@ -144,18 +181,34 @@ class Features:
         messagebox.showinfo("Notification", message)
 
     # 11. Backup and Restore
+    def project_folder(self):
+        if self.app.current_file_name:
+            return os.path.dirname(self.app.current_file_name)
+        return self.app.file_manager.project_folder
+
     def backup_project(self):
         backup_path = filedialog.askdirectory(title="Select Backup Location")
         if backup_path:
-            backup_folder = os.path.join(backup_path, "Backup")
-            shutil.copytree(self.app.file_path, backup_folder)
-            messagebox.showinfo("Backup", "Project backed up successfully.")
+            # Each backup is a new dated folder; unchanged files are hard links to the previous one
+            backup_root = os.path.join(backup_path, "Backup")
+            try:
+                backup_dir, copied, linked = backup_tree(self.project_folder(), backup_root)
+            except OSError as e:
+                messagebox.showerror("Backup", f"Backup failed: {e}")
+                return
+            messagebox.showinfo("Backup", f"Project backed up successfully to {os.path.basename(backup_dir)}.\n"
+                                          f"{copied} files copied, {linked} unchanged files linked.")
 
-    def restore_project(self):
-        restore_path = filedialog.askdirectory(title="Select Restore Location")
+    def restore_project(self, relative_path=None):
+        # Restores the whole project, or only relative_path, from the chosen backup folder
+        restore_path = filedialog.askdirectory(title="Select Backup to Restore")
         if restore_path:
-            shutil.copytree(restore_path, self.app.file_path)
-            messagebox.showinfo("Restore", "Project restored successfully.")
+            try:
+                count = restore(restore_path, self.project_folder(), [relative_path] if relative_path else None)
+            except (OSError, KeyError, ValueError) as e:
+                messagebox.showerror("Restore", f"Restore failed: {e}")
+                return
+            messagebox.showinfo("Restore", f"Project restored successfully ({count} files).")
 
     # 12. Help and Documentation
     def show_help(self):
@@ -178,55 +231,51 @@ class Features:
         messagebox.showinfo("API Integration", "API integrated successfully.")
 
     # 15. Task Scheduling
-    def schedule_task(self, time, task):
-        # Placeholder for task scheduling (could integrate with OS task scheduler)
-        messagebox.showinfo("Task Scheduling", f"Task '{task}' scheduled at {time}.")
+    def schedule_task(self, time=None, task=None, steps=1000, priority=0, memory_limit_mb=None):
+        # Queue the open project in the batch queue; time ("HH:MM" or epoch seconds) is when it may start
+        file_path = self.app.current_file_name
+        if not file_path:
+            messagebox.showwarning("Task Scheduling", "Open or save a project before scheduling it.")
+            return None
+        try:
+            not_before = start_time(time)
+        except ValueError as e:
+            messagebox.showerror("Task Scheduling", str(e))
+            return None
+        try:
+            # The job runs a copy of the project as it is now, pending edits included, not
+            # whatever the file holds by the time the job starts
+            self.app.autosave.flush(timeout=30)
+            snapshot = self.job_queue().snapshot(file_path)
+        except OSError as e:
+            messagebox.showerror("Task Scheduling", f"The project could not be saved, so it was not queued: {e}")
+            return None
+        payload = {"project": snapshot, "source": file_path, "snapshot": True, "steps": steps}
+        job_id = self.job_queue().submit(task or os.path.basename(file_path), payload,
+                                         priority=priority, memory_limit_mb=memory_limit_mb, not_before=not_before)
+        self.app.console.log(f"Queued job {job_id}: {task or os.path.basename(file_path)}", level="info")
+        self.start_scheduler()
+        return job_id
+
+    def job_queue(self):
+        if self.batch_queue is None:
+            self.batch_queue = JobQueue()
+        return self.batch_queue
+
+    def start_scheduler(self, workers=None):
+        # Queued jobs (also those submitted from the command line) run while the application is open;
+        # the application stops the scheduler when it closes
+        if self.app.batch_scheduler is None:
+            self.app.batch_scheduler = Scheduler(
+                self.job_queue(), workers, on_message=lambda message, level: self.app.console.log(message, level=level))
+            self.app.batch_scheduler.start()
 
     # 16. Error Logging/Reporting
     def log_error(self, error_message):
-        # Log errors to a file
-        with open("error_log.txt", "a") as log_file:
-            log_file.write(f"{time.ctime()}: {error_message}\n")
-        messagebox.showinfo("Error Logging", "Error logged successfully.")
+        # Written to disk by the run log; no dialog, so it can be called from anywhere
+        self.app.console.log(error_message, level="error")
 
     # 17. System Performance Monitoring (Extended)
     def monitor_performance(self):
-        # CPU usage
-        cpu_usage = psutil.cpu_percent(interval=1)
-        
-        # Memory usage
-        memory_info = psutil.virtual_memory()
-        
-        # Disk usage
-        disk_info = psutil.disk_usage('/')
-        
-        # Network usage
-        net_info = psutil.net_io_counters()
-        
-        # Battery status (if applicable)
-        battery = psutil.sensors_battery()
-        battery_status = "Charging" if battery and battery.power_plugged else "Not Charging"
-        battery_percentage = battery.percent if battery else "N/A"
-        
-        # GPU usage (if available)
-        try:
-            import GPUtil
-            gpus = GPUtil.getGPUs()
-            gpu_usage = ", ".join([f"GPU {gpu.id}: {gpu.memoryUtil * 100:.2f}% used" for gpu in gpus])
-        except ImportError:
-            gpu_usage = "GPU monitoring not available"
-        
-        # Active Processes (top 5 processes by CPU usage)
-        processes = [(p.info['pid'], p.info['name'], p.info['cpu_percent']) for p in psutil.process_iter(attrs=['pid', 'name', 'cpu_percent'])]
-        processes = sorted(processes, key=lambda x: x[2], reverse=True)[:5]  # Top 5 processes
-        process_info = "\n".join([f"PID: {pid}, Name: {name}, CPU Usage: {cpu}%" for pid, name, cpu in processes])
-
-        # Display the gathered stats in a message box
-        messagebox.showinfo("Performance Monitoring", 
-                            f"CPU Usage: {cpu_usage}%\n"
-                            f"Memory Usage: {memory_info.percent}%\n"
-                            f"Disk Usage: {disk_info.percent}%\n"
-                            f"Network - Sent: {net_info.bytes_sent} bytes, Received: {net_info.bytes_recv} bytes\n"
-                            f"Battery Status: {battery_status} ({battery_percentage}%)\n"
-                            f"GPU Usage: {gpu_usage}\n"
-                            f"Top 5 Processes by CPU Usage:\n{process_info}")
+        # Sampled in the background by the application; this only opens its live panel
+        self.app.monitor_performance()
@@ -1,7 +1,12 @@
 import os
 import json
 import tkinter.filedialog as filedialog
-import pandas as pd
+from tkinter import messagebox
+import numpy as np
+from project_format import PROJECT_EXTENSION, ProjectFile, is_project_file, write_project
+from json_stream import iter_json_object
+from schedule_loader import shared_cache
+from export_pipeline import export_results, chunked
 import json  # Add this import statement
 import tkinter.filedialog as filedialog
 # other imports...
@@ -42,67 +47,50 @@ class FileManager:
         txt_files = [f for f in os.listdir(self.project_folder) if f.endswith('.txt')]
         return txt_files
 
+    def load_schedules(self):
+        """Return {file name: memory-mapped array} for every `.txt` schedule in the project folder.
+
+        Only files that changed since the last call (by mtime and size) are parsed again.
+        """
+        return shared_cache(self.project_folder).load(self.load_txt_files())
+
     def save_data_file(self, file_path, data):
         """Save the `.dat` project file."""
         with open(file_path, 'w') as file:
             file.write(data)
 
-    def export_to_excel(self, data, output_path):
-        """Export data to `.xlsx` format."""
-        df = pd.DataFrame(data)
-        df.to_excel(output_path, index=False)
+    def export_to_excel(self, data, output_path, columns=None, decimate=1, max_rows=None):
+        """Export results to `.xlsx`, `.csv` or `.parquet` (by extension), streamed in chunks.
+
+        data is an iterable of chunks ({column: array}), one {column: array} mapping, or the
+        (H, Q) pair returned by TransientSimulation.method_of_characteristics.
+        Returns the names of the files or sheets written.
+        """
+        if isinstance(data, tuple):
+            data = {"H": data[0], "Q": data[1]}
+        if isinstance(data, dict):
+            data = chunked(data)
+        return export_results(data, output_path, columns, decimate, max_rows)
 
     def open_file(self):
-        """Open a file and load its content onto the canvas."""
+        """Ask for a project file and start reading it; returns stream_project's result, or None."""
         file_path = filedialog.askopenfilename(
             title="Open File",
-            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
+            filetypes=[("Airavata Projects", "*.avp"), ("JSON Files", "*.json"), ("All Files", "*.*")]
         )
 
         if not file_path:
             messagebox.showinfo("No File Selected", "No file was selected.")
-            return
-
-        try:
-            # Load elements from the selected file
-            with open(file_path, 'r') as file:
-                elements_data = json.load(file)
-            
-            if not isinstance(elements_data, dict) or 'elements' not in elements_data:
-                raise ValueError("Invalid file structure. Expected a dictionary with an 'elements' key.")
-            
-            # Clear existing elements before loading new ones
-            self.whiteboard.clear()
-
-            # Load elements into the canvas
-            self.whiteboard.load_elements(elements_data['elements'])
-
-            # Update file state
-            self.current_file_name = file_path
-            self.file_open = True  # Set the file open flag
-            self.whiteboard.is_file_open = True  # Enable the whiteboard
-            self.file_manager.file_path = file_path  # Update the file manager
-            self.update_file_label()  # Update the file label
-            self.console.log(f"Successfully loaded file: {os.path.basename(file_path)}",level="success")
-
-            messagebox.showinfo("File Loaded", f"Successfully loaded file: {os.path.basename(file_path)}")
-
-        except (json.JSONDecodeError, ValueError) as e:
-            messagebox.showerror("File Error", f"Failed to load the file. Error: {e}")
-        except Exception as e:
-            messagebox.showerror("Unexpected Error", f"An unexpected error occurred: {e}")
-
-
-
-
-
+            return None
 
+        self.file_path = file_path
+        return self.stream_project(file_path)
 
     def save_file(self):
         if self.current_file_name:
             self.file_manager.save_elements(
                 self.current_file_name,
-                [element.to_data() for element in self.whiteboard.elements]
+                [element.to_data() for element in self.whiteboard.elements.values()]
             )
             self.console.log(
                 f"File saved successfully: {os.path.basename(self.current_file_name)}",
@@ -119,7 +107,7 @@ class FileManager:
                 self.file_manager.file_path = file_path
                 self.current_file_name = file_path
                 self.file_manager.save_elements(
-                    file_path, [element.to_data() for element in self.whiteboard.elements]
+                    file_path, [element.to_data() for element in self.whiteboard.elements.values()]
                 )
                 self.console.log(
                     f"File saved successfully: {os.path.basename(file_path)}",
@@ -165,17 +153,91 @@ class FileManager:
 
 
     
-    def save_elements(self, file_path, elements_data):
-        """Save elements to a serialized file (e.g., JSON format)."""
+    def save_elements(self, file_path, elements_data, connections_data=None, tables=None):
+        """Save elements to a serialized file: binary project for .avp paths, JSON otherwise.
+
+        tables maps a name to a NumPy array (valve tables, turbine curves, cached results);
+        the binary format stores them raw so they can be memory-mapped when opened.
+        The file is written next to its destination and renamed over it, so a crash
+        mid-save never leaves a half-written project. Returns True on success.
+        """
+        tmp_path = file_path + ".tmp"
         try:
+            if file_path.endswith(PROJECT_EXTENSION):
+                sections = {"elements": elements_data, "connections": connections_data or []}
+                for name, table in (tables or {}).items():
+                    sections[f"tables/{name}"] = table
+                write_project(tmp_path, sections)
+                os.replace(tmp_path, file_path)
+                print(f"Data successfully saved to {file_path}")
+                return True
+
             # Ensure the data is in the correct format
             data_to_save = {"elements": elements_data}  # Wrap the data in the 'elements' key
+            if connections_data is not None:
+                data_to_save["connections"] = connections_data
+            if tables:
+                data_to_save["tables"] = {name: table.tolist() for name, table in tables.items()}
             
-            with open(file_path, 'w') as file:
+            with open(tmp_path, 'w') as file:
                 json.dump(data_to_save, file, indent=4)  # Save the elements data in the correct format
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, file_path)
             
             print(f"Data successfully saved to {file_path}")
+            return True
         except TypeError:
             print("Error: The elements data is not serializable.")
+            return False
 
+    def read_project(self, file_path):
+        """Read a project in either format; returns {"elements", "connections", "tables"}.
+
+        For binary projects tables are memory-mapped and only read when they are used.
+        """
+        if is_project_file(file_path):
+            project = ProjectFile(file_path)
+            return {
+                "elements": project.load("elements", []),
+                "connections": project.load("connections", []),
+                "tables": {name[len("tables/"):]: project.load(name) for name in project.names("tables/")},
+            }
+
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        if not isinstance(data, dict) or 'elements' not in data:
+            raise ValueError("Invalid file structure. Expected a dictionary with an 'elements' key.")
+        data.setdefault("connections", [])
+        data["tables"] = {name: np.asarray(table) for name, table in data.get("tables", {}).items()}
+        return data
+
+    def stream_project(self, file_path, progress=None):
+        """Start reading a project; returns (elements, project).
+
+        elements yields the element data one at a time as the file is parsed, so loading
+        can begin before the whole file has been read; it raises ValueError at the end
+        if the file has no "elements". project receives "connections" and
+        "tables" as they are reached, so use it once elements is exhausted. progress is
+        called with (bytes_read, total_bytes) while a JSON file is read.
+        """
+        if is_project_file(file_path):
+            project = self.read_project(file_path)
+            return iter(project["elements"]), project
+
+        project = {"connections": [], "tables": {}}
+
+        def elements():
+            keys = set()
+            with open(file_path, "rb") as file:
+                for key, value in iter_json_object(file, progress=progress, keys=keys):
+                    if key == "elements":
+                        yield value
+                    elif key == "tables":
+                        project["tables"] = {name: np.asarray(table) for name, table in value.items()}
+                    else:
+                        project[key] = value
+            if "elements" not in keys:
+                raise ValueError("Invalid file structure. Expected a dictionary with an 'elements' key.")
 
+        return elements(), project
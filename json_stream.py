@@ -0,0 +1,139 @@
+"""Incremental reader for large JSON project files.
+
+The file is read in chunks and decoded one value at a time, so the items of the big
+arrays (the "elements" of a project) can be handed on as soon as they are parsed instead
+of after the whole document has been built in memory.
+"""
+import codecs
+import json
+import os
+
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """A sliding text window over a binary file; consumed text is dropped as it goes."""
+
+    def __init__(self, file, chunk_size, progress):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.progress = progress  # Callback(bytes_read, total_bytes) or None
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.total = os.fstat(file.fileno()).st_size
+        self.bytes_read = 0
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        """Read more text; returns False at end of file."""
+        if self.eof:
+            return False
+        data = self.file.read(size or self.chunk_size)
+        self.bytes_read += len(data)
+        if self.pos > self.chunk_size:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += self.decoder.decode(data, final=not data)
+        self.eof = not data
+        if self.progress:
+            self.progress(self.bytes_read, self.total)
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ("" at end of file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Invalid JSON: expected '{char}' at byte {self.bytes_read}.")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Truncated value: read at least as much again, so large values parse in O(size)
+                if not self.fill(max(self.chunk_size, len(self.buffer) - self.pos)):
+                    raise
+                continue
+            # A number followed only by number characters up to the end of the buffer
+            # may continue in the next chunk: "1.5" split as "1." + "5" decodes as 1
+            if (isinstance(value, (int, float)) and not isinstance(value, bool) and not self.eof
+                    and not self.buffer[end:].strip(_NUMBER_CHARS)):
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def expect_end(self):
+        if self.peek() != "":
+            raise ValueError(f"Invalid JSON: unexpected data after the end of the document at byte {self.bytes_read}.")
+
+    def array_items(self):
+        """Yield the items of the JSON array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Invalid JSON: expected ',' or ']' at byte {self.bytes_read}.")
+
+
+def iter_json_object(file, streamed=("elements",), chunk_size=1 << 20, progress=None, keys=None):
+    """Yield (key, value) for each member of the top-level JSON object in a binary file.
+
+    The items of the arrays named in `streamed` are yielded one by one as (key, item).
+    A top-level array is treated as a bare list of elements, as written by old versions.
+    If keys is a set, every top-level key is added to it as it is reached, so that
+    an empty streamed array can be told apart from a missing one.
+    """
+    reader = _Reader(file, chunk_size, progress)
+    if keys is None:
+        keys = set()
+    if reader.peek() == "[":
+        keys.add("elements")
+        for item in reader.array_items():
+            yield "elements", item
+        reader.expect_end()
+        return
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        reader.expect_end()
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        keys.add(key)
+        if key in streamed and reader.peek() == "[":
+            for item in reader.array_items():
+                yield key, item
+        else:
+            yield key, reader.value()
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == "}":
+            reader.expect_end()
+            return
+        if separator != ",":
+            raise ValueError(f"Invalid JSON: expected ',' or '}}' at byte {reader.bytes_read}.")
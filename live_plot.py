@@ -0,0 +1,167 @@
+"""Embedded live plot of a running simulation: head and flow against time at probe nodes,
+and the head profile along the network.
+
+Redraws use matplotlib blitting: the axes, ticks and labels are rendered once into a
+cached background, and each frame only restores that background and draws the lines.
+A full draw happens only when the data leaves the axis limits, which grow ahead of the
+data so that this stays rare. Long histories are reduced to the minimum and maximum
+of each pixel column before drawing, so a frame costs the same for a thousand samples
+as for millions, and peaks are never dropped.
+"""
+import numpy as np
+
+
+def minmax_decimate(x, y, pixels):
+    """Reduce (x, y) to the min and max of y in each of `pixels` equal runs of samples."""
+    if len(x) <= 2 * pixels:
+        return x, y
+    starts = np.linspace(0, len(x), pixels, endpoint=False).astype(np.intp)
+    low = np.minimum.reduceat(y, starts)
+    high = np.maximum.reduceat(y, starts)
+    return np.repeat(x[starts], 2), np.column_stack((low, high)).ravel()
+
+
+class SampleBuffer:
+    """Rows appended in blocks to a NumPy array that doubles in size when full.
+
+    Stored column by column, so that each column of the view is contiguous.
+    """
+
+    def __init__(self, columns, capacity=4096):
+        self.data = np.empty((columns, capacity))
+        self.size = 0
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.data.shape[0])
+        needed = self.size + len(rows)
+        if needed > self.data.shape[1]:
+            grown = np.empty((self.data.shape[0], max(needed, 2 * self.data.shape[1])))
+            grown[:, :self.size] = self.data[:, :self.size]
+            self.data = grown
+        self.data[:, self.size:needed] = rows.T
+        self.size = needed
+
+    def view(self):
+        """The values so far, one row per column: shape (columns, size)."""
+        return self.data[:, :self.size]
+
+
+class LivePlot:
+    """Figure with a time-history plot per quantity and a profile plot, packed into parent."""
+
+    def __init__(self, parent, probe_labels=(), frame_ms=33):
+        from matplotlib.figure import Figure  # Imported when the first plot is shown
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        self.frame_ms = frame_ms
+        self.probe_labels = list(probe_labels)
+        self.steps = SampleBuffer(1)
+        self.head = SampleBuffer(max(len(self.probe_labels), 1))
+        self.flow = SampleBuffer(max(len(self.probe_labels), 1))
+        self.profile = None
+        # Running extremes of each history, kept on append so frames need not scan it
+        self.ranges = {"head": (np.inf, -np.inf), "flow": (np.inf, -np.inf)}
+        self.dirty = False
+        self.background = None
+
+        self.figure = Figure(figsize=(6, 5), dpi=100)
+        self.head_axes, self.flow_axes, self.profile_axes = self.figure.subplots(3, 1)
+        self.head_axes.set_ylabel("Head (m)", fontsize=8)
+        self.flow_axes.set_ylabel("Flow (m³/s)", fontsize=8)
+        self.flow_axes.set_xlabel("Step", fontsize=8)
+        self.profile_axes.set_ylabel("Head (m)", fontsize=8)
+        self.profile_axes.set_xlabel("Position along the network", fontsize=8)
+        # Animated lines are left out of full draws and drawn by blitting only
+        self.head_lines = [self.head_axes.plot([], [], label=label, animated=True)[0] for label in self.probe_labels]
+        self.flow_lines = [self.flow_axes.plot([], [], label=label, animated=True)[0] for label in self.probe_labels]
+        self.profile_line, = self.profile_axes.plot([], [], color="#1f77b4", animated=True)
+        if self.probe_labels:
+            self.head_axes.legend(loc="upper right", fontsize=7)
+        for axes in (self.head_axes, self.flow_axes, self.profile_axes):
+            axes.tick_params(labelsize=7)
+            axes.set_xlim(0, 1)
+            axes.set_ylim(0, 1)
+        self.figure.tight_layout()
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.widget = self.canvas.get_tk_widget()
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.after_id = self.widget.after(self.frame_ms, self._tick)
+
+    def pack(self, **options):
+        self.widget.pack(**options)
+
+    def add_probe_samples(self, steps, head, flow):
+        """Append per-step values at the probe nodes: steps (n,), head and flow (n, probes)."""
+        if not len(steps):
+            return
+        self.steps.extend(steps)
+        self.head.extend(head)
+        self.flow.extend(flow)
+        for name, values in (("head", head), ("flow", flow)):
+            low, high = self.ranges[name]
+            self.ranges[name] = (min(low, float(np.nanmin(values))), max(high, float(np.nanmax(values))))
+        self.dirty = True
+
+    def show_profile(self, head):
+        self.profile = np.asarray(head, dtype=np.float64)
+        self.dirty = True
+
+    def _tick(self):
+        # Frames are drawn on a timer, at most one per frame_ms however fast data arrives
+        if self.dirty:
+            self.dirty = False
+            self._update()
+        self.after_id = self.widget.after(self.frame_ms, self._tick)
+
+    def _set_line_data(self):
+        """Give every line its decimated data; returns True if an axis has to grow."""
+        grow = False
+        steps = self.steps.view()[0]
+        for axes, lines, buffer, name in ((self.head_axes, self.head_lines, self.head, "head"),
+                                          (self.flow_axes, self.flow_lines, self.flow, "flow")):
+            pixels = max(int(axes.bbox.width), 1)
+            values = buffer.view()
+            for i, line in enumerate(lines):
+                line.set_data(*minmax_decimate(steps, values[i], pixels))
+            if len(steps):
+                grow |= self._fit(axes, steps[-1], *self.ranges[name])
+        if self.profile is not None and len(self.profile):
+            positions = np.linspace(0.0, 1.0, len(self.profile))
+            pixels = max(int(self.profile_axes.bbox.width), 1)
+            self.profile_line.set_data(*minmax_decimate(positions, self.profile, pixels))
+            grow |= self._fit(self.profile_axes, 1.0, float(np.nanmin(self.profile)), float(np.nanmax(self.profile)))
+        return grow
+
+    def _fit(self, axes, x_max, low, high):
+        """Widen the limits, with headroom, if the data is outside them."""
+        grow = False
+        x_low, x_high = axes.get_xlim()
+        if x_max > x_high:
+            axes.set_xlim(x_low, x_max * 1.5)
+            grow = True
+        y_low, y_high = axes.get_ylim()
+        if low < y_low or high > y_high:
+            margin = 0.25 * max(high - low, abs(high), 1e-9)
+            axes.set_ylim(min(low, y_low) - margin, max(high, y_high) + margin)
+            grow = True
+        return grow
+
+    def _update(self):
+        if self._set_line_data() or self.background is None:
+            self.canvas.draw()  # New limits: redraw everything and cache a new background
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_lines()
+        self.canvas.blit(self.figure.bbox)
+
+    def _draw_lines(self):
+        for line in self.head_lines + self.flow_lines + [self.profile_line]:
+            line.axes.draw_artist(line)
+
+    def _on_draw(self, event):
+        # After every full draw (including window resizes) the background is cached again
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()
+
+    def close(self):
+        self.widget.after_cancel(self.after_id)
@@ -0,0 +1,144 @@
+"""Ring buffer of console records with per-level and per-word indexes.
+
+Records are (time, level, message) tuples numbered in the order they were added; record n
+is kept in slot n % capacity until it is overwritten. Each level and each lower-case word
+of a message keeps a sorted list of the record numbers it occurs in, so that filtering and
+searching only visit the records that match instead of every record in the buffer.
+A record matches a search when every word of the query starts a word of its message,
+both for records already shown and for records arriving while the search is active.
+
+The level lists are updated on every append. Splitting messages into words costs more,
+so the word lists are brought up to date in slices (index_words) when the console has
+time to spare, and completely before any search that needs them.
+"""
+import re
+from bisect import bisect_left
+from itertools import chain
+
+
+_WORD = re.compile(r"\w+")
+
+
+def words(text):
+    return set(_WORD.findall(text.lower()))
+
+
+class LogIndex:
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.count = 0  # Number of records ever added; the next record gets this number
+        self.by_level = {}  # level -> sorted list of record numbers
+        self.by_word = {}  # word -> sorted list of record numbers
+        self.sorted_words = []  # Keys of by_word in order, for prefix lookups; rebuilt when stale
+        self.words_changed = False
+        self.words_indexed = 0  # Records below this number are in by_word
+
+    def __len__(self):
+        return self.count - self.first
+
+    @property
+    def first(self):
+        """Number of the oldest record still in the buffer."""
+        return max(self.count - self.capacity, 0)
+
+    def get(self, number):
+        return self.slots[number % self.capacity]
+
+    def records(self):
+        """All records in the buffer, oldest first."""
+        return [self.get(number) for number in range(self.first, self.count)]
+
+    def append(self, record):
+        number = self.count
+        self.slots[number % self.capacity] = record
+        self.count += 1
+        self.by_level.setdefault(record[1], []).append(number)
+        if self.count % self.capacity == 0:
+            self._prune()
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def index_words(self, limit=None):
+        """Add up to limit not yet indexed records (all of them by default) to the word lists."""
+        start = max(self.words_indexed, self.first)
+        end = self.count if limit is None else min(self.count, start + limit)
+        by_word = self.by_word
+        for number in range(start, end):
+            for word in words(self.get(number)[2]):
+                numbers = by_word.get(word)
+                if numbers is None:
+                    by_word[word] = [number]
+                    self.words_changed = True
+                else:
+                    numbers.append(number)
+        self.words_indexed = end
+
+    def _prune(self):
+        # Once per capacity appends, drop the numbers of records that have been overwritten
+        first = self.first
+        for index in (self.by_level, self.by_word):
+            for key in list(index):
+                numbers = index[key]
+                del numbers[:bisect_left(numbers, first)]
+                if not numbers:
+                    del index[key]
+                    self.words_changed = True
+
+    def matches(self, record, level="all", query=""):
+        """True if the record has the level and every word of query starts a word of its message."""
+        if level != "all" and record[1] != level:
+            return False
+        query_words = words(query)
+        if not query_words:
+            return True
+        message_words = words(record[2])
+        return all(any(word.startswith(prefix) for word in message_words) for prefix in query_words)
+
+    def _numbers_with_prefix(self, prefix):
+        """Sorted numbers of the records with a word starting with prefix."""
+        if self.words_changed:
+            self.sorted_words = sorted(self.by_word)
+            self.words_changed = False
+        start = bisect_left(self.sorted_words, prefix)
+        end = bisect_left(self.sorted_words, prefix + "\U0010ffff")
+        lists = [self.by_word[word] for word in self.sorted_words[start:end]]
+        if len(lists) == 1:
+            return lists[0]
+        # A record can contain several words with the prefix
+        return sorted(set(chain.from_iterable(lists)))
+
+    def query(self, level="all", query="", limit=None):
+        """Return the newest records (at most limit, oldest first) of a level matching query.
+
+        Candidates come from the shortest of the level list and the lists of records with
+        a word starting with each query word, and are then checked with matches().
+        """
+        first = self.first
+        query_words = words(query)
+        if query_words:
+            self.index_words()
+            lists = [self._numbers_with_prefix(prefix) for prefix in query_words]
+        else:
+            lists = []
+        if level != "all":
+            lists.append(self.by_level.get(level, []))
+        if not lists:
+            numbers, start = range(self.count), first
+        else:
+            numbers = min(lists, key=len)
+            start = bisect_left(numbers, first)
+        check = len(lists) > 1 or bool(query_words)
+
+        found = []
+        # Newest first, so a limited query stops as soon as it has enough matches
+        for i in range(len(numbers) - 1, start - 1, -1):
+            record = self.get(numbers[i])
+            if not check or self.matches(record, level, query):
+                found.append(record)
+                if limit is not None and len(found) == limit:
+                    break
+        found.reverse()
+        return found
@@ -0,0 +1,77 @@
+"""Unique element names of the form <Type>_<n>, reusing the smallest freed number first."""
+import heapq
+
+
+def split_name(name):
+    """Split "Valve_12" into ("Valve", 12); names without a numeric suffix give (name, None)."""
+    prefix, _, suffix = name.rpartition("_")
+    if prefix and suffix.isdigit():
+        return prefix, int(suffix)
+    return name, None
+
+
+class NameAllocator:
+    """Per-type counters plus a min-heap of released numbers.
+
+    Allocation and release are O(log n). Names that are re-used directly (for example
+    when a deleted element is restored by undo) stay in the heap and are skipped lazily.
+    """
+
+    def __init__(self):
+        self.next_index = {}  # type prefix -> first number never handed out
+        self.freed = {}  # type prefix -> min-heap of released numbers
+        self.in_use = set()
+
+    def allocate(self, prefix):
+        """Return and reserve the lowest free name for the given type prefix."""
+        heap = self.freed.get(prefix)
+        while heap:
+            name = f"{prefix}_{heapq.heappop(heap)}"
+            if name not in self.in_use:
+                self.in_use.add(name)
+                return name
+        index = self.next_index.get(prefix, 1)
+        self.next_index[prefix] = index + 1
+        name = f"{prefix}_{index}"
+        self.in_use.add(name)
+        return name
+
+    def allocate_many(self, prefix, count):
+        """Reserve count names for one type in a single call, lowest free numbers first."""
+        names = []
+        heap = self.freed.get(prefix)
+        while heap and len(names) < count:
+            name = f"{prefix}_{heapq.heappop(heap)}"
+            if name not in self.in_use:
+                self.in_use.add(name)
+                names.append(name)
+        start = self.next_index.get(prefix, 1)
+        fresh = [f"{prefix}_{index}" for index in range(start, start + count - len(names))]
+        self.next_index[prefix] = start + len(fresh)
+        self.in_use.update(fresh)
+        return names + fresh
+
+    def reserve(self, name):
+        """Mark an existing name (loaded from a file, restored, renamed to) as taken."""
+        if name in self.in_use:
+            raise ValueError(f"Duplicate element name: {name}")
+        self.in_use.add(name)
+        prefix, index = split_name(name)
+        if index is not None and index >= self.next_index.get(prefix, 1):
+            self.next_index[prefix] = index + 1
+
+    def release(self, name):
+        """Free a name so its number can be handed out again."""
+        self.in_use.discard(name)
+        prefix, index = split_name(name)
+        if index is not None and index < self.next_index.get(prefix, 1):
+            heapq.heappush(self.freed.setdefault(prefix, []), index)
+
+    def rename(self, old_name, new_name):
+        self.reserve(new_name)
+        self.release(old_name)
+
+    def clear(self):
+        self.next_index.clear()
+        self.freed.clear()
+        self.in_use.clear()
@@ -0,0 +1,178 @@
+"""Declarative parameter schemas and typed, column-oriented storage for element parameters.
+
+Every element type declares its parameters (name, unit, dtype, default, bounds, dialog
+label) and owns one ParameterStore holding a NumPy column per parameter; an element
+only keeps the index of its row. Text entered in the dialogs is parsed, converted to
+the parameter's base unit and checked against its bounds once, when it is set, so the
+solver can read the columns directly.
+"""
+import math
+import re
+import numpy as np
+
+
+# Accepted input units for each base unit, as multipliers into the base unit
+UNIT_FACTORS = {
+    "m": {"m": 1.0, "mm": 1e-3, "cm": 1e-2, "km": 1e3},
+    "m asl": {"m asl": 1.0, "m": 1.0},
+    "m2": {"m2": 1.0, "cm2": 1e-4, "mm2": 1e-6},
+    "m/s": {"m/s": 1.0, "km/h": 1 / 3.6},
+    "m3/s": {"m3/s": 1.0, "l/s": 1e-3, "m3/h": 1 / 3600},
+    "s": {"s": 1.0, "ms": 1e-3, "min": 60.0, "h": 3600.0},
+    "rpm": {"rpm": 1.0},
+    "kgm2": {"kgm2": 1.0},
+    "%": {"%": 1.0},
+    "pu": {"pu": 1.0},
+    "-": {"-": 1.0},
+}
+
+_QUANTITY = re.compile(r"^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*(.*?)\s*$")
+
+
+class Parameter:
+    """Schema of one element parameter.
+
+    `bounds` is an inclusive (min, max) pair where either side may be None. A parameter
+    with `choices` is categorical: it is stored as the index of the chosen label.
+    `group` names the dialog tab the field is shown on.
+    """
+
+    def __init__(self, name, unit="-", dtype=np.float64, default=math.nan, bounds=(None, None),
+                 label=None, choices=None, group=None):
+        self.name = name
+        self.unit = unit
+        self.choices = tuple(choices) if choices else None
+        self.dtype = np.dtype(np.int16 if self.choices else dtype)
+        self.default = default
+        self.bounds = bounds
+        self.label = label or name.replace("_", " ").capitalize()
+        self.group = group
+
+    def parse(self, value):
+        """Convert user input (text with an optional unit, or a number) into the base unit."""
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return self.default
+        if self.choices:
+            if isinstance(value, str):
+                if value not in self.choices:
+                    raise ValueError(f"{self.label}: expected one of {', '.join(self.choices)}.")
+                return self.choices.index(value)
+            if not 0 <= value < len(self.choices):
+                raise ValueError(f"{self.label}: no choice number {value}.")
+            return int(value)
+        if isinstance(value, str):
+            match = _QUANTITY.match(value)
+            if not match:
+                raise ValueError(f"{self.label}: '{value}' is not a number.")
+            number, unit = float(match.group(1)), match.group(2)
+            if unit:
+                factors = UNIT_FACTORS.get(self.unit, {self.unit: 1.0})
+                if unit not in factors:
+                    raise ValueError(f"{self.label}: unknown unit '{unit}' (expected {', '.join(factors)}).")
+                number *= factors[unit]
+            value = number
+        if value != value:  # NaN, written by the store itself for an unset value
+            return self.default
+        if not np.isfinite(value):  # Would be written to the project file as a non-standard Infinity
+            raise ValueError(f"{self.label}: {value} is not a finite number.")
+        low, high = self.bounds
+        if (low is not None and value < low) or (high is not None and value > high):
+            raise ValueError(f"{self.label}: {value} is outside [{low}, {high}].")
+        if self.dtype.kind in "iu":
+            if value != int(value):
+                raise ValueError(f"{self.label}: expected a whole number, got {value}.")
+            return int(value)
+        return float(value)
+
+    def export(self, value):
+        """Convert a stored value into its saved form: choice label, number or None if unset."""
+        if self.choices:
+            return self.choices[value]
+        return None if value != value else value
+
+    def display(self, value):
+        """Convert a stored value into the text shown in a dialog entry."""
+        exported = self.export(value)
+        return "" if exported is None else exported
+
+
+class ParameterStore:
+    """Struct-of-arrays storage for all elements of one type; freed rows are reused."""
+
+    def __init__(self, parameters, capacity=16):
+        self.parameters = {parameter.name: parameter for parameter in parameters}
+        self.columns = {
+            parameter.name: np.full(capacity, parameter.default, dtype=parameter.dtype)
+            for parameter in parameters
+        }
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.size = 0  # Rows handed out so far, live or freed
+        self.free_rows = []
+
+    def _grow(self):
+        capacity = len(self.alive) * 2
+        for name, column in self.columns.items():
+            grown = np.full(capacity, self.parameters[name].default, dtype=column.dtype)
+            grown[:len(column)] = column
+            self.columns[name] = grown
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self.alive)] = self.alive
+        self.alive = alive
+
+    def allocate(self):
+        """Return a row initialised with the default values."""
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            if self.size == len(self.alive):
+                self._grow()
+            row = self.size
+            self.size += 1
+        self.alive[row] = True
+        return row
+
+    def release(self, row):
+        for name, column in self.columns.items():
+            column[row] = self.parameters[name].default
+        self.alive[row] = False
+        self.free_rows.append(row)
+
+    def get(self, row, name):
+        return self.columns[name][row].item()
+
+    def set(self, row, name, value):
+        self.columns[name][row] = self.parameters[name].parse(value)
+
+    def export_row(self, row):
+        """Return {name: saved value} for one row, looping once over the schema."""
+        return {name: self.parameters[name].export(column[row].item()) for name, column in self.columns.items()}
+
+    def import_row(self, row, data):
+        """Load every parameter of one row from saved data; returns the errors of rejected values."""
+        errors = []
+        for name, parameter in self.parameters.items():
+            try:
+                self.columns[name][row] = parameter.parse(data.get(name))
+            except (TypeError, ValueError) as e:
+                self.columns[name][row] = parameter.default
+                errors.append(str(e))
+        return errors
+
+    def live_rows(self):
+        """Indices of the rows in use, for reading whole columns at once."""
+        return np.flatnonzero(self.alive[:self.size])
+
+
+class StoredParameter:
+    """Attribute that reads and writes an element's row in its type's ParameterStore."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, element, owner=None):
+        if element is None:
+            return self
+        return element.store.get(element.row, self.name)
+
+    def __set__(self, element, value):
+        element.store.set(element.row, self.name, value)
@@ -0,0 +1,205 @@
+"""Background resource sampling and a live, non-modal panel that plots it.
+
+PerformanceSampler takes a sample every interval on its own thread: system and process
+CPU, the process's resident memory, its disk read and write rates, and the rate of
+every counter registered with add_counter (for example solver steps). The CPU and
+memory of the process's children, i.e. the simulation and batch worker processes, are
+sampled as separate columns; disk rates cover the application process only. Samples go
+into a fixed-size ring buffer, so a long run keeps the most recent capacity samples.
+"""
+import threading
+import time
+import tkinter as tk
+import numpy as np
+
+
+BASE_COLUMNS = ("time", "cpu_system", "cpu_process", "rss_mb", "read_mb_s", "write_mb_s",
+                "cpu_workers", "rss_workers_mb")
+
+
+class PerformanceSampler:
+    def __init__(self, interval=1.0, capacity=3600):
+        self.interval = interval
+        self.capacity = capacity
+        self.counters = {}  # name -> callable returning a running total
+        self.columns = list(BASE_COLUMNS)
+        self.buffer = None  # (capacity, columns) array, allocated on start
+        self.count = 0  # Samples ever taken; the next one goes to row count % capacity
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def add_counter(self, name, read):
+        """Record the rate per second of read(), a running total such as solver steps."""
+        if self.thread:
+            raise RuntimeError("Counters must be added before the sampler is started.")
+        self.counters[name] = read
+        self.columns.append(name)
+
+    def start(self):
+        self.buffer = np.full((self.capacity, len(self.columns)), np.nan)
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="performance-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+
+    def _io_bytes(self, process):
+        try:
+            io = process.io_counters()
+            return io.read_bytes, io.write_bytes
+        except (AttributeError, OSError):  # Not available on every platform
+            return np.nan, np.nan
+
+    def _read_counters(self):
+        totals = []
+        for name, read in self.counters.items():
+            try:
+                totals.append(float(read()))
+            except Exception as e:
+                print(f"Error reading performance counter {name}: {e}")
+                totals.append(np.nan)
+        return totals
+
+    def _sample_workers(self, psutil, process, workers):
+        """Total CPU percent and resident MB of the process's children.
+
+        workers maps pid -> psutil.Process from the previous sample; a child is counted
+        from its second sample on, as its first cpu_percent call only sets a reference.
+        """
+        cpu = rss = 0.0
+        alive = {}
+        try:
+            children = process.children(recursive=True)
+        except psutil.Error:
+            children = []
+        for child in children:
+            known = workers.get(child.pid)
+            try:
+                if known is None:
+                    child.cpu_percent(None)
+                    known = child
+                else:
+                    cpu += known.cpu_percent(None)
+                rss += known.memory_info().rss
+            except psutil.Error:  # Exited, or not ours to inspect
+                continue
+            alive[child.pid] = known
+        workers.clear()
+        workers.update(alive)
+        return cpu, rss / (1 << 20)
+
+    def _run(self):
+        import psutil  # Imported here, so that it is loaded off the Tk thread
+        process = psutil.Process()
+        workers = {}
+        # The first cpu_percent(None) calls only set the reference point for the next ones
+        psutil.cpu_percent(None)
+        process.cpu_percent(None)
+        last_time = time.time()
+        last_io = self._io_bytes(process)
+        last_totals = self._read_counters()
+        self._sample_workers(psutil, process, workers)
+        while not self.stopped.wait(self.interval):
+            now = time.time()
+            elapsed = max(now - last_time, 1e-9)
+            io = self._io_bytes(process)
+            totals = self._read_counters()
+            row = [
+                now,
+                psutil.cpu_percent(None),
+                process.cpu_percent(None),
+                process.memory_info().rss / (1 << 20),
+                (io[0] - last_io[0]) / elapsed / (1 << 20),
+                (io[1] - last_io[1]) / elapsed / (1 << 20),
+                *self._sample_workers(psutil, process, workers),
+            ] + [(total - last) / elapsed for total, last in zip(totals, last_totals)]
+            with self.lock:
+                self.buffer[self.count % self.capacity] = row
+                self.count += 1
+            last_time, last_io, last_totals = now, io, totals
+
+    def history(self):
+        """Return {column: array} of the samples in the buffer, oldest first."""
+        with self.lock:
+            if self.buffer is None:
+                return {name: np.empty(0) for name in self.columns}
+            if self.count <= self.capacity:
+                rows = self.buffer[:self.count].copy()
+            else:
+                start = self.count % self.capacity
+                rows = np.concatenate((self.buffer[start:], self.buffer[:start]))
+        return {name: rows[:, i] for i, name in enumerate(self.columns)}
+
+    def latest(self):
+        """The most recent sample as {column: value}, or None before the first sample."""
+        with self.lock:
+            if not self.count:
+                return None
+            row = self.buffer[(self.count - 1) % self.capacity].copy()
+        return dict(zip(self.columns, row))
+
+
+class PerformancePanel:
+    """Window plotting the sampler's history; refreshed on a timer, it never blocks the UI."""
+
+    def __init__(self, root, sampler, refresh_ms=1000):
+        from matplotlib.figure import Figure  # Imported when the panel is first opened
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        self.sampler = sampler
+        self.refresh_ms = refresh_ms
+        self.window = tk.Toplevel(root)
+        self.window.title("Performance")
+        self.window.geometry("700x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.status = tk.Label(self.window, text="Waiting for the first sample...", anchor="w", font=("Segoe UI", 10))
+        self.status.pack(fill=tk.X)
+
+        # One plot per quantity: (title, columns)
+        plots = [("CPU (%)", ["cpu_system", "cpu_process", "cpu_workers"]), ("Memory (MB)", ["rss_mb", "rss_workers_mb"]),
+                 ("Disk (MB/s)", ["read_mb_s", "write_mb_s"])]
+        if sampler.counters:
+            plots.append(("Counters (per s)", list(sampler.counters)))
+        self.figure = Figure(figsize=(7, 6), dpi=100)
+        self.lines = []
+        for i, (title, columns) in enumerate(plots):
+            axes = self.figure.add_subplot(len(plots), 1, i + 1)
+            axes.set_title(title, fontsize=9)
+            for column in columns:
+                line, = axes.plot([], [], label=column)
+                self.lines.append((axes, line, column))
+            axes.legend(loc="upper left", fontsize=7)
+        self.figure.tight_layout()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.window)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.after_id = self.window.after(0, self.refresh)
+
+    def refresh(self):
+        history = self.sampler.history()
+        if len(history["time"]):
+            seconds = history["time"] - history["time"][-1]  # Seconds before the latest sample
+            for axes, line, column in self.lines:
+                line.set_data(seconds, history[column])
+            for axes in {axes for axes, _, _ in self.lines}:
+                axes.relim()
+                axes.autoscale_view()
+            latest = self.sampler.latest()
+            self.status.config(text=f"CPU {latest['cpu_process']:.0f}% + workers {latest['cpu_workers']:.0f}% "
+                                    f"(system {latest['cpu_system']:.0f}%), memory {latest['rss_mb']:.0f} MB "
+                                    f"+ workers {latest['rss_workers_mb']:.0f} MB, {self.sampler.count} samples")
+            self.canvas.draw_idle()
+        self.after_id = self.window.after(self.refresh_ms, self.refresh)
+
+    def lift(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def close(self):
+        self.window.after_cancel(self.after_id)
+        self.window.destroy()
+        self.window = None
@@ -0,0 +1,112 @@
+"""Binary project container: a header index of sections followed by the section payloads.
+
+Layout: MAGIC, a little-endian uint16 format version and uint32 header length, the
+header as compact JSON, then every section starting on an ALIGNMENT boundary. The header
+maps each section name to its kind, offset and length; "array" sections also record dtype
+and shape and hold the raw array bytes, so they can be memory-mapped instead of parsed.
+Opening a project reads only the header; each section is read when it is asked for.
+"""
+import json
+import os
+import struct
+import numpy as np
+
+
+MAGIC = b"AIRV"
+VERSION = 1
+ALIGNMENT = 64
+PROJECT_EXTENSION = ".avp"
+
+_PREFIX = struct.Struct("<4sHI")  # magic, version, header length
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def write_project(file_path, sections):
+    """Write {name: JSON-serializable value or NumPy array} as a binary project file.
+
+    Section names are free-form; by convention "elements" and "connections" hold the
+    model, "tables/<name>" the time-series tables and "results/<name>" cached results.
+    """
+    payloads = []
+    header = {}
+    offset = 0
+    for name, value in sections.items():
+        if isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            payload = array.reshape(-1).view(np.uint8)  # Raw bytes, no copy
+            entry = {"kind": "array", "dtype": array.dtype.str, "shape": list(array.shape)}
+        else:
+            payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+            entry = {"kind": "json"}
+        entry["length"] = len(payload)
+        entry["offset"] = offset  # Relative to the start of the data area
+        header[name] = entry
+        payloads.append(payload)
+        offset += len(payload) + _padding(len(payload))
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _PREFIX.size + len(header_bytes)
+    data_start += _padding(data_start)
+
+    with open(file_path, "wb") as file:
+        file.write(_PREFIX.pack(MAGIC, VERSION, len(header_bytes)))
+        file.write(header_bytes)
+        file.write(b"\0" * (data_start - file.tell()))
+        for payload in payloads:
+            file.write(payload)
+            file.write(b"\0" * _padding(len(payload)))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def is_project_file(file_path):
+    """Return True if the file starts with the binary project magic."""
+    try:
+        with open(file_path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class ProjectFile:
+    """Read access to a binary project; only the header is read when it is opened."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, "rb") as file:
+            prefix = file.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size:
+                raise ValueError("Invalid project file: truncated header.")
+            magic, version, header_length = _PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise ValueError("Invalid project file: not an Airavata binary project.")
+            if version > VERSION:
+                raise ValueError(f"Project file version {version} is newer than this program supports.")
+            self.sections = json.loads(file.read(header_length).decode("utf-8"))
+        data_start = _PREFIX.size + header_length
+        self.data_start = data_start + _padding(data_start)
+
+    def __contains__(self, name):
+        return name in self.sections
+
+    def names(self, prefix=""):
+        """Section names, optionally only those starting with prefix (e.g. "tables/")."""
+        return [name for name in self.sections if name.startswith(prefix)]
+
+    def load(self, name, default=None):
+        """Return one section: parsed JSON, or a read-only memory-mapped array."""
+        entry = self.sections.get(name)
+        if entry is None:
+            return default
+        offset = self.data_start + entry["offset"]
+        if entry["kind"] == "array":
+            dtype, shape = np.dtype(entry["dtype"]), tuple(entry["shape"])
+            if entry["length"] == 0:
+                return np.empty(shape, dtype=dtype)
+            return np.memmap(self.file_path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        with open(self.file_path, "rb") as file:
+            file.seek(offset)
+            return json.loads(file.read(entry["length"]).decode("utf-8"))
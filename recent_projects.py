@@ -0,0 +1,114 @@
+"""Most-recently-used project list with per-project metadata, kept in the user's home folder.
+
+Each entry records path, size, mtime, element counts by type, the number of connections
+and the icons the project uses. The list is refreshed on a background thread, which also
+prewarms the most recent project (file contents, parsed schedules, decoded icons) so that
+reopening it does not start from cold caches.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+from element import decode_icon
+from schedule_loader import shared_cache
+
+
+INDEX_PATH = os.path.join(os.path.expanduser("~"), ".airavata", "recent_projects.json")
+
+
+class RecentProjects:
+    def __init__(self, index_path=INDEX_PATH, max_entries=10):
+        self.index_path = index_path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()  # Entries are updated from the refresh thread too
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.index_path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return []
+
+    def _write(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with self.lock:
+            entries = list(self.entries)
+        with open(tmp_path, "w") as file:
+            json.dump(entries, file, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def paths(self):
+        with self.lock:
+            return [entry["path"] for entry in self.entries]
+
+    def record(self, file_path, whiteboard):
+        """Move a project to the front of the list with metadata taken from the loaded model."""
+        stat = os.stat(file_path)
+        entry = {
+            "path": file_path,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "element_counts": dict(Counter(type(element).__name__ for element in whiteboard.elements.values())),
+            "connections": len(whiteboard.connections.to_data()),
+            "icons": sorted({element.icon_path for element in whiteboard.elements.values()}),
+            "opened": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self.lock:
+            self.entries = [entry] + [old for old in self.entries if old["path"] != file_path]
+            del self.entries[self.max_entries:]
+        self._write()
+
+    def summary(self, entry):
+        counts = ", ".join(f"{count} {name}" for name, count in sorted(entry["element_counts"].items()))
+        return f"{os.path.basename(entry['path'])}: {counts or 'empty'}; {entry['connections']} connections"
+
+    def refresh_in_background(self, file_manager, prewarm=True):
+        """Re-check every entry on a worker thread, then prewarm the most recent project."""
+        thread = threading.Thread(target=self._refresh, args=(file_manager, prewarm), name="recent-projects", daemon=True)
+        thread.start()
+        return thread
+
+    def _refresh(self, file_manager, prewarm):
+        with self.lock:
+            entries = list(self.entries)
+        refreshed = []
+        for entry in entries:
+            try:
+                stat = os.stat(entry["path"])
+            except OSError:
+                continue  # Deleted or moved: drop it from the list
+            if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]:
+                entry = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                try:
+                    elements, project = file_manager.stream_project(entry["path"])
+                    entry["element_counts"] = dict(Counter(data["class"] for data in elements))
+                    entry["connections"] = len(project["connections"])
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Error reading recent project {entry['path']}: {e}")
+            refreshed.append(entry)
+        with self.lock:
+            # Projects recorded while the refresh was running stay in front
+            recorded = [entry for entry in self.entries if entry not in entries]
+            recorded_paths = {entry["path"] for entry in recorded}
+            self.entries = recorded + [entry for entry in refreshed if entry["path"] not in recorded_paths]
+            del self.entries[self.max_entries:]
+        self._write()
+        if prewarm and refreshed:
+            self.prewarm(refreshed[0])
+
+    def prewarm(self, entry):
+        """Load what reopening a project needs into the OS and application caches."""
+        try:
+            # Read the file once so the open itself is served from the page cache
+            with open(entry["path"], "rb") as file:
+                while file.read(1 << 20):
+                    pass
+            folder = os.path.dirname(entry["path"])
+            shared_cache(folder).load([name for name in os.listdir(folder) if name.endswith(".txt")])
+            for icon_path in entry.get("icons", []):
+                decode_icon(icon_path, (60, 40))  # Size of an icon at zoom 1
+        except (OSError, ValueError) as e:
+            print(f"Error prewarming {entry['path']}: {e}")
@@ -0,0 +1,121 @@
+"""Structured run log: one JSON object per line, written by a background thread.
+
+Callers only put records on a bounded queue, so logging never waits for the disk; when
+the queue is full the record is dropped and counted, and the count is written to the log
+once there is room. The file is rotated by size: run.jsonl becomes run.jsonl.1, the
+previous run.jsonl.1 becomes run.jsonl.2, and so on up to the number of backups kept.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+
+LOG_PATH = os.path.join(os.path.expanduser("~"), ".airavata", "logs", "run.jsonl")
+
+
+def format_record(record):
+    seconds, level, message = record
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(seconds)) + f".{int(seconds % 1 * 1000):03d}"
+    return json.dumps({"time": timestamp, "level": level, "message": str(message)}) + "\n"
+
+
+class RunLog:
+    def __init__(self, path=LOG_PATH, max_bytes=10 << 20, backups=5, queue_size=100000, flush_interval=1.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.records = queue.Queue(maxsize=queue_size)
+        self.dropped = 0  # Records lost because the queue was full
+        self.file = None
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="run-log", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """Write out what is queued and close the file, waiting at most about timeout seconds.
+
+        If the writer thread has already exited, e.g. because the file could not be opened,
+        the queued records are abandoned instead of waiting for room in the queue.
+        """
+        if self.thread:
+            if self.thread.is_alive():
+                try:
+                    self.records.put(None, timeout=timeout)
+                except queue.Full:
+                    pass
+                self.thread.join(timeout)
+            self.thread = None
+
+    def write(self, record):
+        """Queue a (time, level, message) record; never blocks."""
+        try:
+            self.records.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+
+    def _rotate(self):
+        self.file.close()
+        for number in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{number}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{number + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def _write(self, batch):
+        """Write records in one call per file, rotating before a record would take it past max_bytes."""
+        lines = []
+        size = self.file.tell()
+        for record in batch:
+            line = format_record(record)
+            length = len(line.encode("utf-8"))
+            if size and size + length > self.max_bytes:
+                self.file.write("".join(lines))
+                self._rotate()
+                lines, size = [], 0
+            lines.append(line)
+            size += length
+        self.file.write("".join(lines))
+        self.file.flush()
+
+    def _run(self):
+        try:
+            self._open()
+        except OSError as e:
+            print(f"Error opening run log {self.path}: {e}")
+            return
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self.records.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            # Take whatever else is waiting, so it is written in one call
+            while True:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [record for record in batch if record is not None]
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                batch.append((time.time(), "warning", f"Run log queue full: {dropped} records dropped"))
+            try:
+                self._write(batch)
+            except (OSError, ValueError) as e:  # ValueError: the file was closed by a failed rotation
+                print(f"Error writing run log {self.path}: {e}")
+        self.file.close()
@@ -0,0 +1,156 @@
+"""Valve and turbine operation schedules (.txt) parsed once into cached, memory-mapped arrays.
+
+A schedule file is a table of numbers separated by whitespace, commas or semicolons,
+optionally preceded by header lines. Parsed tables are stored as .npy files in the
+project's cache folder; an index keyed by file path, modification time and size tells
+which of them are still valid, so re-opening a project only parses the files that changed.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import numpy as np
+
+
+CACHE_FOLDER = ".airavata_cache"
+INDEX_NAME = "schedules.json"
+
+_FIRST_DATA_LINE = re.compile(r"^[ \t]*[-+]?(?:\d|\.\d)", re.MULTILINE)
+_SEPARATORS = str.maketrans({",": " ", ";": " "})
+
+
+def parse_schedule(file_path):
+    """Parse a schedule file into a float64 array with one row per line."""
+    with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+        text = file.read()
+    match = _FIRST_DATA_LINE.search(text)
+    if not match:
+        return np.empty((0, 0))
+    body = text[match.start():].translate(_SEPARATORS)
+    columns = len(body.split("\n", 1)[0].split())
+    # One pass in C over the whole table instead of splitting it line by line
+    values = np.fromstring(body, sep=" ")
+
+    # Fields per non-blank line, counted on the raw bytes: a field starts after whitespace
+    raw = np.frombuffer(body.encode("utf-8"), dtype=np.uint8)
+    space = (raw == 32) | (raw == 9) | (raw == 10) | (raw == 13)
+    field_starts = np.flatnonzero(~space[1:] & space[:-1]) + 1
+    if len(raw) and not space[0]:
+        field_starts = np.concatenate(([0], field_starts))
+    line_ends = np.concatenate((np.flatnonzero(raw == 10), [len(raw)]))
+    fields = np.diff(np.concatenate(([0], np.searchsorted(field_starts, line_ends))))
+    fields = fields[fields > 0]
+    name = os.path.basename(file_path)
+    ragged = np.flatnonzero(fields != columns)
+    if len(ragged):
+        raise ValueError(f"{name}: data row {ragged[0] + 1} has {fields[ragged[0]]} values, expected {columns}.")
+    if values.size != fields.sum():
+        raise ValueError(f"{name}: not every value is a number.")
+    return values.reshape(-1, columns)
+
+
+class ScheduleCache:
+    """Index of parsed schedules for one project folder.
+
+    Use shared_cache() so that every thread of the application goes through the same
+    instance. Cached arrays are never rewritten in place: a changed schedule is stored
+    under a new file name, so arrays mapped earlier keep their contents.
+    """
+
+    def __init__(self, project_folder):
+        self.project_folder = project_folder
+        self.cache_folder = os.path.join(project_folder, CACHE_FOLDER)
+        self.index_path = os.path.join(self.cache_folder, INDEX_NAME)
+        self.index = self._read_index()
+        self.arrays = {}  # name -> mapped array, handed out again while the file is unchanged
+        self.lock = threading.Lock()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_atomically(self, path, write):
+        """Write a file through a temporary file of its own, so readers never see it half written."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                write(file)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _array_name(self, name, stat):
+        # One file per version of the schedule, so a new version never overwrites a mapped one
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:16]
+        return f"{digest}-{stat.st_mtime_ns:x}-{stat.st_size:x}.npy"
+
+    def _remove_array(self, entry):
+        try:
+            os.remove(os.path.join(self.cache_folder, entry["array"]))
+        except (OSError, KeyError):
+            pass  # Still mapped (Windows), or already gone
+
+    def load(self, names):
+        """Return {name: read-only memory-mapped array} for schedule files in the project folder.
+
+        Files whose path, mtime and size match the index are mapped from the cache;
+        the others are parsed and cached. Files that fail to parse are reported and skipped.
+        """
+        with self.lock:
+            return self._load(names)
+
+    def _load(self, names):
+        os.makedirs(self.cache_folder, exist_ok=True)
+        schedules = {}
+        changed = False
+        for name in names:
+            file_path = os.path.join(self.project_folder, name)
+            stat = os.stat(file_path)
+            entry = self.index.get(name)
+            array_path = os.path.join(self.cache_folder, entry["array"]) if entry and "array" in entry else None
+            if not (array_path and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+                    and os.path.exists(array_path)):
+                try:
+                    array = parse_schedule(file_path)
+                except ValueError as e:
+                    print(f"Error loading schedule: {e}")
+                    continue
+                array_name = self._array_name(name, stat)
+                array_path = os.path.join(self.cache_folder, array_name)
+                self._write_atomically(array_path, lambda file: np.save(file, array))
+                if entry and entry.get("array") != array_name:
+                    self._remove_array(entry)
+                self.index[name] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "array": array_name}
+                self.arrays.pop(name, None)
+                changed = True
+            if name not in self.arrays:
+                self.arrays[name] = np.load(array_path, mmap_mode="r")
+            schedules[name] = self.arrays[name]
+
+        # Forget files that are no longer in the project
+        for name in set(self.index) - set(names):
+            self._remove_array(self.index.pop(name))
+            self.arrays.pop(name, None)
+            changed = True
+        if changed:
+            self._write_atomically(self.index_path, lambda file: file.write(json.dumps(self.index).encode("utf-8")))
+        return schedules
+
+
+_shared = {}  # Project folder -> ScheduleCache
+_shared_lock = threading.Lock()
+
+
+def shared_cache(project_folder):
+    """The ScheduleCache of a project folder, shared by the application and its background threads."""
+    key = os.path.normcase(os.path.abspath(project_folder))
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = ScheduleCache(project_folder)
+        return _shared[key]
@@ -0,0 +1,298 @@
+"""Transient simulations run in worker processes, watched from the Tk loop.
+
+Each job runs TransientSimulation in its own process, so a long run neither blocks the
+GUI nor competes with it for the interpreter lock. The worker reports through one queue
+shared by all jobs: progress, decimated snapshots of head and flow (at most one per
+snapshot_interval seconds), head and flow at the probe nodes for every step (sent in
+batches with the snapshots), and finally the result, an error or the cancellation. The
+JobManager drains that queue on a root.after timer and passes the messages to callbacks.
+
+Pause and cancel are multiprocessing events checked by the worker after every step, in
+the solver's output stage.
+"""
+import multiprocessing
+import queue
+import time
+import traceback
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+from live_plot import LivePlot
+
+
+class Cancelled(Exception):
+    pass
+
+
+def decimate(values, max_points):
+    """Every n-th value, so that at most max_points remain (plus the last one)."""
+    stride = max(1, -(-len(values) // max_points))
+    decimated = np.array(values[::stride])
+    if (len(values) - 1) % stride:
+        decimated = np.append(decimated, values[-1:], axis=0)
+    return decimated
+
+
+def _run_job(job_id, data, steps, profile, probes, running, cancelled, messages, snapshot_interval, max_points):
+    """Worker process: run the simulation and report back through messages."""
+    from transient_simulation import TransientSimulation
+    from solver_profile import SolverProfiler
+    probes = list(probes)
+    probe_steps, probe_head, probe_flow = [], [], []  # Samples not sent yet
+
+    def send_probes():
+        if probe_steps:
+            messages.put(("probes", job_id, np.array(probe_steps), np.array(probe_head), np.array(probe_flow)))
+            probe_steps.clear()
+            probe_head.clear()
+            probe_flow.clear()
+
+    try:
+        simulation = TransientSimulation(profiler=SolverProfiler() if profile else None)
+        # Schedules arrive as the paths of their cached arrays, which are mapped here instead of
+        # being copied through the pipe
+        schedules = {name: np.load(schedule, mmap_mode="r") if isinstance(schedule, str) else schedule
+                     for name, schedule in data.get("schedules", {}).items()}
+        simulation.data = dict(data, schedules=schedules)
+        step = 0
+        last_report = 0.0
+
+        def output(H, Q):
+            nonlocal step, last_report
+            step += 1
+            running.wait()  # Blocks while the job is paused
+            if cancelled.is_set():
+                raise Cancelled()
+            if probes:
+                probe_steps.append(step)
+                probe_head.append(H[probes])
+                probe_flow.append(Q[probes])
+            now = time.monotonic()
+            if now - last_report >= snapshot_interval or step == steps:
+                last_report = now
+                send_probes()
+                messages.put(("progress", job_id, step, steps))
+                messages.put(("snapshot", job_id, step, decimate(H, max_points), decimate(Q, max_points)))
+
+        simulation.output = output
+        H, Q = simulation.method_of_characteristics(steps)
+        report = simulation.profiler.report() if simulation.profiler else None
+        messages.put(("done", job_id, np.asarray(H), np.asarray(Q), report))
+    except Cancelled:
+        send_probes()
+        messages.put(("cancelled", job_id, step))
+    except Exception:
+        messages.put(("failed", job_id, traceback.format_exc()))
+
+
+class SimulationJob:
+    def __init__(self, job_id, steps, process, running, cancelled):
+        self.job_id = job_id
+        self.steps = steps
+        self.process = process
+        self.running = running  # Set while the job may run; cleared to pause it
+        self.cancelled = cancelled
+        self.state = "running"  # running, paused, done, cancelled or failed
+        self.step = 0
+        self.result = None  # (H, Q) once done
+        self.report = None  # Solver profile of a profiled run
+        self.error = None
+
+    @property
+    def finished(self):
+        return self.state in ("done", "cancelled", "failed")
+
+
+class JobManager:
+    """Starts simulation jobs and delivers their messages on the Tk thread."""
+
+    def __init__(self, root, poll_ms=100, snapshot_interval=0.1, max_points=2000):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.snapshot_interval = snapshot_interval
+        self.max_points = max_points  # Points per snapshot array
+        # Spawned rather than forked: a forked copy of a process running Tk is not safe
+        self.context = multiprocessing.get_context("spawn")
+        self.messages = self.context.Queue()
+        self.jobs = {}
+        self.next_id = 1
+        self.steps_done = 0  # Steps run by every job so far, a running total read by the performance monitor
+        self.after_id = None
+        # Callbacks, called on the Tk thread with the job
+        self.on_progress = None
+        self.on_snapshot = None  # Also given the step and the decimated H and Q
+        self.on_probes = None  # Also given the steps and H and Q at the probes, one row per step
+        self.on_finished = None
+
+    def submit(self, data, steps, profile=False, probes=()):
+        """Start a run of steps time steps from the initial data; returns its SimulationJob.
+
+        probes are node indices whose head and flow are reported for every step.
+        """
+        running, cancelled = self.context.Event(), self.context.Event()
+        running.set()
+        job_id = self.next_id
+        self.next_id += 1
+        process = self.context.Process(
+            target=_run_job, name=f"simulation-{job_id}", daemon=True,
+            args=(job_id, data, steps, profile, tuple(probes), running, cancelled, self.messages,
+                  self.snapshot_interval, self.max_points))
+        process.start()
+        job = SimulationJob(job_id, steps, process, running, cancelled)
+        self.jobs[job_id] = job
+        if self.after_id is None:
+            self.after_id = self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def pause(self, job):
+        if job.state == "running":
+            job.running.clear()
+            job.state = "paused"
+
+    def resume(self, job):
+        if job.state == "paused":
+            job.state = "running"
+            job.running.set()
+
+    def cancel(self, job):
+        if not job.finished:
+            job.cancelled.set()
+            job.running.set()  # A paused worker has to wake up to see the cancellation
+
+    def _poll(self):
+        snapshots = {}
+        try:
+            while True:
+                message = self.messages.get_nowait()
+                kind, job = message[0], self.jobs.get(message[1])
+                if job is None:
+                    continue
+                if kind == "snapshot":
+                    snapshots[job.job_id] = (job, message)  # Only the newest one is worth drawing
+                elif kind == "probes":
+                    # Every batch is delivered: together they are the whole time history
+                    if self.on_probes:
+                        self.on_probes(job, message[2], message[3], message[4])
+                elif kind == "progress":
+                    self._advance(job, message[2])
+                    if self.on_progress:
+                        self.on_progress(job)
+                elif kind in ("done", "cancelled", "failed"):
+                    self._finish(job, message)
+        except queue.Empty:
+            pass
+        for job, (_, _, step, H, Q) in snapshots.values():
+            if self.on_snapshot and not job.finished:
+                self.on_snapshot(job, step, H, Q)
+
+        # A worker that died without reporting, e.g. killed by the system
+        for job in list(self.jobs.values()):
+            if not job.finished and not job.process.is_alive() and job.process.exitcode not in (None, 0):
+                self._finish(job, ("failed", job.job_id, f"Worker exited with code {job.process.exitcode}"))
+
+        if any(not job.finished for job in self.jobs.values()):
+            self.after_id = self.root.after(self.poll_ms, self._poll)
+        else:
+            self.after_id = None
+
+    def _finish(self, job, message):
+        kind = message[0]
+        job.state = kind
+        if kind == "done":
+            job.result = (message[2], message[3])
+            job.report = message[4]
+            self._advance(job, job.steps)
+        elif kind == "cancelled":
+            self._advance(job, message[2])
+        else:
+            job.error = message[2]
+        job.process.join(timeout=1)
+        del self.jobs[job.job_id]
+        if self.on_finished:
+            self.on_finished(job)
+
+    def _advance(self, job, step):
+        self.steps_done += step - job.step
+        job.step = step
+
+    def shutdown(self, timeout=2):
+        """Cancel every job and wait for the workers; called when the application closes."""
+        for job in self.jobs.values():
+            self.cancel(job)
+        for job in self.jobs.values():
+            job.process.join(timeout)
+            if job.process.is_alive():
+                job.process.terminate()
+        self.jobs.clear()
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+
+class SimulationPanel:
+    """Non-modal window with the progress of one job, its controls and a live plot."""
+
+    def __init__(self, root, manager, job, probe_labels=(), title="Simulation"):
+        self.manager = manager
+        self.job = job
+        self.window = tk.Toplevel(root)
+        self.window.title(f"{title} {job.job_id}")
+        self.window.geometry("700x750")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.status = tk.Label(self.window, text="Starting...", anchor="w", font=("Segoe UI", 10))
+        self.status.pack(fill=tk.X, padx=10, pady=(10, 0))
+        self.progress = ttk.Progressbar(self.window, maximum=job.steps)
+        self.progress.pack(fill=tk.X, padx=10, pady=5)
+
+        # Packed before the plot, so the buttons keep their space when the window shrinks
+        buttons = tk.Frame(self.window)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
+        self.pause_button = tk.Button(buttons, text="Pause", width=10, command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT, padx=10)
+        self.cancel_button = tk.Button(buttons, text="Cancel", width=10, command=lambda: manager.cancel(job))
+        self.cancel_button.pack(side=tk.RIGHT, padx=10)
+
+        # History at the probe nodes and the head profile at the latest snapshot
+        self.plot = LivePlot(self.window, probe_labels)
+        self.plot.pack(fill=tk.BOTH, expand=True, padx=10)
+
+    def toggle_pause(self):
+        if self.job.state == "paused":
+            self.manager.resume(self.job)
+            self.pause_button.config(text="Pause")
+            self.update_progress()
+        else:
+            self.manager.pause(self.job)
+            self.pause_button.config(text="Resume")
+            self.status.config(text=f"Paused at step {self.job.step} of {self.job.steps}")
+
+    def update_progress(self):
+        if self.window:
+            self.progress["value"] = self.job.step
+            self.status.config(text=f"Step {self.job.step} of {self.job.steps}")
+
+    def show_snapshot(self, H):
+        if self.window:
+            self.plot.show_profile(H)
+
+    def show_probes(self, steps, H, Q):
+        if self.window:
+            self.plot.add_probe_samples(steps, H, Q)
+
+    def finish(self):
+        if not self.window:
+            return
+        self.progress["value"] = self.job.step
+        if self.job.result:
+            self.plot.show_profile(self.job.result[0])  # Full resolution; decimated per pixel when drawn
+        texts = {"done": "Finished", "cancelled": f"Cancelled at step {self.job.step}", "failed": "Failed"}
+        self.status.config(text=texts[self.job.state])
+        self.pause_button.config(state=tk.DISABLED)
+        self.cancel_button.config(text="Close", command=self.close)
+
+    def close(self):
+        """Closing the window does not stop the job; use Cancel for that."""
+        self.plot.close()
+        self.window.destroy()
+        self.window = None
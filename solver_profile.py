@@ -0,0 +1,105 @@
+"""Per-stage timing of the transient solver.
+
+A solver without a profiler pays nothing but an `if profiler:` test per stage. With one,
+each stage ends with `since = profiler.lap(stage, since)`, which adds the time since the
+previous lap to that stage. Stages are named "interior", "junctions", "boundary:<kind>"
+and "output". The profiler also counts steps and samples the process's resident memory
+every memory_every steps to keep the run's high-water mark.
+"""
+import json
+import os
+import time
+
+
+class SolverProfiler:
+    def __init__(self, memory_every=100):
+        self.memory_every = memory_every
+        self.totals = {}  # stage -> seconds
+        self.calls = {}  # stage -> number of laps
+        self.steps = 0
+        self.started = None
+        self.finished = None
+        self.peak_rss = 0
+        self.process = None
+
+    def start_run(self):
+        self.totals.clear()
+        self.calls.clear()
+        self.steps = 0
+        self.peak_rss = 0
+        try:
+            import psutil
+            self.process = psutil.Process()
+        except ImportError:
+            self.process = None  # No memory high-water mark without psutil
+        self._sample_memory()
+        self.started = time.perf_counter()
+        self.finished = None
+        return self.started
+
+    def lap(self, stage, since):
+        """Add the time since `since` to stage; returns the current time for the next lap."""
+        now = time.perf_counter()
+        self.totals[stage] = self.totals.get(stage, 0.0) + (now - since)
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        return now
+
+    def end_step(self):
+        self.steps += 1
+        if self.steps % self.memory_every == 0:
+            self._sample_memory()
+
+    def end_run(self):
+        self.finished = time.perf_counter()
+        self._sample_memory()
+
+    def _sample_memory(self):
+        if self.process is not None:
+            self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+
+    def report(self):
+        """Timing of the last run as a JSON-serializable dict."""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        wall = end - self.started if self.started is not None else 0.0
+        timed = sum(self.totals.values())
+        stages = {
+            stage: {
+                "seconds": seconds,
+                "calls": self.calls[stage],
+                "mean_us": seconds / self.calls[stage] * 1e6,
+                "share": seconds / timed if timed else 0.0,
+            }
+            for stage, seconds in sorted(self.totals.items(), key=lambda item: -item[1])
+        }
+        return {
+            "steps": self.steps,
+            "wall_seconds": wall,
+            "steps_per_second": self.steps / wall if wall else 0.0,
+            "peak_rss_mb": self.peak_rss / (1 << 20) if self.process is not None else None,
+            "stages": stages,
+        }
+
+    def format_report(self):
+        return format_report(self.report())
+
+    def save_report(self, path):
+        save_report(self.report(), path)
+
+
+def format_report(report):
+    """A report from SolverProfiler.report() as lines of text, slowest stage first."""
+    lines = [f"Solver: {report['steps']} steps in {report['wall_seconds']:.3f} s "
+             f"({report['steps_per_second']:.0f} steps/s)"]
+    if report["peak_rss_mb"] is not None:
+        lines[0] += f", peak memory {report['peak_rss_mb']:.0f} MB"
+    for stage, timing in report["stages"].items():
+        lines.append(f"  {stage}: {timing['seconds']:.3f} s ({timing['share']:.0%}), "
+                     f"{timing['mean_us']:.1f} us per call")
+    return lines
+
+
+def save_report(report, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(report, file, indent=4)
+    os.replace(tmp_path, path)
@@ -0,0 +1,81 @@
+"""Reusable sub-network templates: elements with all their properties plus their internal connections."""
+import copy
+import json
+
+
+def make_template(elements, connections):
+    """Capture elements and the connections among them, positioned relative to their top-left corner."""
+    elements = list(elements)
+    if not elements:
+        raise ValueError("No elements selected.")
+    names = {element.name for element in elements}
+    x0 = min(element.x for element in elements)
+    y0 = min(element.y for element in elements)
+
+    elements_data = []
+    for element in elements:
+        data = copy.deepcopy(element.to_data())
+        data["x"] = element.x - x0
+        data["y"] = element.y - y0
+        elements_data.append(data)
+
+    # Only connections with both ends inside the selection belong to the template
+    internal = []
+    seen = set()
+    for element in elements:
+        for edge in connections.edges_of(element):
+            if edge in seen:
+                continue
+            seen.add(edge)
+            data = connections.edge_data(edge)
+            if data["from"] in names and data["to"] in names:
+                internal.append(data)
+
+    return {
+        "elements": elements_data,
+        "connections": internal,
+        "width": max(data["x"] for data in elements_data) + 60,
+        "height": max(data["y"] for data in elements_data) + 40,
+    }
+
+
+def instantiate(template, new_names, dx, dy):
+    """Return (elements_data, connections) for one copy of the template.
+
+    new_names maps each template element name to the name of its copy; the copy is
+    shifted by (dx, dy). A Pipe.source_pipe inside the template is redirected to the copy.
+    """
+    elements_data = []
+    for data in template["elements"]:
+        data = copy.deepcopy(data)
+        data["name"] = new_names[data["name"]]
+        data["x"] += dx
+        data["y"] += dy
+        if data.get("source_pipe") in new_names:
+            data["source_pipe"] = new_names[data["source_pipe"]]
+        elements_data.append(data)
+
+    connections = [
+        dict(connection, **{"from": new_names[connection["from"]], "to": new_names[connection["to"]]})
+        for connection in template["connections"]
+    ]
+    return elements_data, connections
+
+
+def save_template(file_path, template):
+    """Write a template to a JSON file."""
+    with open(file_path, "w") as file:
+        json.dump(template, file, indent=4)
+
+
+def load_template(file_path):
+    """Read a template written by save_template."""
+    with open(file_path, "r") as file:
+        template = json.load(file)
+    if not isinstance(template, dict) or "elements" not in template:
+        raise ValueError("Invalid template file. Expected a dictionary with an 'elements' key.")
+    for key in ("width", "height"):
+        if isinstance(template.get(key), bool) or not isinstance(template.get(key), (int, float)):
+            raise ValueError(f"Invalid template file. Expected a number for '{key}'.")
+    template.setdefault("connections", [])
+    return template
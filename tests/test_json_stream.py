@@ -0,0 +1,65 @@
+"""json_stream must decode a document the same way at every chunk size."""
+import json
+
+import pytest
+
+from json_stream import iter_json_object
+
+
+PROJECT = {
+    "elements": [
+        {"name": "Pipe_1", "class": "Pipe", "x": 1.5, "y": -20, "length": 1.25e3, "wave_speed": 1200.0},
+        {"name": "Reservoir_1", "class": "Reservoir", "x": 123456, "y": 0.001, "head": -3.5E-2, "open": True},
+        {"name": "Valve_1", "class": "Valve", "x": 7, "y": 8, "label": "café 水", "closure": None},
+    ],
+    "connections": [["Pipe_1", 0, "Reservoir_1", 1], ["Pipe_1", 1, "Valve_1", 0]],
+    "tables": {"curve": [[0, 1.5], [10, 2.25]]},
+    "version": 12345,
+}
+
+
+def _parse(text, chunk_size, tmp_path):
+    path = tmp_path / "project.json"
+    path.write_bytes(text.encode("utf-8"))
+    keys = set()
+    members = {}
+    with open(path, "rb") as file:
+        for key, value in iter_json_object(file, chunk_size=chunk_size, keys=keys):
+            if key == "elements":
+                members.setdefault("elements", []).append(value)
+            else:
+                members[key] = value
+    return members, keys
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 65))
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_chunk_size_decodes_the_same(chunk_size, indent, tmp_path):
+    members, keys = _parse(json.dumps(PROJECT, indent=indent, ensure_ascii=False), chunk_size, tmp_path)
+    assert members == PROJECT
+    assert keys == set(PROJECT)
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 17))
+def test_top_level_array_is_a_list_of_elements(chunk_size, tmp_path):
+    members, keys = _parse(json.dumps(PROJECT["elements"]), chunk_size, tmp_path)
+    assert members == {"elements": PROJECT["elements"]}
+    assert keys == {"elements"}
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 17))
+def test_empty_elements_are_told_apart_from_missing_ones(chunk_size, tmp_path):
+    assert _parse('{"elements": []}', chunk_size, tmp_path) == ({}, {"elements"})
+    assert _parse('{"connections": []}', chunk_size, tmp_path) == ({"connections": []}, {"connections"})
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 20])
+@pytest.mark.parametrize("text", ['{"elements": [1]} junk', '[1, 2] 3', '{} {}', '{"elements": [1], }', '{"elements": [1'])
+def test_invalid_documents_are_rejected(text, chunk_size, tmp_path):
+    with pytest.raises(ValueError):
+        _parse(text, chunk_size, tmp_path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1 << 20])
+def test_trailing_whitespace_is_accepted(chunk_size, tmp_path):
+    assert _parse('{"elements": [1]}\n  \n', chunk_size, tmp_path) == ({"elements": [1]}, {"elements"})
@@ -4,16 +4,22 @@ import tkinter.filedialog as filedialog
 # other imports...
 
 class TransientSimulation:
-    def __init__(self, data=None):
+    def __init__(self, data=None, profiler=None):
         # Handle default or empty initialization
         if data is None or data == "":
             # Initialize with default values
             self.data = {
                 "H_initial": np.zeros(10),  # Example: default head array
-                "Q_initial": np.zeros(10)  # Example: default flow array
+                "Q_initial": np.zeros(10),  # Example: default flow array
+                "schedules": {}  # Operation schedules by .txt file name, one row per time: arrays, or .npy paths
             }
         else:
             self.data = self.parse_data(data)  # Parse provided data
+        self.steps_done = 0  # Running total of solver steps run by this instance
+        self.junctions = []  # Callables (H, Q) updating junction nodes every step
+        self.boundaries = []  # (kind, callable (H, Q)) boundary conditions, e.g. ("valve", ...)
+        self.output = None  # Callable (H, Q) receiving the results of every step
+        self.profiler = profiler  # SolverProfiler timing each stage, or None to run without timing
 
     def parse_data(self, raw_data):
         # Parse the raw data into the expected format
@@ -24,17 +30,45 @@ class TransientSimulation:
             "Q_initial": np.zeros(10)
         }
 
-    def method_of_characteristics(self):
+    def method_of_characteristics(self, steps=1):
         # Main computational procedure
         H, Q = self.data["H_initial"], self.data["Q_initial"]
+        # Without a profiler each stage costs only the `if profiler:` test
+        profiler = self.profiler
+        if profiler:
+            since = profiler.start_run()
 
-        # Placeholder for numerical scheme
-        for i in range(1, len(H) - 1):
-            # Example calculations
-            # self.compute_continuity(...)
-            # self.compute_momentum(...)
-            pass
+        for step in range(steps):
+            # Placeholder for numerical scheme
+            for i in range(1, len(H) - 1):
+                # Example calculations
+                # self.compute_continuity(...)
+                # self.compute_momentum(...)
+                pass
+            if profiler:
+                since = profiler.lap("interior", since)
 
+            for junction in self.junctions:
+                junction(H, Q)
+            if profiler:
+                since = profiler.lap("junctions", since)
+
+            for kind, boundary in self.boundaries:
+                boundary(H, Q)
+                if profiler:
+                    since = profiler.lap("boundary:" + kind, since)
+
+            if self.output:
+                self.output(H, Q)
+                if profiler:
+                    since = profiler.lap("output", since)
+
+            self.steps_done += 1
+            if profiler:
+                profiler.end_step()
+
+        if profiler:
+            profiler.end_run()
         return H, Q
 
     def compute_continuity(self, H, Q):
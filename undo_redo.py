@@ -0,0 +1,216 @@
+"""Command log for Whiteboard undo/redo; each entry stores only the delta of one edit."""
+from collections import deque
+from contextlib import contextmanager
+
+
+class Command:
+    """An undoable edit. Elements are referred to by name so commands survive delete/re-create."""
+
+    description = "Edit"
+
+    def undo(self, whiteboard):
+        raise NotImplementedError
+
+    def redo(self, whiteboard):
+        raise NotImplementedError
+
+    def merge(self, other):
+        """Fold a following command into this one; return True if it was absorbed."""
+        return False
+
+
+class MoveCommand(Command):
+    description = "Move"
+
+    def __init__(self, name, dx, dy):
+        self.name = name
+        self.dx = dx
+        self.dy = dy
+
+    def undo(self, whiteboard):
+        whiteboard.move_element(whiteboard.get_element(self.name), -self.dx, -self.dy)
+
+    def redo(self, whiteboard):
+        whiteboard.move_element(whiteboard.get_element(self.name), self.dx, self.dy)
+
+    def merge(self, other):
+        # Consecutive drag events of one element collapse into a single move
+        if isinstance(other, MoveCommand) and other.name == self.name:
+            self.dx += other.dx
+            self.dy += other.dy
+            return True
+        return False
+
+
+class PropertyCommand(Command):
+    description = "Edit property"
+
+    def __init__(self, name, attribute, old, new):
+        self.name = name
+        self.attribute = attribute
+        self.old = old
+        self.new = new
+
+    def undo(self, whiteboard):
+        whiteboard.get_element(self.name).set_property(self.attribute, self.old)
+
+    def redo(self, whiteboard):
+        whiteboard.get_element(self.name).set_property(self.attribute, self.new)
+
+
+class RenameCommand(Command):
+    description = "Rename"
+
+    def __init__(self, old_name, new_name):
+        self.old_name = old_name
+        self.new_name = new_name
+
+    def undo(self, whiteboard):
+        whiteboard.rename_element(whiteboard.get_element(self.new_name), self.old_name)
+
+    def redo(self, whiteboard):
+        whiteboard.rename_element(whiteboard.get_element(self.old_name), self.new_name)
+
+
+class CreateCommand(Command):
+    description = "Create"
+
+    def __init__(self, data):
+        self.data = data  # Serialized element, as written by to_data()
+
+    def undo(self, whiteboard):
+        whiteboard.remove_element(whiteboard.get_element(self.data["name"]))
+
+    def redo(self, whiteboard):
+        whiteboard.create_from_data(self.data)
+
+
+class DeleteCommand(Command):
+    description = "Delete"
+
+    def __init__(self, data, connections):
+        self.data = data
+        self.connections = connections  # The element's connections, by name
+
+    def undo(self, whiteboard):
+        whiteboard.create_from_data(self.data)
+        whiteboard.load_connections(self.connections)
+
+    def redo(self, whiteboard):
+        whiteboard.remove_element(whiteboard.get_element(self.data["name"]))
+
+
+class PasteCommand(Command):
+    description = "Paste"
+
+    def __init__(self, elements_data, connections):
+        self.elements_data = elements_data  # Serialized elements of every pasted copy
+        self.connections = connections  # Connections among them, by name
+
+    def undo(self, whiteboard):
+        for data in self.elements_data:
+            whiteboard.remove_element(whiteboard.get_element(data["name"]), refresh=False)
+        whiteboard.refresh_viewport()
+
+    def redo(self, whiteboard):
+        for data in self.elements_data:
+            whiteboard.create_from_data(data, draw=False)
+        whiteboard.load_connections(self.connections)
+
+
+class ClearCommand(Command):
+    description = "Clear"
+
+    def __init__(self, elements_data, connections):
+        self.elements_data = elements_data  # Every element on the board before the clear
+        self.connections = connections
+
+    def undo(self, whiteboard):
+        whiteboard.load_elements(self.elements_data)
+        whiteboard.load_connections(self.connections)
+
+    def redo(self, whiteboard):
+        for data in self.elements_data:
+            whiteboard.remove_element(whiteboard.get_element(data["name"]), refresh=False)
+        whiteboard.refresh_viewport()
+
+
+class ConnectCommand(Command):
+    description = "Connect"
+
+    def __init__(self, connection):
+        self.connection = connection  # {"from", "from_port", "to", "to_port"}
+
+    def undo(self, whiteboard):
+        whiteboard.disconnect_by_data(self.connection)
+
+    def redo(self, whiteboard):
+        whiteboard.load_connections([self.connection])
+
+
+class DisconnectCommand(ConnectCommand):
+    description = "Disconnect"
+
+    def undo(self, whiteboard):
+        super().redo(whiteboard)
+
+    def redo(self, whiteboard):
+        super().undo(whiteboard)
+
+
+class UndoStack:
+    """Bounded undo history plus a redo list that is discarded by any new edit."""
+
+    def __init__(self, max_size=500):
+        self.undo_commands = deque(maxlen=max_size)  # Oldest entries fall off automatically
+        self.redo_commands = []
+        self.sealed = True  # When False the top command may still absorb follow-up edits
+        self.paused = 0
+
+    def record(self, command, mergeable=False):
+        """Push a command, merging it into the previous one while a gesture is open."""
+        if self.paused:
+            return
+        self.redo_commands.clear()
+        if mergeable and not self.sealed and self.undo_commands and self.undo_commands[-1].merge(command):
+            return
+        self.undo_commands.append(command)
+        self.sealed = not mergeable
+
+    def seal(self):
+        """End the current gesture so the next edit starts a new command."""
+        self.sealed = True
+
+    @contextmanager
+    def pause(self):
+        """Suspend recording while commands are being applied."""
+        self.paused += 1
+        try:
+            yield
+        finally:
+            self.paused -= 1
+
+    def undo(self, whiteboard):
+        if not self.undo_commands:
+            return None
+        command = self.undo_commands.pop()
+        with self.pause():
+            command.undo(whiteboard)
+        self.redo_commands.append(command)
+        self.sealed = True
+        return command.description
+
+    def redo(self, whiteboard):
+        if not self.redo_commands:
+            return None
+        command = self.redo_commands.pop()
+        with self.pause():
+            command.redo(whiteboard)
+        self.undo_commands.append(command)
+        self.sealed = True
+        return command.description
+
+    def clear(self):
+        self.undo_commands.clear()
+        self.redo_commands.clear()
+        self.sealed = True
@@ -0,0 +1,160 @@
+"""Project versions stored as content-addressed blobs.
+
+Every element record, the connection list and every data table is stored once under the
+SHA-256 of its content, so versions share whatever did not change between them. A version
+is a small manifest blob mapping element names (and table names) to blob hashes; the
+ordered list of versions of each project is kept in <project>.versions.json next to the
+object store, which all projects in a folder share.
+"""
+import hashlib
+import io
+import json
+import os
+import time
+import zlib
+import numpy as np
+
+
+STORE_FOLDER = ".airavata_versions"
+
+
+def _encode(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class ObjectStore:
+    """Compressed blobs addressed by the SHA-256 of their uncompressed content."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def put(self, data):
+        """Store bytes unless an identical blob exists; returns the blob's hash."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(zlib.compress(data, 1))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest):
+        with open(self._path(digest), "rb") as file:
+            return zlib.decompress(file.read())
+
+    def put_json(self, value):
+        return self.put(_encode(value))
+
+    def get_json(self, digest):
+        return json.loads(self.get(digest).decode("utf-8"))
+
+    def put_array(self, array):
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(array), allow_pickle=False)
+        return self.put(buffer.getvalue())
+
+    def get_array(self, digest):
+        return np.load(io.BytesIO(self.get(digest)), allow_pickle=False)
+
+
+class ProjectVersions:
+    """Snapshots of one project's model in the object store of its folder."""
+
+    def __init__(self, project_folder, project_name):
+        self.root = os.path.join(project_folder, STORE_FOLDER)
+        self.store = ObjectStore(self.root)
+        self.versions_path = os.path.join(self.root, f"{project_name}.versions.json")
+        self.versions = self._read_versions()
+        # Hashes from the last snapshot, reused for elements that have not changed since
+        self.element_hashes = {}
+        self.connections_hash = None
+        self.snapshot_change = None  # Whiteboard.change_count at the last snapshot
+        self.table_hashes = {}  # id(table) -> (table, hash); tables are read-only, hashed once per object
+
+    def _read_versions(self):
+        try:
+            with open(self.versions_path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return []
+
+    def _write_versions(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.versions_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.versions, file, indent=4)
+        os.replace(tmp_path, self.versions_path)
+
+    def _table_hash(self, table):
+        cached = self.table_hashes.get(id(table))
+        if cached is None or cached[0] is not table:
+            cached = (table, self.store.put_array(table))
+            self.table_hashes[id(table)] = cached
+        return cached[1]
+
+    def snapshot(self, whiteboard, message="", tables=None):
+        """Store the current model as a new version; only changed elements are serialized."""
+        since = self.snapshot_change
+        element_hashes = {}
+        for name, element in whiteboard.elements.items():
+            digest = self.element_hashes.get(name)
+            if digest is None or since is None or whiteboard.revisions.get(name, 0) > since:
+                digest = self.store.put_json(element.to_data())
+            element_hashes[name] = digest
+        if self.connections_hash is None or since is None or whiteboard.connections_revision > since:
+            self.connections_hash = self.store.put_json(whiteboard.connections.to_data())
+
+        manifest = {
+            "elements": element_hashes,
+            "connections": self.connections_hash,
+            "tables": {name: self._table_hash(table) for name, table in (tables or {}).items()},
+        }
+        version = {
+            "version": f"v{len(self.versions) + 1}",
+            "manifest": self.store.put_json(manifest),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "message": message,
+        }
+        self.versions.append(version)
+        self._write_versions()
+        self.element_hashes = element_hashes
+        self.snapshot_change = whiteboard.change_count
+        return version["version"]
+
+    def manifest(self, version):
+        for entry in self.versions:
+            if entry["version"] == version:
+                return self.store.get_json(entry["manifest"])
+        raise KeyError(f"No version {version}")
+
+    def diff(self, old_version, new_version):
+        """Return the element names "added", "removed" and "changed" between two versions,
+        and the names of the tables added, removed or changed as "tables_changed".
+
+        Only the manifests are compared; element records and tables are never loaded.
+        """
+        old_manifest, new_manifest = self.manifest(old_version), self.manifest(new_version)
+        old, new = old_manifest["elements"], new_manifest["elements"]
+        old_tables, new_tables = old_manifest.get("tables", {}), new_manifest.get("tables", {})
+        return {
+            "added": sorted(new.keys() - old.keys()),
+            "removed": sorted(old.keys() - new.keys()),
+            "changed": sorted(name for name in old.keys() & new.keys() if old[name] != new[name]),
+            "connections_changed": old_manifest["connections"] != new_manifest["connections"],
+            "tables_changed": sorted(name for name in old_tables.keys() | new_tables.keys()
+                                     if old_tables.get(name) != new_tables.get(name)),
+        }
+
+    def load(self, version):
+        """Return the project data of a version, as FileManager.read_project does."""
+        manifest = self.manifest(version)
+        return {
+            "elements": [self.store.get_json(digest) for digest in manifest["elements"].values()],
+            "connections": self.store.get_json(manifest["connections"]),
+            "tables": {name: self.store.get_array(digest) for name, digest in manifest["tables"].items()},
+        }
@@ -0,0 +1,115 @@
+"""Viewport transform, spatial index and level-of-detail rules for the Whiteboard canvas."""
+import math
+
+
+# Level-of-detail modes, from most to least expensive to draw
+LOD_DETAIL = "detail"    # Icon, label and both ports
+LOD_GLYPH = "glyph"      # One coloured rectangle per element
+LOD_CLUSTER = "cluster"  # One rectangle per occupied grid cell
+
+GLYPH_ZOOM = 0.6     # Below this zoom elements are drawn as glyphs
+CLUSTER_ZOOM = 0.15  # Below this zoom glyphs are merged per grid cell
+MIN_ZOOM = 0.02
+MAX_ZOOM = 4.0
+
+# Model-space extent of an element around its (x, y) anchor (ports and label included)
+ELEMENT_EXTENT = (-10, -20, 70, 50)
+
+
+class Viewport:
+    """Maps model coordinates to canvas pixels: canvas = (model - origin) * zoom."""
+
+    def __init__(self, x0=0.0, y0=0.0, zoom=1.0):
+        self.x0 = x0
+        self.y0 = y0
+        self.zoom = zoom
+
+    def to_canvas(self, x, y):
+        """Convert a model point into canvas pixels."""
+        return (x - self.x0) * self.zoom, (y - self.y0) * self.zoom
+
+    def to_model(self, cx, cy):
+        """Convert canvas pixels into a model point."""
+        return cx / self.zoom + self.x0, cy / self.zoom + self.y0
+
+    def bounds(self, width, height):
+        """Return the model-space rectangle (x0, y0, x1, y1) shown in a width x height canvas."""
+        x1, y1 = self.to_model(width, height)
+        return self.x0, self.y0, x1, y1
+
+    def pan(self, dx, dy):
+        """Shift the view by (dx, dy) canvas pixels."""
+        self.x0 -= dx / self.zoom
+        self.y0 -= dy / self.zoom
+
+    def zoom_at(self, factor, cx, cy):
+        """Scale the view by factor, keeping the model point under (cx, cy) fixed."""
+        mx, my = self.to_model(cx, cy)
+        self.zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        self.x0 = mx - cx / self.zoom
+        self.y0 = my - cy / self.zoom
+
+    def lod(self):
+        """Return the level of detail appropriate for the current zoom."""
+        if self.zoom < CLUSTER_ZOOM:
+            return LOD_CLUSTER
+        if self.zoom < GLYPH_ZOOM:
+            return LOD_GLYPH
+        return LOD_DETAIL
+
+
+class SpatialIndex:
+    """Uniform grid of element anchors so viewport queries only touch nearby cells."""
+
+    def __init__(self, cell_size=200):
+        self.cell_size = cell_size
+        self.cells = {}  # (i, j) -> set of elements
+        self.cell_of = {}  # element -> (i, j)
+
+    def _key(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def insert(self, element, x, y):
+        key = self._key(x, y)
+        self.cells.setdefault(key, set()).add(element)
+        self.cell_of[element] = key
+
+    def remove(self, element):
+        key = self.cell_of.pop(element, None)
+        if key is None:
+            return
+        bucket = self.cells[key]
+        bucket.discard(element)
+        if not bucket:
+            del self.cells[key]
+
+    def move(self, element, x, y):
+        """Re-bucket an element only when it crosses a cell boundary."""
+        key = self._key(x, y)
+        if self.cell_of.get(element) != key:
+            self.remove(element)
+            self.cells.setdefault(key, set()).add(element)
+            self.cell_of[element] = key
+
+    def clear(self):
+        self.cells.clear()
+        self.cell_of.clear()
+
+    def _cell_range(self, x0, y0, x1, y1):
+        i0, j0 = self._key(x0 - ELEMENT_EXTENT[2], y0 - ELEMENT_EXTENT[3])
+        i1, j1 = self._key(x1 - ELEMENT_EXTENT[0], y1 - ELEMENT_EXTENT[1])
+        # When zoomed far out it is cheaper to scan the occupied cells than the whole range
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self.cells):
+            return [key for key in self.cells if i0 <= key[0] <= i1 and j0 <= key[1] <= j1]
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1) if (i, j) in self.cells]
+
+    def query(self, x0, y0, x1, y1):
+        """Return the elements whose drawn extent may intersect the given model rectangle."""
+        found = []
+        for key in self._cell_range(x0, y0, x1, y1):
+            found.extend(self.cells[key])
+        return found
+
+    def occupied_cells(self, x0, y0, x1, y1):
+        """Return {(i, j): element count} for occupied cells intersecting the rectangle."""
+        return {key: len(self.cells[key]) for key in self._cell_range(x0, y0, x1, y1)}
@@ -1,9 +1,16 @@
 import tkinter as tk
 from tkinter import simpledialog, messagebox
-from element import InletReservoir, OutletReservoir, Valve, Manifold, SurgeTank, Turbine, Pipe
+from element import InletReservoir, OutletReservoir, Valve, Manifold, SurgeTank, Turbine, Pipe, element_registry
 from file_manager import FileManager  # Assuming this manages file open/save
+from viewport import Viewport, SpatialIndex, LOD_CLUSTER, LOD_DETAIL
+from connection_graph import ConnectionGraph, INLET, OUTLET
+from undo_redo import (UndoStack, MoveCommand, PropertyCommand, CreateCommand, DeleteCommand,
+                       ConnectCommand, DisconnectCommand, RenameCommand, PasteCommand, ClearCommand)
+from name_allocator import NameAllocator
+from templates import make_template, instantiate, save_template, load_template
 import os
 import json  # Add this import statement
+from collections import Counter
 import tkinter.filedialog as filedialog
 
 
@@ -14,26 +21,60 @@ class Whiteboard(tk.Frame):
         super().__init__(parent)
         self.canvas = tk.Canvas(self, bg="white", width=800, height=600)
         self.canvas.pack(fill=tk.BOTH, expand=True)
-        # Initialize a dictionary to keep track of element counts
-        self.element_counts = {}
-        # You may also need to track existing elements by name if necessary
-        self.deleted_elements = set()  # Track deleted elements for each type
-        # Initialize a counter for unique element names
-        self.element_counter = 0
+        # Unique <Type>_<n> names; numbers of deleted elements are reused smallest first
+        self.name_allocator = NameAllocator()
         # File-related attributes
         self.file_manager = FileManager(project_folder)  # Pass the project_folder to the FileManager
         self.current_file = None
         self.is_file_open = False
 
         # UI components
-        self.elements = []  # List to hold created elements
+        self.elements = {}  # Element name -> element, in creation order
         self.selected_element = None  # Currently selected element
+        self.selected_group = []  # Elements added to the selection with Shift+click
+        self.clipboard = None  # Template captured by copy_selection()
         self.status_label = tk.Label(self, text=f"File Open: {self.file_manager.current_file}", bg="lightgrey", anchor="w")
         self.status_label.pack(fill=tk.X)
 
+        # Viewport state: only elements inside the visible area exist as canvas items
+        self.viewport = Viewport()
+        self.spatial_index = SpatialIndex()  # Grid of element positions for viewport queries
+        self.materialized = {}  # Element -> level of detail it is currently drawn at
+        self.item_owner = {}  # Canvas item id -> element that drew it
+        self.cluster_items = []  # Canvas items of the zoomed-out cluster view
+        self.drawn_lod = None  # Level of detail of the items currently on the canvas
+        self.pan_anchor = None
+
+        # Pipe connections between element ports
+        self.connections = ConnectionGraph()
+        self.edge_items = {}  # Edge id -> canvas line
+        self.pending_port = None  # (element, port) clicked first while making a connection
+
+        # Undo/redo history of edits, stored as deltas
+        self.undo_stack = UndoStack()
+
+        # Changes not yet handed to the autosave journal
+        self.dirty_elements = set()  # Names of created or edited elements
+        self.deleted_names = set()
+        self.connections_changed = False
+        # Change numbers of the last edit of each element and of the connections, for snapshots
+        self.change_count = 0
+        self.revisions = {}
+        self.connections_revision = 0
+
         self.create_context_menu()
         self.canvas.bind("<Button-3>", self.show_context_menu)  # Right-click for context menu
         self.canvas.bind("<Button-1>", self.on_click)  # Left-click for element selection
+        self.canvas.bind("<Shift-Button-1>", self.on_shift_click)  # Shift+click to select several elements
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)  # Zoom (Windows/macOS)
+        self.canvas.bind("<Button-4>", self.on_mouse_wheel)  # Zoom in (X11)
+        self.canvas.bind("<Button-5>", self.on_mouse_wheel)  # Zoom out (X11)
+        self.canvas.bind("<ButtonPress-2>", self.on_pan_start)  # Middle-drag to pan
+        self.canvas.bind("<B2-Motion>", self.on_pan_motion)
+        self.canvas.bind("<Configure>", lambda event: self.refresh_viewport())
+        self.canvas.bind("<ButtonRelease-1>", lambda event: self.undo_stack.seal())  # A drag ends here
+        self.winfo_toplevel().bind("<Control-z>", lambda event: self.undo())
+        self.winfo_toplevel().bind("<Control-y>", lambda event: self.redo())
 
     def create_context_menu(self):
         """Creates the context menu for adding elements and other actions."""
@@ -46,8 +87,19 @@ class Whiteboard(tk.Frame):
         self.context_menu.add_command(label="Turbine", command=self.add_turbine)
         self.context_menu.add_command(label="Pipe", command=self.add_Pipe)
         self.context_menu.add_separator()
+        self.context_menu.add_command(label="Undo", command=self.undo)
+        self.context_menu.add_command(label="Redo", command=self.redo)
+        self.context_menu.add_separator()
         self.context_menu.add_command(label="Duplicate", command=self.duplicate_element)
+        self.context_menu.add_command(label="Rename", command=self.rename_selected_element)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="Copy", command=self.copy_selection)
+        self.context_menu.add_command(label="Paste", command=self.paste)
+        self.context_menu.add_command(label="Stamp Copies...", command=self.stamp_copies)
+        self.context_menu.add_command(label="Save as Template...", command=self.save_selection_as_template)
+        self.context_menu.add_command(label="Stamp Template...", command=self.stamp_template_file)
         self.context_menu.add_command(label="Delete", command=self.delete_element)
+        self.context_menu.add_command(label="Disconnect", command=self.disconnect_element)
 
     def show_context_menu(self, event):
         """Displays the context menu only if a file is open."""
@@ -59,14 +111,12 @@ class Whiteboard(tk.Frame):
         item = self.canvas.find_closest(event.x, event.y)
 
         # Check if the clicked item corresponds to any element
-        if item:
-            for element in self.elements:
-                if element.icon_item == item[0]:
-                    if self.selected_element:
-                        self.selected_element.remove_highlight()  # Remove highlight from the previous selection
-                    self.selected_element = element  # Set the clicked element as the selected element
-                    element.apply_highlight()  # Apply highlight to the selected element
-                    break
+        element = self.item_owner.get(item[0]) if item else None
+        if element:
+            if self.selected_element:
+                self.selected_element.remove_highlight()  # Remove highlight from the previous selection
+            self.selected_element = element  # Set the clicked element as the selected element
+            element.apply_highlight()  # Apply highlight to the selected element
 
         # Show the context menu at the position where the right-click occurred
         self.context_menu.post(event.x_root, event.y_root)
@@ -77,44 +127,14 @@ class Whiteboard(tk.Frame):
             messagebox.showwarning("Action Denied", "Please open or create a file first.")
             return
 
-        # Initialize the counter for the element type if it's not already
-        if element_class.__name__ not in self.element_counts:
-            self.element_counts[element_class.__name__] = 0
-
-        # Handle deletion adjustments: check if there are any deleted elements
-        if self.deleted_elements:
-            # Find the smallest deleted number and reuse it
-            available_numbers = [
-                int(name.split('_')[1].split()[0]) for name in self.deleted_elements if name.startswith(element_class.__name__)
-            ]
-            if available_numbers:
-                next_available = min(available_numbers)
-                name = f"{element_class.__name__}_{next_available}"
-                
-                # Check if the name is in the deleted list before removing it
-                if name in self.deleted_elements:
-                    self.deleted_elements.remove(name)  # Remove the name from deleted set
-            else:
-                self.element_counts[element_class.__name__] += 1
-                name = f"{element_class.__name__}_{self.element_counts[element_class.__name__]}"
-        else:
-            # No deleted elements, continue as normal
-            self.element_counts[element_class.__name__] += 1
-            name = f"{element_class.__name__}_{self.element_counts[element_class.__name__]}"
-
         # Create and add the new element to the canvas
-        name = self.get_new_element_name()
+        name = self.name_allocator.allocate(element_class.__name__)
         element = element_class(self.canvas, name)  # Pass both canvas and name
-        self.elements[name] = element
-        element.create()
-        self.elements.append(element)
+        # Place the new element near the top-left corner of the current view
+        element.x, element.y = self.viewport.to_model(100, 100)
+        self.register_element(element)
+        self.undo_stack.record(CreateCommand(element.to_data()))
         return element
-    
-    def get_new_element_name(self):
-        """Generate a unique name for a new element."""
-        self.element_counter += 1
-        return f"Element_{self.element_counter}"
-
 
     def add_inlet_reservoir(self):
         self.add_element(InletReservoir)
@@ -143,39 +163,163 @@ class Whiteboard(tk.Frame):
             return
 
         item = self.canvas.find_closest(event.x, event.y)
-        clicked_on_element = False
+        element = self.item_owner.get(item[0]) if item else None
+        clicked_on_element = element is not None
+
+        if element and item[0] in (element.inlet_port, element.outlet_port):
+            self.on_port_click(element, INLET if item[0] == element.inlet_port else OUTLET)
+            return
 
-        for element in self.elements:
-            if element.icon_item == item[0]:
-                clicked_on_element = True
-                if self.selected_element and self.selected_element != element:
-                    self.selected_element.remove_highlight()
-                self.selected_element = element
-                element.apply_highlight()
-                break
+        self.pending_port = None  # Clicking anything other than a port cancels a connection
+
+        if element:
+            if self.selected_element and self.selected_element != element:
+                self.selected_element.remove_highlight()
+            self.selected_element = element
+            element.apply_highlight()
 
         if not clicked_on_element and self.selected_element:
             self.selected_element.remove_highlight()
             self.selected_element = None
+        self.clear_group_selection()
+
+    def on_shift_click(self, event):
+        """Add an element to, or remove it from, the multi-element selection."""
+        if not self.is_file_open:
+            return
+        item = self.canvas.find_closest(event.x, event.y)
+        element = self.item_owner.get(item[0]) if item else None
+        if element is None:
+            return
+        if element in self.selected_group:
+            self.selected_group.remove(element)
+            self.mark_group_member(element, False)
+        else:
+            self.selected_group.append(element)
+            self.mark_group_member(element, True)
+
+    def mark_group_member(self, element, selected):
+        """Outline a grouped element, whichever level of detail it is drawn at."""
+        if element.rect_item:
+            self.canvas.itemconfig(element.rect_item, state="normal" if selected else "hidden")
+        if element.glyph_item:
+            self.canvas.itemconfig(element.glyph_item, outline="blue" if selected else "", width=2)
+
+    def clear_group_selection(self):
+        for element in self.selected_group:
+            self.mark_group_member(element, False)
+        self.selected_group = []
+
+    def selection(self):
+        """Return the Shift+click group, or the single selected element."""
+        if self.selected_group:
+            return list(self.selected_group)
+        return [self.selected_element] if self.selected_element else []
+
+    def copy_selection(self):
+        """Copy the selected elements, their properties and internal connections as a template."""
+        elements = self.selection()
+        if elements:
+            self.clipboard = make_template(elements, self.connections)
+
+    def paste(self):
+        if self.clipboard:
+            self.stamp_template(self.clipboard)
+
+    def stamp_copies(self):
+        """Ask for a count and stamp that many copies of the selection side by side."""
+        elements = self.selection()
+        if not elements:
+            return
+        count = simpledialog.askinteger("Stamp Copies", "Number of copies:", minvalue=1, maxvalue=10000, parent=self)
+        if count:
+            template = make_template(elements, self.connections)
+            x0 = min(element.x for element in elements)
+            y0 = max(element.y for element in elements) + template["height"] + 60
+            self.stamp_template(template, count, origin=(x0, y0))
+
+    def save_selection_as_template(self):
+        elements = self.selection()
+        if not elements:
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Save Template", defaultextension=".json", filetypes=[("JSON Files", "*.json")]
+        )
+        if file_path:
+            save_template(file_path, make_template(elements, self.connections))
+
+    def stamp_template_file(self):
+        """Stamp copies of a template saved to disk."""
+        if not self.is_file_open:
+            messagebox.showwarning("Action Denied", "Please open or create a file first.")
+            return
+        file_path = filedialog.askopenfilename(title="Open Template", filetypes=[("JSON Files", "*.json")])
+        if not file_path:
+            return
+        count = simpledialog.askinteger("Stamp Template", "Number of copies:", minvalue=1, maxvalue=10000, parent=self)
+        if count:
+            try:
+                self.stamp_template(load_template(file_path), count)
+            except (json.JSONDecodeError, ValueError, KeyError) as e:
+                messagebox.showerror("Template Error", f"Failed to stamp the template. Error: {e}")
+
+    def stamp_template(self, template, count=1, origin=None, columns=None, spacing=100):
+        """Create count copies of a template in one batch and return the new elements.
+
+        Names for every copy are allocated up front, the model is filled without drawing,
+        and the canvas is refreshed once at the end. The whole stamp is a single undo step.
+        If a copy cannot be built, the copies made so far are removed and the names released.
+        """
+        if origin is None:
+            origin = self.viewport.to_model(100, 100)
+        columns = columns or count
+        step_x = template["width"] + spacing
+        step_y = template["height"] + spacing
+
+        # Bulk name allocation: one allocator call per element type
+        per_type = Counter(data["class"] for data in template["elements"])
+        allocated = {cls: self.name_allocator.allocate_many(cls, n * count) for cls, n in per_type.items()}
+        names = {cls: iter(allocated_names) for cls, allocated_names in allocated.items()}
+
+        elements_data, connections, created = [], [], []
+        deleted_before = set(self.deleted_names)
+        try:
+            for index in range(count):
+                new_names = {data["name"]: next(names[data["class"]]) for data in template["elements"]}
+                dx = origin[0] + (index % columns) * step_x
+                dy = origin[1] + (index // columns) * step_y
+                copy_data, copy_connections = instantiate(template, new_names, dx, dy)
+                elements_data.extend(copy_data)
+                connections.extend(copy_connections)
+            for data in elements_data:
+                created.append(self.create_from_data(data, draw=False, reserve_name=False))
+        except Exception:
+            for element in created:
+                self.remove_element(element, refresh=False)  # Also releases its name
+            used = {element.name for element in created}
+            for allocated_names in allocated.values():
+                for name in allocated_names:
+                    if name not in used:
+                        self.name_allocator.release(name)
+            self.deleted_names = deleted_before  # The removed copies were never saved
+            self.refresh_viewport()
+            raise
+        for element, data in zip(created, elements_data):
+            if data.get("source_pipe"):
+                element.source_pipe = self.elements.get(data["source_pipe"])
+        self.load_connections(connections)  # Connects everything, then draws the view once
+        self.undo_stack.record(PasteCommand(elements_data, connections))
+        return created
 
     def duplicate_element(self):
-        """Duplicate the currently selected element."""
+        """Duplicate the currently selected element, including its properties."""
         if self.selected_element:
             # Retrieve the element to be duplicated
             original_element = self.selected_element
             
-            # Create a duplicate with a new name
-            duplicate = type(original_element)(self.canvas, original_element.name + " (copy)")
-            
-            # Set the duplicate's position slightly offset to avoid overlap
-            duplicate.x = original_element.x + 20
-            duplicate.y = original_element.y + 20
-            
-            # Create the duplicate element
-            duplicate.create()
-            
-            # Add it to the canvas or the list of elements
-            self.elements.append(duplicate)
+            # Copy it through a one-element template, slightly offset to avoid overlap
+            template = make_template([original_element], self.connections)
+            duplicate, = self.stamp_template(template, origin=(original_element.x + 20, original_element.y + 20))
             
             # Optionally, set the newly created duplicate as the selected element
             self.selected_element = duplicate
@@ -184,74 +328,397 @@ class Whiteboard(tk.Frame):
     def delete_element(self):
         """Deletes the selected element from the canvas."""
         if self.selected_element:
-            # Track the name of the element before deletion
-            element_name = self.selected_element.name
-            if element_name:
-                # Add the element name to the deleted set (so it can be reused later)
-                self.deleted_elements.add(element_name)
-
-            # Proceed with the actual deletion
-            items_to_delete = [
-                self.selected_element.icon_item,
-                self.selected_element.label_id,
-                self.selected_element.inlet_port,
-                self.selected_element.outlet_port,
-                self.selected_element.rect_item,
-                self.selected_element.highlight_rect,
-            ]
-            for item in items_to_delete:
-                if item:
-                    self.canvas.delete(item)
-
-            self.elements.remove(self.selected_element)
+            element = self.selected_element
+            connections = [self.connections.edge_data(edge) for edge in self.connections.edges_of(element)]
+            self.undo_stack.record(DeleteCommand(element.to_data(), connections))
+            self.remove_element(element)
+
+    def remove_element(self, element, refresh=True):
+        """Remove an element, its canvas items and its connections from the model.
+
+        When removing many elements, pass refresh=False and call refresh_viewport() once after.
+        """
+        # Free the name so its number can be reused later
+        self.name_allocator.release(element.name)
+
+        self.deleted_names.add(element.name)
+        self.dirty_elements.discard(element.name)
+        self.revisions.pop(element.name, None)
+
+        # Proceed with the actual deletion
+        for edge in self.connections.remove_element(element):
+            self.undraw_edge(edge)
+            self.mark_connections_changed()
+        self.dematerialize(element)
+        self.spatial_index.remove(element)
+
+        del self.elements[element.name]
+        element.release_parameters()
+        if self.selected_element is element:
             self.selected_element = None
+        if element in self.selected_group:
+            self.selected_group.remove(element)
+        if refresh and self.drawn_lod == LOD_CLUSTER:
+            self.refresh_viewport()
 
 
+    def delete_all(self):
+        """Delete every element and connection as a single undoable edit."""
+        if not self.elements:
+            return
+        elements_data = [element.to_data() for element in self.elements.values()]
+        connections = self.connections.to_data()
+        for element in list(self.elements.values()):
+            self.remove_element(element, refresh=False)
+        self.refresh_viewport()
+        self.undo_stack.record(ClearCommand(elements_data, connections))
+
     def clear(self):
         """Clears all elements from the whiteboard."""
-        for element in self.elements[:]:
-            self.selected_element = element
-            self.delete_element()
+        for element in list(self.materialized):
+            self.dematerialize(element)
+        self.clear_clusters()
+        for edge in list(self.edge_items):
+            self.undraw_edge(edge)
+        self.connections.clear()
+        self.pending_port = None
+        self.undo_stack.clear()
+        self.name_allocator.clear()
+        self.spatial_index.clear()
+        for element in self.elements.values():
+            element.release_parameters()
+        self.deleted_names.update(self.elements)
+        self.dirty_elements.clear()
+        self.revisions.clear()
+        self.mark_connections_changed()
         self.elements.clear()
         self.selected_element = None
+        self.selected_group = []
+
+    def register_element(self, element, draw=True):
+        """Add an element to the model; it is only drawn if it falls inside the viewport."""
+        element.on_move = self.on_element_moved
+        element.on_property_change = self.on_element_property_changed
+        self.spatial_index.insert(element, element.x, element.y)
+        self.connections.add_element(element)
+        self.elements[element.name] = element
+        self.mark_changed(element.name)
+        if draw:
+            if self.viewport.lod() == LOD_CLUSTER:
+                self.refresh_viewport()
+            elif self.is_visible(element):
+                self.materialize(element, self.viewport.lod())
+
+    def on_element_moved(self, element, dx, dy):
+        """Keep the spatial index and the element's own pipe lines in step with a drag."""
+        self.spatial_index.move(element, element.x, element.y)
+        self.update_edge_lines(element)
+        self.mark_changed(element.name)
+        self.undo_stack.record(MoveCommand(element.name, dx, dy), mergeable=True)
+
+    def on_element_property_changed(self, element, attribute, old, new):
+        self.mark_changed(element.name)
+        self.undo_stack.record(PropertyCommand(element.name, attribute, old, new))
+
+    def mark_changed(self, name):
+        """Record that an element was created or edited."""
+        self.dirty_elements.add(name)
+        self.change_count += 1
+        self.revisions[name] = self.change_count
+
+    def mark_connections_changed(self):
+        self.connections_changed = True
+        self.change_count += 1
+        self.connections_revision = self.change_count
+
+    def take_changes(self):
+        """Return journal records for the changes since the last call and mark the model clean."""
+        records = [{"delete": name} for name in self.deleted_names]
+        records += [{"put": self.elements[name].to_data()} for name in self.dirty_elements]
+        if self.connections_changed:
+            records.append({"connections": self.connections.to_data()})
+        self.mark_clean()
+        return records
+
+    def mark_clean(self):
+        """Forget pending changes, e.g. once the model has been loaded from or saved to a file."""
+        self.dirty_elements.clear()
+        self.deleted_names.clear()
+        self.connections_changed = False
+
+    def get_element(self, name):
+        """Return the element with the given name."""
+        return self.elements[name]
+
+    def rename_element(self, element, new_name):
+        """Give an element a new unique name."""
+        old_name = element.name
+        if new_name == old_name:
+            return
+        self.name_allocator.rename(old_name, new_name)  # Raises ValueError if the name is taken
+        del self.elements[old_name]
+        self.elements[new_name] = element
+        element.name = element.label = new_name
+        self.deleted_names.add(old_name)
+        self.dirty_elements.discard(old_name)
+        self.revisions.pop(old_name, None)
+        self.mark_changed(new_name)
+        if self.connections.edges_of(element):
+            self.mark_connections_changed()  # Saved connections refer to elements by name
+        if element.label_id:
+            self.canvas.itemconfig(element.label_id, text=new_name)
+        self.undo_stack.record(RenameCommand(old_name, new_name))
+
+    def rename_selected_element(self):
+        if not self.selected_element:
+            return
+        new_name = simpledialog.askstring("Rename", "New name:", initialvalue=self.selected_element.name, parent=self)
+        if new_name and new_name.strip():
+            try:
+                self.rename_element(self.selected_element, new_name.strip())
+            except ValueError as e:
+                messagebox.showwarning("Rename Error", str(e))
+
+    def create_from_data(self, element_data, draw=True, reserve_name=True):
+        """Create an element from its serialized form and add it to the model."""
+        element_class = element_registry.get(element_data["class"])
+        if element_class is None:
+            raise ValueError(f"Unknown element type: {element_data['class']}")
+        element = element_class(self.canvas, element_data["name"])
+        try:
+            element.load_from_data(element_data)
+            if reserve_name:
+                self.name_allocator.reserve(element.name)  # Raises ValueError on a duplicate name
+        except Exception:
+            element.release_parameters()
+            raise
+        self.register_element(element, draw=draw)
+        return element
 
-    def open_file(self):
-        """Open a file and load its content onto the canvas."""
-        file_path = filedialog.askopenfilename(
-            title="Open File",
-            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
+    def move_element(self, element, dx, dy):
+        """Move an element by (dx, dy) model units."""
+        element.x += dx
+        element.y += dy
+        for item in element.canvas_items():
+            self.canvas.move(item, dx * self.viewport.zoom, dy * self.viewport.zoom)
+        self.on_element_moved(element, dx, dy)
+        self.refresh_viewport()
+
+    def undo(self):
+        """Revert the most recent edit; returns its description, or None if there is none."""
+        return self.undo_stack.undo(self)
+
+    def redo(self):
+        """Re-apply the most recently undone edit; returns its description, or None."""
+        return self.undo_stack.redo(self)
+
+    def on_port_click(self, element, port):
+        """Connect ports by clicking an outlet and then an inlet."""
+        if self.pending_port is None:
+            if port == OUTLET:
+                self.pending_port = (element, port)
+            return
+        src, src_port = self.pending_port
+        self.pending_port = None
+        if port == INLET and element is not src:
+            try:
+                self.connect_elements(src, element, src_port, port)
+            except ValueError as e:
+                messagebox.showwarning("Connection Error", str(e))
+
+    def connect_elements(self, src, dst, src_port=OUTLET, dst_port=INLET):
+        """Connect two element ports and draw the pipe line; returns the edge id."""
+        edge = self.connections.connect(src, src_port, dst, dst_port)
+        self.mark_connections_changed()
+        if src in self.materialized or dst in self.materialized:
+            self.draw_edge(edge)
+        self.undo_stack.record(ConnectCommand(self.connections.edge_data(edge)))
+        return edge
+
+    def disconnect_edge(self, edge):
+        self.undo_stack.record(DisconnectCommand(self.connections.edge_data(edge)))
+        self.undraw_edge(edge)
+        self.connections.disconnect(edge)
+        self.mark_connections_changed()
+
+    def disconnect_by_data(self, connection):
+        """Remove the connection described by a serialized edge."""
+        edge = self.connections.find_edge(
+            self.get_element(connection["from"]), connection["from_port"],
+            self.get_element(connection["to"]), connection["to_port"],
         )
+        if edge is not None:
+            self.disconnect_edge(edge)
 
-        if not file_path:
-            messagebox.showinfo("No File Selected", "No file was selected.")
+    def disconnect_element(self):
+        """Remove every connection of the selected element."""
+        if self.selected_element:
+            for edge in list(self.connections.edges_of(self.selected_element)):
+                self.disconnect_edge(edge)
+
+    def load_connections(self, connections_data):
+        """Recreate saved connections after the elements have been loaded."""
+        for connection in connections_data:
+            try:
+                self.connections.connect(
+                    self.elements[connection["from"]], connection.get("from_port", OUTLET),
+                    self.elements[connection["to"]], connection.get("to_port", INLET),
+                )
+            except (KeyError, ValueError) as e:
+                print(f"Error loading connection: {e}")
+        self.mark_connections_changed()
+        self.refresh_viewport()
+
+    def port_position(self, element, port):
+        """Return the model coordinates of the centre of an element's port."""
+        if port == INLET:
+            return element.x - 5, element.y + 25
+        return element.x + 55, element.y + 25
+
+    def edge_coords(self, edge):
+        src, src_port, dst, dst_port = self.connections.endpoints(edge)
+        x0, y0 = self.viewport.to_canvas(*self.port_position(src, src_port))
+        x1, y1 = self.viewport.to_canvas(*self.port_position(dst, dst_port))
+        return x0, y0, x1, y1
+
+    def draw_edge(self, edge):
+        if edge in self.edge_items:
+            return
+        line = self.canvas.create_line(*self.edge_coords(edge), fill="#1f4e79", width=2, arrow=tk.LAST)
+        self.canvas.tag_lower(line)  # Keep pipes underneath the element icons
+        self.edge_items[edge] = line
+
+    def undraw_edge(self, edge):
+        line = self.edge_items.pop(edge, None)
+        if line:
+            self.canvas.delete(line)
+
+    def update_edge_lines(self, element):
+        """Re-route only the lines attached to one element."""
+        for edge in self.connections.edges_of(element):
+            line = self.edge_items.get(edge)
+            if line:
+                self.canvas.coords(line, *self.edge_coords(edge))
+            else:
+                self.draw_edge(edge)
+
+    def visible_bounds(self):
+        """Return the model-space rectangle currently shown on the canvas."""
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width <= 1 or height <= 1:  # Not mapped yet, fall back to the requested size
+            width, height = int(self.canvas.cget("width")), int(self.canvas.cget("height"))
+        return self.viewport.bounds(width, height)
+
+    def is_visible(self, element):
+        """Check whether any part of the element lies inside the viewport."""
+        x0, y0, x1, y1 = self.visible_bounds()
+        return x0 - 70 <= element.x <= x1 + 10 and y0 - 50 <= element.y <= y1 + 20
+
+    def materialize(self, element, lod):
+        """Create the canvas items for an element at the given level of detail."""
+        if lod == LOD_DETAIL:
+            element.create(self.viewport)
+        else:
+            element.create_glyph(self.viewport)
+        for item in element.canvas_items():
+            self.item_owner[item] = element
+        self.materialized[element] = lod
+        if element in self.selected_group:
+            self.mark_group_member(element, True)
+
+    def dematerialize(self, element):
+        """Delete an element's canvas items, leaving it in the model only."""
+        for item in element.canvas_items():
+            self.item_owner.pop(item, None)
+        element.remove_from_canvas()
+        self.materialized.pop(element, None)
+
+    def clear_clusters(self):
+        for item in self.cluster_items:
+            self.canvas.delete(item)
+        self.cluster_items = []
+
+    def draw_clusters(self, bounds):
+        """Draw one shaded rectangle per occupied grid cell; darker cells hold more elements."""
+        size = self.spatial_index.cell_size
+        for (i, j), count in self.spatial_index.occupied_cells(*bounds).items():
+            x0, y0 = self.viewport.to_canvas(i * size, j * size)
+            x1, y1 = self.viewport.to_canvas((i + 1) * size, (j + 1) * size)
+            fill = "#b0b0b0" if count < 5 else "#707070" if count < 25 else "#303030"
+            self.cluster_items.append(self.canvas.create_rectangle(x0, y0, x1, y1, fill=fill, outline=""))
+
+    def refresh_viewport(self, redraw=False):
+        """Draw elements that came into view and drop the items of those that left it."""
+        lod = self.viewport.lod()
+        bounds = self.visible_bounds()
+        if redraw or lod != self.drawn_lod:
+            for element in list(self.materialized):
+                self.dematerialize(element)
+            for edge in list(self.edge_items):
+                self.undraw_edge(edge)
+            self.drawn_lod = lod
+        self.clear_clusters()
+
+        if lod == LOD_CLUSTER:
+            self.draw_clusters(bounds)
             return
 
-        try:
-            # Load elements from the selected file
-            with open(file_path, 'r') as file:
-                elements_data = json.load(file)
-            
-            if not isinstance(elements_data, dict) or 'elements' not in elements_data:
-                raise ValueError("Invalid file structure. Expected a dictionary with an 'elements' key.")
-            
-            # Clear existing elements before loading new ones
-            self.whiteboard.clear()
+        visible = set(self.spatial_index.query(*bounds))
+        for element in [element for element in self.materialized if element not in visible]:
+            self.dematerialize(element)
+        for element in visible:
+            if element not in self.materialized:
+                self.materialize(element, lod)
+
+        # Pipe lines are drawn while at least one of their ends is on the canvas
+        for edge in list(self.edge_items):
+            src, _, dst, _ = self.connections.endpoints(edge)
+            if src not in self.materialized and dst not in self.materialized:
+                self.undraw_edge(edge)
+        for element in self.materialized:
+            for edge in self.connections.edges_of(element):
+                self.draw_edge(edge)
+
+    def on_mouse_wheel(self, event):
+        """Zoom in or out around the mouse pointer."""
+        factor = 1.2 if event.num == 4 or event.delta > 0 else 1 / 1.2
+        self.viewport.zoom_at(factor, event.x, event.y)
+        self.refresh_viewport(redraw=True)
+
+    def on_pan_start(self, event):
+        self.pan_anchor = (event.x, event.y)
+
+    def on_pan_motion(self, event):
+        """Pan the view; existing items are shifted, only newly exposed elements are created."""
+        if self.pan_anchor is None:
+            return
+        dx = event.x - self.pan_anchor[0]
+        dy = event.y - self.pan_anchor[1]
+        self.pan_anchor = (event.x, event.y)
+        self.viewport.pan(dx, dy)
+        self.canvas.move("all", dx, dy)
+        self.refresh_viewport()
+
+    def open_file(self):
+        """Open a file and load its content onto the canvas."""
+        loaded = self.file_manager.open_file()
+        if loaded is None:
+            return
+        elements, project = loaded
 
-            # Load elements into the canvas
-            self.whiteboard.load_elements(elements_data['elements'])
+        try:
+            # Clear existing elements, then load the new ones as they are read
+            self.clear()
+            self.load_elements(elements)
+            self.load_connections(project["connections"])
+            self.mark_clean()
 
             # Update file state
-            self.current_file_name = file_path
-            self.file_open = True  # Set the file open flag
-            self.whiteboard.is_file_open = True  # Enable the whiteboard
-            self.file_manager.file_path = file_path  # Update the file manager
-            self.update_file_label()  # Update the file label
-            self.console.log(f"Successfully loaded file: {os.path.basename(file_path)}",level="success")
+            self.current_file = self.file_manager.file_path
+            self.is_file_open = True  # Enable the whiteboard
+            self.status_label.config(text=f"File Open: {self.file_manager.current_file}")
 
-            messagebox.showinfo("File Loaded", f"Successfully loaded file: {os.path.basename(file_path)}")
-
-        except (json.JSONDecodeError, ValueError) as e:
-            messagebox.showerror("File Error", f"Failed to load the file. Error: {e}")
         except Exception as e:
             messagebox.showerror("Unexpected Error", f"An unexpected error occurred: {e}")
 
@@ -260,7 +727,7 @@ class Whiteboard(tk.Frame):
         if self.current_file_name:
             self.file_manager.save_elements(
                 self.current_file_name,
-                [element.to_data() for element in self.whiteboard.elements]
+                [element.to_data() for element in self.whiteboard.elements.values()]
             )
             self.console.log(
                 f"File saved successfully: {os.path.basename(self.current_file_name)}",
@@ -277,7 +744,7 @@ class Whiteboard(tk.Frame):
                 self.file_manager.file_path = file_path
                 self.current_file_name = file_path
                 self.file_manager.save_elements(
-                    file_path, [element.to_data() for element in self.whiteboard.elements]
+                    file_path, [element.to_data() for element in self.whiteboard.elements.values()]
                 )
                 self.console.log(
                     f"File saved successfully: {os.path.basename(file_path)}",
@@ -307,34 +774,42 @@ class Whiteboard(tk.Frame):
         self.status_label.config(text="No file open")  # Update the status
         self.clear()  # Clear the current whiteboard
 
-    def load_elements(self, elements_data=None):
-        """Load elements either from a file or directly passed data."""
+    def load_elements(self, elements_data=None, first_render=500):
+        """Load elements from a list, a stream of element data, or the file manager's file.
+
+        The view is drawn once first_render elements exist, so a large project shows up
+        while the rest of it is still being read.
+        """
         if elements_data is None:
-            if not os.path.exists(self.file_path):
-                print(f"Error: File does not exist: {self.file_path}")
+            if not os.path.exists(self.file_manager.file_path or ""):
+                print(f"Error: File does not exist: {self.file_manager.file_path}")
                 return
-
-            with open(self.file_path, 'r') as file:
-                try:
-                    elements_data = json.load(file)
-                except json.JSONDecodeError:
-                    print("Error: The file content is not valid JSON.")
-                    return
+            elements_data, _ = self.file_manager.stream_project(self.file_manager.file_path)
 
         if isinstance(elements_data, dict) and "elements" in elements_data:
             elements_data = elements_data["elements"]
 
-        for element_data in elements_data:
+        source_pipes = []
+        for count, element_data in enumerate(elements_data, 1):
             try:
-                element_class = globals()[element_data["class"]]
-                element = element_class(self.canvas, element_data["name"])
-                element.load_from_data(element_data)
-                element.create()
-                self.elements.append(element)
+                element = self.create_from_data(element_data, draw=False)
+                if element_data.get("source_pipe"):
+                    source_pipes.append((element, element_data["source_pipe"]))
 
             except Exception as e:
                 print(f"Error loading element: {e}")
 
+            if count == first_render:
+                self.refresh_viewport(redraw=True)
+                self.update_idletasks()
+
+        # Resolve Pipe.source_pipe references once every element exists
+        for element, source_name in source_pipes:
+            element.source_pipe = self.elements.get(source_name)
+
+        # Draw only what is in view, once, after the whole model is loaded
+        self.refresh_viewport(redraw=True)
+
 
 
 